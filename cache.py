@@ -109,8 +109,8 @@ class OmadaCache:
         conn.close()
         logger.debug("Cache database tables initialized")
 
-    def _generate_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
-        """Generate deterministic cache key from endpoint and parameters."""
+    def generate_cache_key(self, endpoint: str, params: Dict[str, Any]) -> str:
+        """Generate deterministic cache key from endpoint and parameters (the key get/set use)."""
         # Sort params to ensure consistent key generation
         param_str = json.dumps(params, sort_keys=True)
         key_input = f"{endpoint}:{param_str}"
@@ -123,7 +123,7 @@ class OmadaCache:
         Returns:
             Cached response dict or None if not found/expired
         """
-        cache_key = self._generate_cache_key(endpoint, params)
+        cache_key = self.generate_cache_key(endpoint, params)
 
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
@@ -182,7 +182,7 @@ class OmadaCache:
         if ttl_seconds is None:
             ttl_seconds = self.default_ttl
 
-        cache_key = self._generate_cache_key(endpoint, params)
+        cache_key = self.generate_cache_key(endpoint, params)
         now = datetime.now()
         expires_at = now + timedelta(seconds=ttl_seconds)
 
@@ -371,7 +371,7 @@ class OmadaCache:
         cursor = conn.cursor()
 
         if params and endpoint:
-            cache_key = self._generate_cache_key(endpoint, params)
+            cache_key = self.generate_cache_key(endpoint, params)
             cursor.execute("DELETE FROM api_cache WHERE cache_key = ?", (cache_key,))
             deleted = cursor.rowcount
             logger.info(f"🗑️ CACHE INVALIDATED: {endpoint} (specific params) - {deleted} entries deleted")
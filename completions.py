@@ -3,11 +3,149 @@
 # Completions provide autocomplete suggestions for function arguments,
 # helping users discover valid values for parameters.
 
+from mcp import types
+
+# Completion values are module-level tuples, built once at import time
+
+# MCP caps a completion response at 100 values
+MAX_COMPLETION_RESULTS = 100
+
+# Common Omada systems (these would ideally come from the API)
+_SYSTEM_IDS = (
+    "active-directory-system",
+    "azure-ad-system",
+    "salesforce-system",
+    "sap-system",
+    "workday-system",
+    "servicenow-system",
+    "google-workspace-system",
+    "okta-system",
+)
+
+# Resource Type Names
+_RESOURCE_TYPE_NAMES = (
+    "Active Directory - Security Group",
+    "Active Directory - Distribution List",
+    "Active Directory - User Account",
+    "Azure AD - Security Group",
+    "Azure AD - Application Role",
+    "SAP - Role",
+    "SAP - Profile",
+    "Salesforce - Permission Set",
+    "Salesforce - Profile",
+    "ServiceNow - Role",
+    "ServiceNow - Group",
+    "Google Workspace - Group",
+    "Okta - Group",
+    "Database - User",
+    "Database - Role",
+    "SharePoint - Site Permission",
+    "Exchange - Mailbox Permission",
+    "Network Share - Folder Permission",
+    "VPN Access",
+    "Application Access",
+)
+
+# Identity Field Names (for OData queries)
+_IDENTITY_FIELDS = (
+    "EMAIL",
+    "FIRSTNAME",
+    "LASTNAME",
+    "DISPLAYNAME",
+    "EMPLOYEEID",
+    "DEPARTMENT",
+    "TITLE",
+    "MANAGER",
+    "LOCATION",
+    "COMPANY",
+    "COSTCENTER",
+    "STATUS",
+    "STARTDATE",
+    "ENDDATE",
+    "USERID",
+    "UId",
+    "Id",
+    "PHONENUMBER",
+    "MOBILENUMBER",
+    "OFFICE",
+    "DIVISION",
+    "BUSINESSUNIT",
+)
+
+# OData Operators
+_ODATA_OPERATORS = (
+    "eq",           # equals
+    "ne",           # not equals
+    "gt",           # greater than
+    "ge",           # greater than or equal
+    "lt",           # less than
+    "le",           # less than or equal
+    "contains",     # contains substring
+    "startswith",   # starts with
+    "endswith",     # ends with
+)
+
+# Compliance Statuses
+_COMPLIANCE_STATUSES = (
+    "APPROVED",
+    "NOT APPROVED",
+    "VIOLATION",
+    "PENDING",
+    "REVIEW REQUIRED",
+)
+
+# Workflow Steps
+_WORKFLOW_STEPS = (
+    "ManagerApproval",
+    "ResourceOwnerApproval",
+    "SystemOwnerApproval",
+    "ComplianceApproval",
+    "SecurityApproval",
+)
+
+# Statuses (for access requests)
+_ACCESS_REQUEST_STATUSES = (
+    "PENDING",
+    "APPROVED",
+    "REJECTED",
+    "CANCELLED",
+    "IN_PROGRESS",
+    "COMPLETED",
+)
+
+# Argument name (including camelCase aliases) -> completion values, so a call is one dict lookup
+_COMPLETIONS: dict[str, tuple[str, ...]] = {
+    "system_id": _SYSTEM_IDS,
+    "systemId": _SYSTEM_IDS,
+    "resource_type_name": _RESOURCE_TYPE_NAMES,
+    "resourceTypeName": _RESOURCE_TYPE_NAMES,
+    "resource_type": _RESOURCE_TYPE_NAMES,
+    "field": _IDENTITY_FIELDS,
+    "field_name": _IDENTITY_FIELDS,
+    "filter_field": _IDENTITY_FIELDS,
+    "operator": _ODATA_OPERATORS,
+    "filter_operator": _ODATA_OPERATORS,
+    "compliance_status": _COMPLIANCE_STATUSES,
+    "complianceStatus": _COMPLIANCE_STATUSES,
+    "workflow_step": _WORKFLOW_STEPS,
+    "workflowStep": _WORKFLOW_STEPS,
+    "status": _ACCESS_REQUEST_STATUSES,
+}
+
+# Most completion requests are for arguments we have no suggestions for; reject those up front
+_KNOWN_ARGUMENTS = frozenset(_COMPLETIONS)
+
+
 def register_completions(mcp):
-    """Register all MCP completions with the FastMCP server."""
+    """
+    Register all MCP completions with the FastMCP server.
+
+    Returns the completion handler so scripts can call it directly
+    (await handler(None, CompletionArgument(name=..., value=...))) without going through a client.
+    """
 
     @mcp.completion()
-    async def complete_arguments(argument_name: str, argument_value: str) -> list[str]:
+    async def complete_arguments(ref, argument, context=None) -> types.Completion | None:
         """
         Provide completions for common Omada function arguments.
 
@@ -16,120 +154,27 @@ def register_completions(mcp):
         - resource_type_name: Resource type names
         - field: Identity field names (for OData queries)
         - filter_field: Field names for filtering
-        """
+        - operator, compliance_status, workflow_step, status
+
+        MCP calls this as (ref, argument, context); only argument.name is used.
 
-        # System ID completions
-        if argument_name in ["system_id", "systemId"]:
-            # Common Omada systems (these would ideally come from the API)
-            return [
-                "active-directory-system",
-                "azure-ad-system",
-                "salesforce-system",
-                "sap-system",
-                "workday-system",
-                "servicenow-system",
-                "google-workspace-system",
-                "okta-system"
-            ]
-
-        # Resource Type Name completions
-        if argument_name in ["resource_type_name", "resourceTypeName", "resource_type"]:
-            return [
-                "Active Directory - Security Group",
-                "Active Directory - Distribution List",
-                "Active Directory - User Account",
-                "Azure AD - Security Group",
-                "Azure AD - Application Role",
-                "SAP - Role",
-                "SAP - Profile",
-                "Salesforce - Permission Set",
-                "Salesforce - Profile",
-                "ServiceNow - Role",
-                "ServiceNow - Group",
-                "Google Workspace - Group",
-                "Okta - Group",
-                "Database - User",
-                "Database - Role",
-                "SharePoint - Site Permission",
-                "Exchange - Mailbox Permission",
-                "Network Share - Folder Permission",
-                "VPN Access",
-                "Application Access"
-            ]
-
-        # Identity Field Name completions (for OData queries)
-        if argument_name in ["field", "field_name", "filter_field"]:
-            return [
-                "EMAIL",
-                "FIRSTNAME",
-                "LASTNAME",
-                "DISPLAYNAME",
-                "EMPLOYEEID",
-                "DEPARTMENT",
-                "TITLE",
-                "MANAGER",
-                "LOCATION",
-                "COMPANY",
-                "COSTCENTER",
-                "STATUS",
-                "STARTDATE",
-                "ENDDATE",
-                "USERID",
-                "UId",
-                "Id",
-                "PHONENUMBER",
-                "MOBILENUMBER",
-                "OFFICE",
-                "DIVISION",
-                "BUSINESSUNIT"
-            ]
-
-        # OData Operator completions
-        if argument_name in ["operator", "filter_operator"]:
-            return [
-                "eq",           # equals
-                "ne",           # not equals
-                "gt",           # greater than
-                "ge",           # greater than or equal
-                "lt",           # less than
-                "le",           # less than or equal
-                "contains",     # contains substring
-                "startswith",   # starts with
-                "endswith"      # ends with
-            ]
-
-        # Compliance Status completions
-        if argument_name in ["compliance_status", "complianceStatus"]:
-            return [
-                "APPROVED",
-                "NOT APPROVED",
-                "VIOLATION",
-                "PENDING",
-                "REVIEW REQUIRED"
-            ]
-
-        # Workflow Step completions
-        if argument_name in ["workflow_step", "workflowStep"]:
-            return [
-                "ManagerApproval",
-                "ResourceOwnerApproval",
-                "SystemOwnerApproval",
-                "ComplianceApproval",
-                "SecurityApproval"
-            ]
-
-        # Status completions (for access requests)
-        if argument_name == "status":
-            return [
-                "PENDING",
-                "APPROVED",
-                "REJECTED",
-                "CANCELLED",
-                "IN_PROGRESS",
-                "COMPLETED"
-            ]
-
-        # Return empty list if no completions available
-        return []
+        Args:
+            ref: Prompt or resource reference being completed (unused)
+            argument: Argument being completed (.name, and .value - the text typed so far)
+            context: Already-resolved arguments, if the client sends them (unused)
+
+        Returns a Completion with at most MAX_COMPLETION_RESULTS values (total and hasMore
+        describe the full list), or None if no completions are available for the argument.
+        """
+        argument_name = argument.name
+        if argument_name not in _KNOWN_ARGUMENTS:
+            return None
+        values = _COMPLETIONS[argument_name]
+        return types.Completion(
+            values=list(values[:MAX_COMPLETION_RESULTS]),
+            total=len(values),
+            hasMore=len(values) > MAX_COMPLETION_RESULTS
+        )
 
     print("Registered MCP completions for: system_id, resource_type_name, field names, operators, compliance_status, workflow_step, status")
+    return complete_arguments
@@ -5,11 +5,38 @@ This module contains utility functions for:
 - Field validation
 - Error response building
 - Success response building
+- JSON serialization of tool responses (dumps_json)
 """
 
 import json
+import os
+from functools import lru_cache
 from typing import Any, Optional
 
+import orjson
+
+# Set OMADA_PRETTY_JSON=1 to indent tool responses when reading them by hand.
+# Off by default: indentation roughly doubles the bytes of large assignment lists.
+PRETTY_JSON = os.getenv("OMADA_PRETTY_JSON") == "1"
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if PRETTY_JSON else 0)
+
+
+def dumps_json(obj: Any) -> str:
+    """
+    Serialize a tool response to a JSON string using orjson (compact unless OMADA_PRETTY_JSON=1).
+
+    orjson encodes in C and writes straight to bytes, which matters for the large
+    assignment/identity lists the GraphQL tools return.
+
+    Args:
+        obj: JSON-serializable response object
+
+    Returns:
+        JSON string
+    """
+    # OPT_NON_STR_KEYS keeps parity with json.dumps, which stringifies int/None keys
+    return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode()
+
 
 def validate_required_fields(**kwargs) -> Optional[str]:
     """
@@ -31,16 +58,81 @@ def validate_required_fields(**kwargs) -> Optional[str]:
         if error:
             return error
     """
+    field_name = find_missing_field(**kwargs)
+    return _missing_field_error(field_name) if field_name else None
+
+
+def find_missing_field(**kwargs) -> Optional[str]:
+    """
+    Return the name of the first required field that is None or blank.
+
+    Args:
+        **kwargs: Field name and value pairs to validate
+
+    Returns:
+        Name of the first missing field, or None if all fields are valid
+    """
     for field_name, field_value in kwargs.items():
         if field_value is None or (isinstance(field_value, str) and not field_value.strip()):
-            return json.dumps({
-                "status": "error",
-                "message": f"Missing required field: {field_name}",
-                "error_type": "ValidationError"
-            }, indent=2)
+            return field_name
     return None
 
 
+@lru_cache(maxsize=None)
+def _missing_field_error(field_name: str) -> str:
+    """
+    Return the ValidationError JSON for a missing field, built once per field name.
+
+    Args:
+        field_name: Name of the missing field
+
+    Returns:
+        JSON error string
+    """
+    return dumps_json({
+        "status": "error",
+        "message": f"Missing required field: {field_name}",
+        "error_type": "ValidationError"
+    })
+
+
+def build_error_dict(
+    error_type: str,
+    result: dict = None,
+    message: str = None,
+    **extra_fields
+) -> dict:
+    """
+    Build a standardized error response dict (see build_error_response).
+
+    Use this where a caller needs the response as a dict; build_error_response
+    serializes the same dict for MCP tools.
+    """
+    error_result = {
+        "status": "error",
+        "error_type": error_type,
+        **extra_fields
+    }
+
+    # Add custom message if provided
+    if message:
+        error_result["message"] = message
+
+    # Extract error details from result if provided
+    if result:
+        if "status_code" in result:
+            error_result["status_code"] = result["status_code"]
+        if "error" in result:
+            error_result["error"] = result["error"]
+        if "endpoint" in result:
+            error_result["endpoint"] = result["endpoint"]
+        # Handle GraphQL errors array
+        if "errors" in result:
+            error_result["errors"] = result["errors"]
+
+    return error_result
+
+
 def build_error_response(
     error_type: str,
     result: dict = None,
@@ -57,7 +149,7 @@ def build_error_response(
         **extra_fields: Additional context fields to include (impersonated_user, identity_id, etc.)
 
     Returns:
-        JSON string with standardized error format
+        Compact JSON string with standardized error format
 
     Example:
         return build_error_response(
@@ -74,29 +166,34 @@ def build_error_response(
             impersonated_user=impersonate_user
         )
     """
-    error_result = {
-        "status": "error",
-        "error_type": error_type,
-        **extra_fields
+    return dumps_json(build_error_dict(error_type, result, message, **extra_fields))
+
+
+def build_success_dict(
+    data: Any = None,
+    endpoint: str = None,
+    **context
+) -> dict:
+    """
+    Build a standardized success response dict (see build_success_response).
+
+    Use this where a caller needs the response as a dict; build_success_response
+    serializes the same dict for MCP tools.
+    """
+    response = {
+        "status": "success",
+        **context
     }
 
-    # Add custom message if provided
-    if message:
-        error_result["message"] = message
+    # Add data if provided (could be None for some operations)
+    if data is not None:
+        response["data"] = data
 
-    # Extract error details from result if provided
-    if result:
-        if "status_code" in result:
-            error_result["status_code"] = result["status_code"]
-        if "error" in result:
-            error_result["error"] = result["error"]
-        if "endpoint" in result:
-            error_result["endpoint"] = result["endpoint"]
-        # Handle GraphQL errors array
-        if "errors" in result:
-            error_result["errors"] = result["errors"]
+    # Add endpoint if provided
+    if endpoint:
+        response["endpoint"] = endpoint
 
-    return json.dumps(error_result, indent=2)
+    return response
 
 
 def build_success_response(
@@ -113,7 +210,8 @@ def build_success_response(
         **context: Context fields to include (impersonated_user, identity_id, etc.)
 
     Returns:
-        JSON string with standardized success format
+        Compact JSON string with standardized success format (no indentation -
+        the MCP client parses it, so pretty-printing only adds bytes)
 
     Example:
         return build_success_response(
@@ -124,20 +222,7 @@ def build_success_response(
             total_count=len(assignments)
         )
     """
-    response = {
-        "status": "success",
-        **context
-    }
-
-    # Add data if provided (could be None for some operations)
-    if data is not None:
-        response["data"] = data
-
-    # Add endpoint if provided
-    if endpoint:
-        response["endpoint"] = endpoint
-
-    return json.dumps(response, indent=2)
+    return dumps_json(build_success_dict(data, endpoint, **context))
 
 
 def build_pagination_clause(page: int = None, rows: int = None) -> str:
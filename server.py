@@ -7,10 +7,19 @@ from dotenv import load_dotenv
 import asyncio
 from datetime import datetime, timedelta
 import json
+import orjson
 import urllib.parse
 import logging
 import hashlib
 import base64
+import inspect
+import random
+import string
+import time
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
 
 # Load environment variables FIRST
 load_dotenv()
@@ -51,7 +60,8 @@ logger.info(f"Logging initialized. Writing logs to: {os.path.abspath(LOG_FILE)}"
 logger.info(f"Cache logger will use root logger handlers (level: {LOG_LEVEL})")
 
 # NOW import modules that create loggers - logging is already configured
-from helpers import validate_required_fields, build_error_response, build_success_response, build_pagination_clause, json_to_graphql_syntax
+from helpers import (validate_required_fields, find_missing_field, build_error_response, build_success_response,
+                     build_error_dict, build_success_dict, build_pagination_clause, json_to_graphql_syntax, dumps_json)
 from cache import OmadaCache
 from cache_config import get_ttl_for_operation, should_cache, DEFAULT_TTL
 
@@ -74,6 +84,22 @@ http_client = httpx.AsyncClient(
 
 logger.info("HTTP client configured with HTTP/2 support and connection pooling")
 
+# Cap concurrent in-flight GraphQL requests per impersonated user so a burst of
+# tool calls queues locally instead of tripping Omada's per-user throttling
+MAX_INFLIGHT_PER_USER = int(os.getenv("OMADA_MAX_INFLIGHT_PER_USER", "16"))
+_USER_SEMAPHORES = defaultdict(lambda: asyncio.Semaphore(MAX_INFLIGHT_PER_USER))
+
+# Retry transient GraphQL failures with jittered exponential backoff, within the 30s request budget.
+# 429/503 mean Omada refused the request before processing it, so only those are retried for mutations.
+GRAPHQL_MAX_ATTEMPTS = max(1, int(os.getenv("GRAPHQL_MAX_ATTEMPTS", "3")))
+GRAPHQL_RETRY_BUDGET_SECONDS = 30.0
+GRAPHQL_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+GRAPHQL_MUTATION_RETRY_STATUSES = frozenset({429, 503})
+
+# Set OMADA_DEBUG_HTTP=1 to attach raw request/response bodies and headers to results.
+# Off by default: the copies cost a re-serialization per call and echo the bearer token.
+DEBUG_HTTP = os.getenv("OMADA_DEBUG_HTTP") == "1"
+
 def get_function_log_level(function_name: str) -> int:
     """
     Get the log level for a specific function, falling back to global LOG_LEVEL.
@@ -193,6 +219,39 @@ def with_function_logging(func):
         sync_wrapper.__dict__.update(func.__dict__)
         return sync_wrapper
 
+def with_exception_response(func):
+    """
+    Decorator that turns an exception escaping a tool into the standard error response,
+    so the tool body doesn't need its own catch-all try/except.
+
+    Must go BELOW @mcp.tool(): mcp.tool() registers the function it is handed, so only
+    decorators applied before registration run when the tool is called over MCP.
+
+    Usage:
+        @with_function_logging
+        @mcp.tool()
+        @with_exception_response
+        async def my_function():
+            pass
+    """
+    async def async_wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            # Transport failures get a stable error type; everything else reports its class name
+            error_type = "NetworkError" if isinstance(e, httpx.RequestError) else type(e).__name__
+            return build_error_response(error_type=error_type, message=str(e))
+    # Manually preserve metadata without setting __wrapped__ (see with_function_logging),
+    # and expose the real signature so FastMCP still builds the tool's parameter schema
+    async_wrapper.__name__ = func.__name__
+    async_wrapper.__doc__ = func.__doc__
+    async_wrapper.__module__ = func.__module__
+    async_wrapper.__qualname__ = func.__qualname__
+    async_wrapper.__annotations__ = func.__annotations__
+    async_wrapper.__signature__ = inspect.signature(func)
+    async_wrapper.__dict__.update(func.__dict__)
+    return async_wrapper
+
 # Custom Exception Classes
 class OmadaServerError(Exception):
     """Base exception for Omada server errors"""
@@ -250,6 +309,21 @@ def _get_omada_base_url(omada_base_url: str = None) -> str:
             raise Exception("OMADA_BASE_URL not found in environment variables or parameters")
     return omada_base_url.rstrip('/')
 
+def _gql_str(value) -> str:
+    """
+    Encode a value as a quoted GraphQL string literal.
+
+    GraphQL string literals use the same escapes as JSON, so json.dumps handles quotes,
+    backslashes, newlines and control characters that would otherwise break the query.
+
+    Args:
+        value: Value to embed in a query document (converted with str())
+
+    Returns:
+        Quoted, escaped GraphQL string literal
+    """
+    return json.dumps(str(value), ensure_ascii=False)
+
 def _build_odata_filter(field_name: str, value: str, operator: str) -> str:
     """
     Build an OData filter expression based on the operator.
@@ -338,6 +412,15 @@ def _summarize_entities(data: dict, entity_type: str) -> dict:
     return result
 
 
+# Shared read-only default for missing objects in GraphQL responses (avoids a fresh {} per lookup)
+_EMPTY = MappingProxyType({})
+
+# PendingApproval summaries are built with a C-level itemgetter instead of the generic per-field loop
+_PENDING_APPROVAL_KEYS = ("workflowStep", "workflowStepTitle", "reason", "resourceAssignment")
+_PENDING_APPROVAL_TEXT_KEYS = ("workflowStepTitle", "reason")
+_pending_approval_getter = itemgetter(*_PENDING_APPROVAL_KEYS)
+
+
 def _summarize_graphql_data(data: list, data_type: str) -> list:
     """
     Create a summarized version of GraphQL response data with only key fields.
@@ -352,6 +435,21 @@ def _summarize_graphql_data(data: list, data_type: str) -> list:
     if not data or not isinstance(data, list):
         return data
 
+    # Fast path for pending approvals: every row carries the same selected fields
+    if data_type == "PendingApproval":
+        try:
+            summarized = [dict(zip(_PENDING_APPROVAL_KEYS, _pending_approval_getter(item))) for item in data]
+        except KeyError:
+            pass  # A row is missing a field - fall back to the generic loop below
+        else:
+            # Truncate long free-text fields, same as the generic path
+            for summary in summarized:
+                for field in _PENDING_APPROVAL_TEXT_KEYS:
+                    value = summary[field]
+                    if isinstance(value, str) and len(value) > 100:
+                        summary[field] = value[:97] + "..."
+            return summarized
+
     # Define key fields for each GraphQL data type
     # Fields listed here are ONLY fields that will be returned
     summary_fields = {
@@ -400,8 +498,115 @@ def _summarize_graphql_data(data: list, data_type: str) -> list:
     return summarized
 
 
+def _build_odata_headers(bearer_token: str, impersonate_user: str = None) -> dict:
+    """
+    Build the request headers for an OData call.
+
+    Args:
+        bearer_token: Bearer token (REQUIRED) - obtain from oauth_mcp_server
+        impersonate_user: Optional email address for user impersonation
+
+    Returns:
+        dict: Request headers including the Authorization header
+
+    Raises:
+        Exception if bearer_token is not provided
+    """
+    if bearer_token:
+        logger.debug("Using provided bearer token for OData request")
+        # Strip "Bearer " prefix if already present to avoid double-prefix
+        clean_token = bearer_token.replace("Bearer ", "").replace("bearer ", "").strip()
+        auth_header = f"Bearer {clean_token}"
+        logger.debug(f"Token length: {len(clean_token)} characters")
+        logger.debug(f"Full bearer_token parameter: {bearer_token}")
+        logger.debug(f"Clean token (after strip): {clean_token}")
+        logger.debug(f"Full Authorization header: {auth_header}")
+    else:
+        # OAuth token functions have been migrated to oauth_mcp_server
+        # bearer_token is now mandatory for all authentication methods
+        raise Exception(
+            "bearer_token parameter is required.\n"
+            "OAuth token functions have been migrated to oauth_mcp_server.\n\n"
+            "Workflow:\n"
+            "1. Use oauth_mcp_server to obtain a bearer token:\n"
+            "   - For Device Code flow: 'start device authentication' then 'complete device authentication'\n"
+            "   - For Client Credentials: use oauth_mcp_server's token acquisition functions\n"
+            "2. Pass the token to this function using bearer_token parameter\n\n"
+            "Example: bearer_token='eyJ0eXAiOiJKV1QiLCJhbGc...'"
+        )
+
+    headers = {
+        "Authorization": auth_header,
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+    # Add impersonate_user header if provided (required for user-delegated tokens like device code)
+    if impersonate_user:
+        headers["impersonate_user"] = impersonate_user
+        logger.debug(f"Using impersonate_user: {impersonate_user}")
+
+    return headers
+
+
+def _raise_for_odata_status(response: httpx.Response) -> None:
+    """
+    Raise the matching typed exception for a non-200 OData response.
+
+    Args:
+        response: The HTTP response returned by Omada
+
+    Raises:
+        ODataQueryError, AuthenticationError or OmadaServerError
+    """
+    if response.status_code == 400:
+        raise ODataQueryError(f"Bad request - invalid OData query: {response.text[:200]}", response.status_code)
+    elif response.status_code == 401:
+        raise AuthenticationError("Authentication failed - token may be expired", response.status_code)
+    elif response.status_code == 403:
+        raise AuthenticationError("Access forbidden - insufficient permissions", response.status_code)
+    elif response.status_code == 404:
+        raise OmadaServerError("Omada endpoint not found - check base URL", response.status_code)
+    elif response.status_code >= 500:
+        raise OmadaServerError(f"Omada server error: {response.status_code}", response.status_code, response.text)
+    else:
+        raise OmadaServerError(f"Unexpected response: {response.status_code}", response.status_code, response.text)
+
+
+async def _fetch_identity_by_email(email: str, bearer_token: str, select_fields: str = "UId") -> Optional[dict]:
+    """
+    Look up a single Identity by EMAIL via OData, without going through the MCP tool layer.
+
+    Args:
+        email: Email address of the identity
+        bearer_token: Bearer token for authentication
+        select_fields: Comma-separated list of fields to select (default: "UId")
+
+    Returns:
+        The raw Identity entity dict, or None if no identity matches
+
+    Raises:
+        AuthenticationError, ODataQueryError, OmadaServerError or httpx.RequestError on failure
+    """
+    query_params = {
+        "$filter": _build_odata_filter("EMAIL", email, "eq"),
+        "$select": select_fields,
+        "$top": "1"
+    }
+    endpoint_url = f"{_get_omada_base_url()}/OData/DataObjects/Identity?{urllib.parse.urlencode(query_params)}"
+
+    response = await http_client.get(endpoint_url, headers=_build_odata_headers(bearer_token))
+    if response.status_code != 200:
+        _raise_for_odata_status(response)
+
+    entities = orjson.loads(response.content).get("value", [])
+    return entities[0] if entities else None
+
+
 @with_function_logging
 @mcp.tool()
+@with_exception_response
 async def query_omada_entity(entity_type: str = "Identity",
                             filters: dict = None,
                             count_only: bool = False,
@@ -507,225 +712,154 @@ async def query_omada_entity(entity_type: str = "Identity",
     Returns:
         JSON response with entity data, count, or error message
     """
-    try:
-        # Validate entity type
-        valid_entities = ["Identity", "Resource", "Role", "Account", "Application", "System", "CalculatedAssignments", "AssignmentPolicy"]
-        if entity_type not in valid_entities:
-            return f"❌ Invalid entity type '{entity_type}'. Valid types: {', '.join(valid_entities)}"
+    # Validate entity type
+    valid_entities = ["Identity", "Resource", "Role", "Account", "Application", "System", "CalculatedAssignments", "AssignmentPolicy"]
+    if entity_type not in valid_entities:
+        return f"❌ Invalid entity type '{entity_type}'. Valid types: {', '.join(valid_entities)}"
 
-        # Get base URL using helper function (reads from environment)
-        try:
-            omada_base_url = _get_omada_base_url()
-        except Exception as e:
-            return f"❌ {str(e)}"
+    # Get base URL using helper function (reads from environment)
+    try:
+        omada_base_url = _get_omada_base_url()
+    except Exception as e:
+        return f"❌ {str(e)}"
 
-        # Build the endpoint URL based on entity type
-        if entity_type == "CalculatedAssignments":
-            endpoint_url = f"{omada_base_url}/OData/BuiltIn/{entity_type}"
-        else:
-            endpoint_url = f"{omada_base_url}/OData/DataObjects/{entity_type}"
-        
-        # Build query parameters
-        query_params = {}
-        
-        # Initialize filters dictionary if not provided
-        if filters is None:
-            filters = {}
-
-        # Extract filter components from the filters dictionary
-        field_filters = filters.get("field_filters", [])
-        resource_type_id = filters.get("resource_type_id")
-        resource_type_name = filters.get("resource_type_name")
-        system_id = filters.get("system_id")
-        identity_id = filters.get("identity_id")
-        custom_filter = filters.get("custom_filter")
-
-        # Handle entity-specific filtering logic
-        auto_filters = []
-
-        # For Resource entities, handle resource_type and system filtering
-        if entity_type == "Resource":
-            if resource_type_name and not resource_type_id:
-                env_key = f"RESOURCE_TYPE_{resource_type_name.upper()}"
-                resource_type_id = os.getenv(env_key)
-                if not resource_type_id:
-                    return f"❌ Resource type '{resource_type_name}' not found in environment variables. Check {env_key}"
-                resource_type_id = int(resource_type_id)
-
-            if resource_type_id:
-                auto_filters.append(f"Systemref/Id eq {resource_type_id}")
-
-            # Add system_id filter for querying resources by system (only if not already filtered by resource_type_id)
-            if system_id and not resource_type_id:
-                auto_filters.append(f"Systemref/Id eq {system_id}")
-
-        # Handle generic field filtering for any entity type
-        if field_filters:
-            for field_filter in field_filters:
-                if isinstance(field_filter, dict) and "field" in field_filter and "value" in field_filter:
-                    field_name = field_filter["field"]
-                    field_value = field_filter["value"]
-                    field_operator = field_filter.get("operator", "eq")
-                    auto_filters.append(_build_odata_filter(field_name, field_value, field_operator))
-
-        # For CalculatedAssignments entities, handle identity_id filtering
-        if entity_type == "CalculatedAssignments":
-            if identity_id:
-                auto_filters.append(f"Identity/Id eq {identity_id}")
-
-        # Combine automatic filters with custom filter condition
-        all_filters = []
-        if auto_filters:
-            all_filters.extend(auto_filters)
-        if custom_filter:
-            all_filters.append(f"({custom_filter})")
-        
-        if all_filters:
-            query_params['$filter'] = " and ".join(all_filters)
-        
-        # Add count parameter if requested
-        if count_only:
+    # Build the endpoint URL based on entity type
+    if entity_type == "CalculatedAssignments":
+        endpoint_url = f"{omada_base_url}/OData/BuiltIn/{entity_type}"
+    else:
+        endpoint_url = f"{omada_base_url}/OData/DataObjects/{entity_type}"
+    
+    # Build query parameters
+    query_params = {}
+    
+    # Initialize filters dictionary if not provided
+    if filters is None:
+        filters = {}
+
+    # Extract filter components from the filters dictionary
+    field_filters = filters.get("field_filters", [])
+    resource_type_id = filters.get("resource_type_id")
+    resource_type_name = filters.get("resource_type_name")
+    system_id = filters.get("system_id")
+    identity_id = filters.get("identity_id")
+    custom_filter = filters.get("custom_filter")
+
+    # Handle entity-specific filtering logic
+    auto_filters = []
+
+    # For Resource entities, handle resource_type and system filtering
+    if entity_type == "Resource":
+        if resource_type_name and not resource_type_id:
+            env_key = f"RESOURCE_TYPE_{resource_type_name.upper()}"
+            resource_type_id = os.getenv(env_key)
+            if not resource_type_id:
+                return f"❌ Resource type '{resource_type_name}' not found in environment variables. Check {env_key}"
+            resource_type_id = int(resource_type_id)
+
+        if resource_type_id:
+            auto_filters.append(f"Systemref/Id eq {resource_type_id}")
+
+        # Add system_id filter for querying resources by system (only if not already filtered by resource_type_id)
+        if system_id and not resource_type_id:
+            auto_filters.append(f"Systemref/Id eq {system_id}")
+
+    # Handle generic field filtering for any entity type
+    if field_filters:
+        for field_filter in field_filters:
+            if isinstance(field_filter, dict) and "field" in field_filter and "value" in field_filter:
+                field_name = field_filter["field"]
+                field_value = field_filter["value"]
+                field_operator = field_filter.get("operator", "eq")
+                auto_filters.append(_build_odata_filter(field_name, field_value, field_operator))
+
+    # For CalculatedAssignments entities, handle identity_id filtering
+    if entity_type == "CalculatedAssignments":
+        if identity_id:
+            auto_filters.append(f"Identity/Id eq {identity_id}")
+
+    # Combine automatic filters with custom filter condition
+    all_filters = []
+    if auto_filters:
+        all_filters.extend(auto_filters)
+    if custom_filter:
+        all_filters.append(f"({custom_filter})")
+    
+    if all_filters:
+        query_params['$filter'] = " and ".join(all_filters)
+    
+    # Add count parameter if requested
+    if count_only:
+        query_params['$count'] = 'true'
+        query_params['$top'] = '0'  # Don't return actual records, just count
+    else:
+        # Add other OData parameters
+        if top:
+            query_params['$top'] = str(top)
+        if skip:
+            query_params['$skip'] = str(skip)
+        if select_fields:
+            query_params['$select'] = select_fields
+        if order_by:
+            query_params['$orderby'] = order_by
+        if expand:
+            query_params['$expand'] = expand
+        if include_count:
             query_params['$count'] = 'true'
-            query_params['$top'] = '0'  # Don't return actual records, just count
-        else:
-            # Add other OData parameters
-            if top:
-                query_params['$top'] = str(top)
-            if skip:
-                query_params['$skip'] = str(skip)
-            if select_fields:
-                query_params['$select'] = select_fields
-            if order_by:
-                query_params['$orderby'] = order_by
-            if expand:
-                query_params['$expand'] = expand
-            if include_count:
-                query_params['$count'] = 'true'
-        
-        # Construct final URL with query parameters
-        if query_params:
-            query_string = urllib.parse.urlencode(query_params)
-            endpoint_url = f"{endpoint_url}?{query_string}"
-
-        # Bearer token is always required (OAuth functions migrated to oauth_mcp_server)
-        if bearer_token:
-            logger.debug("Using provided bearer token for OData request")
-            # Strip "Bearer " prefix if already present to avoid double-prefix
-            clean_token = bearer_token.replace("Bearer ", "").replace("bearer ", "").strip()
-            auth_header = f"Bearer {clean_token}"
-            logger.debug(f"Token length: {len(clean_token)} characters")
-            logger.debug(f"Full bearer_token parameter: {bearer_token}")
-            logger.debug(f"Clean token (after strip): {clean_token}")
-            logger.debug(f"Full Authorization header: {auth_header}")
-        else:
-            # OAuth token functions have been migrated to oauth_mcp_server
-            # bearer_token is now mandatory for all authentication methods
-            raise Exception(
-                "bearer_token parameter is required.\n"
-                "OAuth token functions have been migrated to oauth_mcp_server.\n\n"
-                "Workflow:\n"
-                "1. Use oauth_mcp_server to obtain a bearer token:\n"
-                "   - For Device Code flow: 'start device authentication' then 'complete device authentication'\n"
-                "   - For Client Credentials: use oauth_mcp_server's token acquisition functions\n"
-                "2. Pass the token to this function using bearer_token parameter\n\n"
-                "Example: bearer_token='eyJ0eXAiOiJKV1QiLCJhbGc...'"
-            )
-
-        # Make API call to Omada
-        headers = {
-            "Authorization": auth_header,
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-
-        # Add impersonate_user header if provided (required for user-delegated tokens like device code)
-        if impersonate_user:
-            headers["impersonate_user"] = impersonate_user
-            logger.debug(f"Using impersonate_user: {impersonate_user}")
+    
+    # Construct final URL with query parameters
+    if query_params:
+        query_string = urllib.parse.urlencode(query_params)
+        endpoint_url = f"{endpoint_url}?{query_string}"
 
-        response = await http_client.get(endpoint_url, headers=headers, timeout=30.0)
+    # Bearer token is always required (OAuth functions migrated to oauth_mcp_server)
+    headers = _build_odata_headers(bearer_token, impersonate_user)
 
-        if response.status_code == 200:
-            # Parse the response
-            data = response.json()
+    response = await http_client.get(endpoint_url, headers=headers)
 
-            if count_only:
-                # Return just the count
-                count = data.get("@odata.count", len(data.get("value", [])))
-                return build_success_response(
-                    data=None,
-                    endpoint=endpoint_url,
-                    entity_type=entity_type,
-                    count=count,
-                    filter=query_params.get('$filter', 'none')
-                )
-            else:
-                # Return full data with metadata
-                entities_found = len(data.get("value", []))
-                total_count = data.get("@odata.count")  # Available if $count=true was included
+    if response.status_code == 200:
+        # Parse straight from the body bytes (response.json() decodes to str first)
+        data = orjson.loads(response.content)
 
-                # Apply summarization if requested
-                response_data = data
-                if summary_mode:
-                    response_data = _summarize_entities(data, entity_type)
-
-                # Build response with entity-specific metadata
-                extra_fields = {
-                    "entity_type": entity_type,
-                    "entities_returned": entities_found,
-                    "total_count": total_count,
-                    "filter": query_params.get('$filter', 'none'),
-                    "summary_mode": summary_mode
-                }
+        if count_only:
+            # Return just the count
+            count = data.get("@odata.count", len(data.get("value", [])))
+            return build_success_response(
+                data=None,
+                endpoint=endpoint_url,
+                entity_type=entity_type,
+                count=count,
+                filter=query_params.get('$filter', 'none')
+            )
+        else:
+            # Return full data with metadata
+            entities_found = len(data.get("value", []))
+            total_count = data.get("@odata.count")  # Available if $count=true was included
+
+            # Apply summarization if requested
+            response_data = data
+            if summary_mode:
+                response_data = _summarize_entities(data, entity_type)
+
+            # Build response with entity-specific metadata
+            extra_fields = {
+                "entity_type": entity_type,
+                "entities_returned": entities_found,
+                "total_count": total_count,
+                "filter": query_params.get('$filter', 'none'),
+                "summary_mode": summary_mode
+            }
 
-                # Add entity-specific metadata
-                if entity_type == "Resource" and resource_type_id:
-                    extra_fields["resource_type_id"] = resource_type_id
+            # Add entity-specific metadata
+            if entity_type == "Resource" and resource_type_id:
+                extra_fields["resource_type_id"] = resource_type_id
 
-                return build_success_response(
-                    data=response_data,
-                    endpoint=endpoint_url,
-                    **extra_fields
-                )
-        elif response.status_code == 400:
-            raise ODataQueryError(f"Bad request - invalid OData query: {response.text[:200]}", response.status_code)
-        elif response.status_code == 401:
-            raise AuthenticationError("Authentication failed - token may be expired", response.status_code)
-        elif response.status_code == 403:
-            raise AuthenticationError("Access forbidden - insufficient permissions", response.status_code)
-        elif response.status_code == 404:
-            raise OmadaServerError("Omada endpoint not found - check base URL", response.status_code)
-        elif response.status_code >= 500:
-            raise OmadaServerError(f"Omada server error: {response.status_code}", response.status_code, response.text)
-        else:
-            raise OmadaServerError(f"Unexpected response: {response.status_code}", response.status_code, response.text)
-                
-    except AuthenticationError as e:
-        return build_error_response(
-            error_type="AuthenticationError",
-            message=str(e)
-        )
-    except ODataQueryError as e:
-        return build_error_response(
-            error_type="ODataQueryError",
-            message=str(e)
-        )
-    except OmadaServerError as e:
-        return build_error_response(
-            error_type="OmadaServerError",
-            message=str(e)
-        )
-    except httpx.RequestError as e:
-        return build_error_response(
-            error_type="NetworkError",
-            message=str(e)
-        )
-    except Exception as e:
-        return build_error_response(
-            error_type=type(e).__name__,
-            message=str(e)
-        )
+            return build_success_response(
+                data=response_data,
+                endpoint=endpoint_url,
+                **extra_fields
+            )
+    else:
+        _raise_for_odata_status(response)
 
 @with_function_logging
 @mcp.tool()
@@ -1044,6 +1178,7 @@ def ping() -> str:
 
 @with_function_logging
 @mcp.tool()
+@with_exception_response
 async def check_omada_config() -> str:
     """
     Check and display current Omada server configuration.
@@ -1051,38 +1186,31 @@ async def check_omada_config() -> str:
     Returns:
         JSON string with Omada configuration details
     """
-    try:
-        config = {
-            "name": "Omada MCP Server",
-            "version": "1.0.0",
-            "omada_base_url": os.getenv("OMADA_BASE_URL", "NOT_SET"),
-            "graphql_endpoint_version": os.getenv("GRAPHQL_ENDPOINT_VERSION", "3.0"),
-            "log_level": os.getenv("LOG_LEVEL", "INFO"),
-            "log_file": os.getenv("LOG_FILE", "omada_mcp_server.log"),
-        }
-
-        # Validate required settings
-        missing = []
-        if config["omada_base_url"] == "NOT_SET":
-            missing.append("OMADA_BASE_URL")
+    config = {
+        "name": "Omada MCP Server",
+        "version": "1.0.0",
+        "omada_base_url": os.getenv("OMADA_BASE_URL", "NOT_SET"),
+        "graphql_endpoint_version": os.getenv("GRAPHQL_ENDPOINT_VERSION", "3.0"),
+        "log_level": os.getenv("LOG_LEVEL", "INFO"),
+        "log_file": os.getenv("LOG_FILE", "omada_mcp_server.log"),
+    }
 
-        if missing:
-            config["status"] = "INVALID"
-            config["error"] = f"Missing required environment variables: {', '.join(missing)}"
-        else:
-            config["status"] = "VALID"
+    # Validate required settings
+    missing = []
+    if config["omada_base_url"] == "NOT_SET":
+        missing.append("OMADA_BASE_URL")
 
-        # Add note about OAuth migration
-        config["note"] = "OAuth token functions have been migrated to oauth_mcp_server. All Omada functions require bearer_token parameter."
-        config["usage_example"] = "get_pending_approvals(impersonate_user='user@domain.com', bearer_token='eyJ0...')"
+    if missing:
+        config["status"] = "INVALID"
+        config["error"] = f"Missing required environment variables: {', '.join(missing)}"
+    else:
+        config["status"] = "VALID"
 
-        return build_success_response(data=config)
+    # Add note about OAuth migration
+    config["note"] = "OAuth token functions have been migrated to oauth_mcp_server. All Omada functions require bearer_token parameter."
+    config["usage_example"] = "get_pending_approvals(impersonate_user='user@domain.com', bearer_token='eyJ0...')"
 
-    except Exception as e:
-        return build_error_response(
-            error_type=type(e).__name__,
-            message=str(e)
-        )
+    return build_success_response(data=config)
 
 @with_function_logging
 @mcp.tool()
@@ -1105,10 +1233,10 @@ async def get_cache_stats() -> str:
 
     try:
         if not CACHE_ENABLED or cache is None:
-            return json.dumps({
+            return dumps_json({
                 "cache_enabled": False,
                 "message": "Cache is disabled. Set CACHE_ENABLED=true in .env to enable caching."
-            }, indent=2)
+            })
 
         # Get stats from cache
         stats = cache.get_stats()
@@ -1128,7 +1256,7 @@ async def get_cache_stats() -> str:
 
         logger.info(f"📊 Cache stats requested - Valid entries: {stats['api_cache']['valid_entries']}, Hits: {stats['api_cache']['total_hits']}")
 
-        return json.dumps(result, indent=2)
+        return dumps_json(result)
 
     except Exception as e:
         return build_error_response(
@@ -1167,10 +1295,10 @@ async def clear_cache(endpoint: str = None) -> str:
     """
     try:
         if not CACHE_ENABLED or cache is None:
-            return json.dumps({
+            return dumps_json({
                 "cache_enabled": False,
                 "message": "Cache is disabled. No cache entries to clear."
-            }, indent=2)
+            })
 
         # Clear cache
         deleted_count = cache.invalidate(endpoint=endpoint)
@@ -1182,12 +1310,12 @@ async def clear_cache(endpoint: str = None) -> str:
             message = f"✅ Entire cache cleared"
             logger.info(f"🗑️ ENTIRE cache cleared - {deleted_count} entries deleted")
 
-        return json.dumps({
+        return dumps_json({
             "success": True,
             "message": message,
             "entries_deleted": deleted_count,
             "endpoint": endpoint or "all"
-        }, indent=2)
+        })
 
     except Exception as e:
         return build_error_response(
@@ -1213,10 +1341,10 @@ async def view_cache_contents_detailed(limit: int = 10, include_expired: bool =
     """
     try:
         if not CACHE_ENABLED or cache is None:
-            return json.dumps({
+            return dumps_json({
                 "cache_enabled": False,
                 "message": "Cache is disabled. No cache contents to view."
-            }, indent=2)
+            })
 
         # Get raw cache data from database
         import sqlite3
@@ -1282,7 +1410,7 @@ async def view_cache_contents_detailed(limit: int = 10, include_expired: bool =
 
         logger.info(f"📋 Detailed cache contents viewed - {len(entries)} entries with full params")
 
-        return json.dumps(result, indent=2)
+        return dumps_json(result)
 
     except Exception as e:
         return build_error_response(
@@ -1323,17 +1451,17 @@ async def view_cache_contents(limit: int = 50, include_expired: bool = False) ->
     """
     try:
         if not CACHE_ENABLED or cache is None:
-            return json.dumps({
+            return dumps_json({
                 "cache_enabled": False,
                 "message": "Cache is disabled. No cache contents to view."
-            }, indent=2)
+            })
 
         # Get cache contents
         contents = cache.view_cache_contents(limit=limit, include_expired=include_expired)
 
         logger.info(f"📋 Cache contents viewed - {contents['total_shown']['api_cache']} API + {contents['total_shown']['identity_cache']} identity entries")
 
-        return json.dumps(contents, indent=2)
+        return dumps_json(contents)
 
     except Exception as e:
         return build_error_response(
@@ -1378,17 +1506,17 @@ async def get_cache_efficiency() -> str:
 
     try:
         if not CACHE_ENABLED or cache is None:
-            return json.dumps({
+            return dumps_json({
                 "cache_enabled": False,
                 "message": "Cache is disabled. No efficiency metrics available."
-            }, indent=2)
+            })
 
         # Get efficiency metrics
         efficiency = cache.get_cache_efficiency()
 
         logger.info(f"📊 Cache efficiency: {efficiency['overall_efficiency']['combined_hit_rate_percent']:.1f}% hit rate")
 
-        return json.dumps(efficiency, indent=2)
+        return dumps_json(efficiency)
 
     except Exception as e:
         return build_error_response(
@@ -1401,6 +1529,49 @@ async def get_cache_efficiency() -> str:
         elapsed_time = (end_time - start_time).total_seconds()
         logger.info(f"TOOL END - get_cache_efficiency | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
+@lru_cache(maxsize=256)
+def _graphql_base_headers(impersonate_user: str) -> MappingProxyType:
+    """
+    Build the static GraphQL request headers for a user (everything except Authorization).
+
+    Cached per impersonated user and returned read-only so callers merge rather than mutate.
+
+    Args:
+        impersonate_user: User to impersonate in the request
+
+    Returns:
+        MappingProxyType: Read-only base headers
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+    # Only add impersonate_user header if provided
+    if impersonate_user:
+        headers["impersonate_user"] = impersonate_user
+        logger.debug(f"Adding impersonate_user header: {impersonate_user}")
+    else:
+        logger.debug("No impersonate_user header added")
+
+    return MappingProxyType(headers)
+
+@lru_cache(maxsize=16)
+def _graphql_url(graphql_version: str) -> str:
+    """
+    Build the GraphQL endpoint URL for an API version.
+
+    Cached per version: the base URL comes from the environment, which is fixed for the
+    process lifetime. A missing OMADA_BASE_URL raises and is not cached.
+
+    Args:
+        graphql_version: GraphQL API version (e.g., "3.0", "1.1")
+
+    Returns:
+        Full GraphQL endpoint URL
+    """
+    return f"{_get_omada_base_url()}/api/Domain/{graphql_version}"
+
 async def _prepare_graphql_request(impersonate_user: str, graphql_version: str = None, bearer_token: str = None):
     """
     Prepare common GraphQL request components (URL, headers, token).
@@ -1438,30 +1609,17 @@ async def _prepare_graphql_request(impersonate_user: str, graphql_version: str =
     logger.debug(f"Full bearer_token parameter: {bearer_token}")
     logger.debug(f"Clean token (after strip): {token}")
 
-    # Get base URL using helper function (no parameter needed, will read from env)
-    omada_base_url = _get_omada_base_url()
-
     # Get GraphQL endpoint version from parameter, environment, or default to 3.0
     if not graphql_version:
         graphql_version = os.getenv("GRAPHQL_ENDPOINT_VERSION", "3.0")
-    graphql_url = f"{omada_base_url}/api/Domain/{graphql_version}"
-
-    # Prepare headers
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-    }
+    graphql_url = _graphql_url(graphql_version)
 
-    # Only add impersonate_user header if provided
-    if impersonate_user:
-        headers["impersonate_user"] = impersonate_user
-        logger.debug(f"Adding impersonate_user header: {impersonate_user}")
-    else:
-        logger.debug("No impersonate_user header added")
+    # Reuse the cached per-user base headers; only the Authorization value varies per call
+    headers = _graphql_base_headers(impersonate_user) | {"Authorization": f"Bearer {token}"}
 
     return graphql_url, headers, token
 
+@lru_cache(maxsize=128)
 def _extract_user_identity_from_token(bearer_token: str) -> str:
     """
     Extract user identity from JWT bearer token for cache keying.
@@ -1469,6 +1627,9 @@ def _extract_user_identity_from_token(bearer_token: str) -> str:
     This ensures cache entries are user-specific, preventing users from
     accessing each other's cached data.
 
+    Memoized per token: a token is reused for many calls during its lifetime,
+    and its claims never change, so the base64/JSON decode only runs once.
+
     Args:
         bearer_token: JWT bearer token
 
@@ -1522,6 +1683,11 @@ def _extract_user_identity_from_token(bearer_token: str) -> str:
         token = bearer_token.replace("Bearer ", "").replace("bearer ", "").strip()
         return hashlib.sha256(token.encode()).hexdigest()[:16]
 
+# Per-cache-key locks held while a cache miss is being filled, and how many callers
+# currently hold or wait on each one (the lock is dropped when that count reaches zero)
+_CACHE_FILL_LOCKS: Dict[str, asyncio.Lock] = {}
+_CACHE_FILL_WAITERS: Dict[str, int] = {}
+
 async def _execute_graphql_request_cached(query: str, impersonate_user: str,
                                           variables: dict = None, graphql_version: str = None,
                                           bearer_token: str = None, use_cache: bool = True) -> dict:
@@ -1569,17 +1735,45 @@ async def _execute_graphql_request_cached(query: str, impersonate_user: str,
             # Cache HIT - return cached data (logging happens in cache.get())
             return cached_result
 
-    # Cache MISS or caching disabled - execute the actual request
-    result = await _execute_graphql_request(
-        query, impersonate_user, variables, graphql_version, bearer_token
-    )
+    # Get TTL based on query content (0 means the result is never stored)
+    ttl = get_ttl_for_operation(query, is_mutation) if should_use_cache else 0
+
+    if ttl > 0:
+        # Cache MISS - fill it under a per-key lock so concurrent identical calls
+        # (e.g. chained tool calls for the same user) share one upstream request
+        fill_key = cache.generate_cache_key(endpoint, cache_params)
+        fill_lock = _CACHE_FILL_LOCKS.get(fill_key)
+        if fill_lock is None:
+            fill_lock = _CACHE_FILL_LOCKS[fill_key] = asyncio.Lock()
+        _CACHE_FILL_WAITERS[fill_key] = _CACHE_FILL_WAITERS.get(fill_key, 0) + 1
+        try:
+            async with fill_lock:
+                # Another caller may have filled the entry while we waited
+                cached_result = cache.get(endpoint, cache_params)
+                if cached_result:
+                    return cached_result
+                result = await _execute_graphql_request(
+                    query, impersonate_user, variables, graphql_version, bearer_token
+                )
 
-    # Store successful results in cache
-    if should_use_cache and result.get("success"):
-        # Get TTL based on query content
-        ttl = get_ttl_for_operation(query, is_mutation)
-        if ttl > 0:
-            cache.set(endpoint, cache_params, result, ttl)
+                # Store successful results in cache
+                if result.get("success"):
+                    cache.set(endpoint, cache_params, result, ttl)
+        finally:
+            # Drop the lock once no caller holds or waits on it. Lock.locked() can't tell:
+            # it is already False right after release while waiters are still queued.
+            waiters = _CACHE_FILL_WAITERS[fill_key] - 1
+            if waiters:
+                _CACHE_FILL_WAITERS[fill_key] = waiters
+            else:
+                del _CACHE_FILL_WAITERS[fill_key]
+                if _CACHE_FILL_LOCKS.get(fill_key) is fill_lock:
+                    del _CACHE_FILL_LOCKS[fill_key]
+    else:
+        # Caching disabled or not cacheable - execute the actual request
+        result = await _execute_graphql_request(
+            query, impersonate_user, variables, graphql_version, bearer_token
+        )
 
     # Add cache metadata to result
     result["_cache_metadata"] = {
@@ -1590,6 +1784,84 @@ async def _execute_graphql_request_cached(query: str, impersonate_user: str,
 
     return result
 
+def _graphql_retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    """
+    Seconds to wait before retrying a GraphQL request.
+
+    Honors a numeric Retry-After header, otherwise uses full-jitter exponential backoff.
+
+    Args:
+        attempt: Zero-based index of the attempt that just failed
+        response: The retryable response, or None after a transport error
+
+    Returns:
+        float: Delay in seconds
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form - fall back to backoff
+    return random.uniform(0, 0.5 * (2 ** attempt))
+
+async def _post_graphql_with_retry(graphql_url: str, payload: dict, headers: dict,
+                                   impersonate_user: str, is_mutation: bool) -> httpx.Response:
+    """
+    POST a GraphQL payload, retrying transient failures (429/502/503/504 and transport errors).
+
+    Mutations are only retried when the request provably never reached Omada
+    (429/503 or a failed connection), so an access request is never submitted twice.
+
+    Args:
+        graphql_url: GraphQL endpoint URL
+        payload: Request payload (query and optional variables)
+        headers: Request headers
+        impersonate_user: User to impersonate (keys the in-flight limit)
+        is_mutation: Whether the payload is a mutation
+
+    Returns:
+        httpx.Response: The final response (possibly a retryable status once the budget is spent)
+
+    Raises:
+        httpx.TransportError if the last attempt failed at the transport level
+    """
+    deadline = time.monotonic() + GRAPHQL_RETRY_BUDGET_SECONDS
+    retry_statuses = GRAPHQL_MUTATION_RETRY_STATUSES if is_mutation else GRAPHQL_RETRY_STATUSES
+
+    for attempt in range(GRAPHQL_MAX_ATTEMPTS):
+        is_last_attempt = attempt == GRAPHQL_MAX_ATTEMPTS - 1
+        remaining = max(deadline - time.monotonic(), 1.0)
+        response, error = None, None
+
+        try:
+            async with _USER_SEMAPHORES[impersonate_user or ""]:
+                response = await http_client.post(
+                    graphql_url, json=payload, headers=headers,
+                    timeout=httpx.Timeout(remaining, connect=min(10.0, remaining))
+                )
+        except httpx.TransportError as e:
+            never_sent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+            if is_last_attempt or (is_mutation and not never_sent):
+                raise
+            error = e
+        else:
+            if is_last_attempt or response.status_code not in retry_statuses:
+                return response
+
+        delay = _graphql_retry_delay(attempt, response)
+        if time.monotonic() + delay >= deadline:
+            # Out of budget - surface what we have rather than overrun the timeout
+            if response is None:
+                raise error
+            return response
+
+        reason = f"status {response.status_code}" if response is not None else type(error).__name__
+        logger.warning(f"GraphQL request to {graphql_url} failed with {reason}; retrying in {delay:.2f}s "
+                       f"(attempt {attempt + 2}/{GRAPHQL_MAX_ATTEMPTS})")
+        await asyncio.sleep(delay)
+
 @with_function_logging
 async def _execute_graphql_request(query: str, impersonate_user: str,
                                  variables: dict = None, graphql_version: str = None,
@@ -1618,36 +1890,43 @@ async def _execute_graphql_request(query: str, impersonate_user: str,
         if variables:
             payload["variables"] = variables
 
-        logger.debug(f"GraphQL Request to {graphql_url} with impersonation of {impersonate_user}")
+        logger.debug("GraphQL Request to %s with impersonation of %s", graphql_url, impersonate_user)
 
         # Log the payload in a readable format without escaped newlines
         logger.debug("Request JSON Payload (BEFORE web service POST):")
-        logger.debug(f"Query:\n{query}")
-        if variables:
-            logger.debug(f"Variables: {json.dumps(variables, indent=2)}")
+        logger.debug("Query:\n%s", query)
+        if variables and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Variables: %s", orjson.dumps(variables, option=orjson.OPT_INDENT_2).decode())
+
+        # Execute request using shared optimized client (bounded per user, retried on transient failures)
+        response = await _post_graphql_with_retry(
+            graphql_url, payload, headers, impersonate_user,
+            is_mutation="mutation" in query.lower()
+        )
 
-        # Execute request using shared optimized client
-        response = await http_client.post(graphql_url, json=payload, headers=headers, timeout=30.0)
+        # Read the body once: parse JSON straight from the bytes, decode text once for debugging
+        body = response.content
+        parsed = orjson.loads(body) if response.status_code == 200 else None
 
-        # Capture raw HTTP details for debugging
-        raw_request_body = json.dumps(payload, indent=2)
-        raw_response_body = response.text
-        response_json = json.dumps(response.json() if response.status_code == 200 else {'error': raw_response_body}, indent=2)
-        logger.debug(f"GraphQL Response (status {response.status_code}): {response_json}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"GraphQL Response (status {response.status_code}): {response.text}")
 
         # Build common response fields
         result = {
             "success": response.status_code == 200,
             "status_code": response.status_code,
-            "endpoint": graphql_url,
-            "raw_request_body": raw_request_body,
-            "raw_response_body": raw_response_body,
-            "request_headers": dict(headers)
+            "endpoint": graphql_url
         }
 
+        # Capture raw HTTP details only when OMADA_DEBUG_HTTP=1
+        if DEBUG_HTTP:
+            result["raw_request_body"] = orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
+            result["raw_response_body"] = response.text
+            result["request_headers"] = headers
+
         # Add status-specific fields
         if response.status_code == 200:
-            result["data"] = response.json()
+            result["data"] = parsed
         else:
             result["error"] = response.text
 
@@ -1660,10 +1939,54 @@ async def _execute_graphql_request(query: str, impersonate_user: str,
             "error_type": type(e).__name__
         }
 
+# Allowed values for enum-like tool parameters. Membership checks use the frozensets;
+# the joined strings (in documented order) are built once for the error messages.
+_FILTER_OPERATORS = ("CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY")
+_VALID_FILTER_OPERATORS = frozenset(_FILTER_OPERATORS)
+_VALID_FILTER_OPERATORS_STR = ", ".join(_FILTER_OPERATORS)
+
+_ASSIGNMENT_SORT_OPTIONS = (
+    "RESOURCE_NAME", "IDENTITY_NAME", "ACCOUNT_NAME", "RESOURCE_TYPE",
+    "COMPLIANCE_STATUS", "SYSTEM_NAME", "VALID_FROM", "VALID_TO",
+    "DISABLED", "VIOLATION_STATUS"
+)
+_VALID_ASSIGNMENT_SORT_OPTIONS = frozenset(_ASSIGNMENT_SORT_OPTIONS)
+_VALID_ASSIGNMENT_SORT_OPTIONS_STR = ", ".join(_ASSIGNMENT_SORT_OPTIONS)
+
+_WORKFLOW_STEPS = ("ManagerApproval", "ResourceOwnerApproval", "SystemOwnerApproval")
+_VALID_WORKFLOW_STEPS = frozenset(_WORKFLOW_STEPS)
+_VALID_WORKFLOW_STEPS_STR = ", ".join(_WORKFLOW_STEPS)
+
+_DECISIONS = ("APPROVE", "REJECT")
+_VALID_DECISIONS = frozenset(_DECISIONS)
+_VALID_DECISIONS_STR = ", ".join(_DECISIONS)
+
+# Selection set shared by the single and batched access request queries
+_ACCESS_REQUEST_SELECTION = """{
+    total
+    data {
+      id
+      beneficiary {
+        id
+        identityId
+        displayName
+        contexts {
+          id
+        }
+      }
+      resource {
+        name
+      }
+      status {
+        approvalStatus
+      }
+    }
+  }"""
+
 @with_function_logging
 @mcp.tool()
 async def get_access_requests(impersonate_user: str, bearer_token: str, filter_field: str = None, filter_value: str = None,
-                              summary_mode: bool = True, use_cache: bool = True) -> str:
+                              summary_mode: bool = True, use_cache: bool = True, filter_values: list[str] = None) -> str:
     """Get access requests from Omada GraphQL API using user impersonation.
 
     Args:
@@ -1674,15 +1997,25 @@ async def get_access_requests(impersonate_user: str, bearer_token: str, filter_f
                      If False, returns all fields
         bearer_token: Optional bearer token to use instead of acquiring a new one
         use_cache: Whether to use cache for this request (default: True)
+        filter_values: Optional list of filter values for filter_field (e.g., several beneficiary IDs).
+                      All values are fetched in ONE GraphQL call and the results are grouped by value.
+                      Use this instead of calling get_access_requests once per value.
 
     Returns:
         JSON string containing access requests data
+        (with filter_values: data.access_requests_by_filter maps each value to its requests)
     """
     # PERFORMANCE TIMING: Record start time
     start_time = datetime.now()
     logger.info(f"TOOL START - get_access_requests called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
 
     try:
+        # Batched form: one aliased sub-query per value, all sent in a single request
+        if filter_field and filter_values:
+            return await _get_access_requests_batch(
+                impersonate_user, bearer_token, filter_field, filter_values, summary_mode, use_cache
+            )
+
         logger.debug(f"Getting access requests for user: {impersonate_user}, filter: {filter_field}={filter_value if filter_field else 'none'}")
 
         # Build filter clause conditionally
@@ -1690,26 +2023,7 @@ async def get_access_requests(impersonate_user: str, bearer_token: str, filter_f
 
         # Build GraphQL query with optional filter
         query = f"""query GetAccessRequests {{
-  accessRequests{filter_clause} {{
-    total
-    data {{
-      id
-      beneficiary {{
-        id
-        identityId
-        displayName
-        contexts {{
-          id
-        }}
-      }}
-      resource {{
-        name
-      }}
-      status {{
-        approvalStatus
-      }}
-    }}
-  }}
+  accessRequests{filter_clause} {_ACCESS_REQUEST_SELECTION}
 }}"""
 
         # Execute GraphQL request WITH CACHING
@@ -1765,119 +2079,129 @@ async def get_access_requests(impersonate_user: str, bearer_token: str, filter_f
         elapsed_time = (end_time - start_time).total_seconds()
         logger.info(f"TOOL END - get_access_requests | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
-@with_function_logging
-@mcp.tool()
-async def create_access_request(impersonate_user: str, bearer_token: str, reason: str, context: str,
-                              resources: str, valid_from: str = None, valid_to: str = None) -> str:
-    """Create an access request using GraphQL mutation.
-
-    IMPORTANT: This function requires 4 mandatory parameters. If any are missing,
-    you MUST prompt the user to provide them before calling this function.
-    The identity ID is automatically fetched using the impersonate_user email.
 
-    REQUIRED PARAMETERS (prompt user if missing):
-        impersonate_user: Email address of the user to impersonate (e.g., user@domain.com)
-                         PROMPT: "Please provide the email address to impersonate"
-                         NOTE: This email will be used to automatically lookup the identity ID
+async def _get_access_requests_batch(impersonate_user: str, bearer_token: str, filter_field: str,
+                                     filter_values: list, summary_mode: bool, use_cache: bool) -> str:
+    """
+    Fetch access requests for several filter values in a single GraphQL call.
 
-        reason: Reason for the access request (cannot be empty)
-                PROMPT: "Please provide a reason for this access request"
+    Each value becomes an aliased accessRequests sub-query (r0, r1, ...) so N values
+    cost one HTTP round-trip instead of N tool invocations.
 
-        context: Business context ID for the access request (cannot be empty)
-                IMPORTANT WORKFLOW: When the user needs to provide a context:
-                1. First, lookup the user's identity ID using their email with query_omada_identity
-                2. Then call get_identity_contexts(identity_id, impersonate_user, bearer_token)
-                   to retrieve available contexts for this user
-                3. Display the available contexts to the user with their displayName and type
-                   (e.g., "Personal", "Finance Department")
-                4. Ask the user to select a context from the displayed list
-                5. Use the corresponding context "id" (GUID) value as the context parameter
+    Args:
+        impersonate_user: Email address of the user to impersonate
+        bearer_token: Bearer token for authentication
+        filter_field: Filter field name applied to every value
+        filter_values: Filter values to fetch
+        summary_mode: If True, returns only key fields
+        use_cache: Whether to use cache for this request
 
-                EXAMPLE:
-                "I found these contexts for you:
-                 1. Personal (PERSONAL)
-                 2. Finance Department (ORGANIZATIONAL)
+    Returns:
+        JSON string with access requests grouped by filter value
+    """
+    # De-duplicate while preserving order so each value is fetched once
+    values = list(dict.fromkeys(str(value) for value in filter_values))
+    logger.debug(f"Getting access requests for user: {impersonate_user}, batched filter: {filter_field} in {values}")
 
-                 Which context would you like to use for this access request?"
+    sub_queries = "\n".join(
+        f"  r{index}: accessRequests(filters: {{{filter_field}: {json.dumps(value)}}}) {_ACCESS_REQUEST_SELECTION}"
+        for index, value in enumerate(values)
+    )
+    query = f"""query GetAccessRequestsBatch {{
+{sub_queries}
+}}"""
 
-                NOTE: The context parameter expects the internal GUID id, not the displayName.
-                      You must call get_identity_contexts first to get valid context IDs.
+    result = await _execute_graphql_request_cached(query, impersonate_user, bearer_token=bearer_token, use_cache=use_cache)
 
-        resources: Resources to request access for (JSON object format, cannot be empty)
-                  WORKFLOW: When the user needs to provide resources:
-                  1. Call get_resources_for_beneficiary(identity_id, impersonate_user, bearer_token)
-                     to get available resources the user can request
-                  2. Display the resources with their names and systems
-                  3. Ask the user to select a resource
-                  4. Use the resource "id" (GUID) in JSON format: {"id": "resource-guid"}
+    if not result["success"]:
+        return build_error_response(
+            error_type=result.get("error_type", "GraphQLError"),
+            result=result,
+            message=f"GraphQL request failed with status {result.get('status_code', 'unknown')}",
+            impersonated_user=impersonate_user
+        )
 
-                  PROMPT: "Please provide the resource in JSON object format like: {\"id\": \"resource-id\"}"
+    data = result["data"]
+    if not data.get("data"):
+        return build_error_response(
+            error_type="DataError",
+            message="No access requests data found in response",
+            impersonated_user=impersonate_user,
+            raw_response=data
+        )
 
-    Optional parameters:
-        valid_from: Optional valid from date/time (ISO format)
-        valid_to: Optional valid to date/time (ISO format)
-        bearer_token: Optional bearer token to use instead of acquiring a new one
+    # Group the aliased results back under their filter value
+    grouped = {}
+    totals = {}
+    for index, value in enumerate(values):
+        access_requests_obj = data["data"].get(f"r{index}") or {}
+        access_requests = access_requests_obj.get("data", [])
+        grouped[value] = _summarize_graphql_data(access_requests, "AccessRequest") if summary_mode else access_requests
+        totals[value] = access_requests_obj.get("total", 0)
+
+    return build_success_response(
+        data={"access_requests_by_filter": grouped},
+        endpoint=result["endpoint"],
+        impersonated_user=impersonate_user,
+        total_requests=sum(totals.values()),
+        totals_by_filter=totals,
+        requests_returned=sum(len(requests) for requests in grouped.values()),
+        filter_applied=f"{filter_field} in {values}",
+        summary_mode=summary_mode
+    )
 
-    Logging:
-        Log level controlled by LOG_LEVEL_create_access_request in .env file
-        Falls back to global LOG_LEVEL if not set
+async def create_access_request_dict(impersonate_user: str, bearer_token: str, reason: str, context: str,
+                                     resources: str, valid_from: str = None, valid_to: str = None) -> dict:
+    """
+    Create an access request and return the response as a dict.
 
-    Returns:
-        JSON string containing the created access request ID or error information
+    Holds the logic behind the create_access_request tool, which serializes the result
+    only at the MCP boundary; test harnesses can use the dict directly without re-parsing.
+    Parameters are the same as create_access_request.
     """
     try:
         # Validate mandatory fields using helper
-        error = validate_required_fields(
+        missing_field = find_missing_field(
             impersonate_user=impersonate_user,
             reason=reason,
             context=context,
             resources=resources
         )
-        if error:
-            return error
+        if missing_field:
+            return build_error_dict("ValidationError", message=f"Missing required field: {missing_field}")
 
-        # Get identity ID from the impersonate_user email
+        # Get identity ID from the impersonate_user email (direct OData lookup, no tool round-trip)
         logger.debug(f"Looking up identity ID for email: {impersonate_user}")
-        identity_result = await query_omada_identity(
-            field_filters=[{"field": "EMAIL", "value": impersonate_user, "operator": "eq"}],
-            select_fields="UId",
-            top=1,
-            bearer_token=bearer_token
-        )
-
-        # Parse the identity lookup result
         try:
-            identity_data = json.loads(identity_result)
-            if identity_data.get("status") != "success" or not identity_data.get("data", {}).get("value"):
-                return build_error_response(
-                    error_type="IdentityLookupError",
-                    message=f"Could not find identity for email: {impersonate_user}",
-                    lookup_result=identity_data
-                )
-
-            identity_entity = identity_data["data"]["value"][0]
-            identity_id = str(identity_entity.get("UId"))
+            identity_entity = await _fetch_identity_by_email(impersonate_user, bearer_token)
+        except (AuthenticationError, ODataQueryError, OmadaServerError, httpx.RequestError) as e:
+            return build_error_dict(
+                error_type="IdentityLookupError",
+                message=f"Could not find identity for email: {impersonate_user}",
+                lookup_error=str(e)
+            )
 
-            if not identity_id:
-                return build_error_response(
-                    error_type="IdentityLookupError",
-                    message=f"Identity found but no ID available for email: {impersonate_user}",
-                    identity_data=identity_entity
-                )
+        if not identity_entity:
+            return build_error_dict(
+                error_type="IdentityLookupError",
+                message=f"Could not find identity for email: {impersonate_user}"
+            )
 
-            logger.debug(f"Found identity ID: {identity_id} for {impersonate_user}")
+        identity_id = str(identity_entity.get("UId") or "")
 
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
-            return build_error_response(
-                error_type="IdentityLookupParseError",
-                message=f"Failed to parse identity lookup result: {str(e)}",
-                raw_result=identity_result
+        if not identity_id:
+            return build_error_dict(
+                error_type="IdentityLookupError",
+                message=f"Identity found but no ID available for email: {impersonate_user}",
+                identity_data=identity_entity
             )
 
+        logger.debug(f"Found identity ID: {identity_id} for {impersonate_user}")
+
         # Build the GraphQL mutation with template variables filled in
-        valid_from_clause = f'validFrom: "{valid_from}",' if valid_from else ''
-        valid_to_clause = f'validTo: "{valid_to}",' if valid_to else ''
-        context_clause = f'context: "{context}",'
+        valid_from_clause = f'validFrom: {_gql_str(valid_from)},' if valid_from else ''
+        valid_to_clause = f'validTo: {_gql_str(valid_to)},' if valid_to else ''
+        context_clause = f'context: {_gql_str(context)},'
 
         # Convert resources from JSON format to GraphQL syntax
         # JSON: {"id": "123"} -> GraphQL: {id: "123"}
@@ -1885,7 +2209,7 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
             resources_graphql = json_to_graphql_syntax(resources)
             logger.debug(f"Converted resources from JSON to GraphQL syntax: {resources} -> {resources_graphql}")
         except ValueError as e:
-            return build_error_response(
+            return build_error_dict(
                 error_type="ResourcesFormatError",
                 message=f"Invalid resources format: {str(e)}. Expected JSON object format like: {{'id': 'resource-id'}}",
                 provided_resources=resources
@@ -1893,11 +2217,11 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
 
         mutation = f"""mutation CreateAccessRequest {{
     createAccessRequest(accessRequest: {{
-        reason: "{reason}",
+        reason: {_gql_str(reason)},
         {valid_from_clause}
         {valid_to_clause}
         {context_clause}
-        identities: {{id: "{identity_id}"}},
+        identities: {{id: {_gql_str(identity_id)}}},
         resources: {resources_graphql}
         }})
     {{
@@ -1929,39 +2253,46 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
             bearer_token=bearer_token
         )
 
+        # Raw HTTP details attached to every response below (empty unless OMADA_DEBUG_HTTP=1)
+        http_debug = {
+            "http_debug": {
+                "raw_request_body": result.get("raw_request_body"),
+                "raw_response_body": result.get("raw_response_body"),
+                "request_headers": result.get("request_headers")
+            }
+        } if DEBUG_HTTP else {}
+
         if result["success"]:
             data = result["data"]
 
-            # Debug: Print the actual response structure
-            logger.debug(f"GraphQL Response Data Structure: {json.dumps(data, indent=2)}")
+            # Debug: Print the actual response structure (skip the dump entirely unless DEBUG is on)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("GraphQL Response Data Structure: %s", dumps_json(data))
 
             # Check if mutation was successful and extract the created access request ID
             if "data" in data and "createAccessRequest" in data["data"]:
                 create_request_response = data["data"]["createAccessRequest"]
-                logger.debug(f"CreateAccessRequest Response: {json.dumps(create_request_response, indent=2)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("CreateAccessRequest Response: %s", dumps_json(create_request_response))
 
                 # Handle both single object and array responses
                 if isinstance(create_request_response, list):
                     if len(create_request_response) > 0:
                         access_request_data = create_request_response[0]
                     else:
-                        return build_error_response(
+                        return build_error_dict(
                             error_type="EmptyResponse",
                             message="Empty response from createAccessRequest",
                             impersonated_user=impersonate_user,
                             raw_response=data,
-                            http_debug={
-                                "raw_request_body": result.get("raw_request_body"),
-                                "raw_response_body": result.get("raw_response_body"),
-                                "request_headers": result.get("request_headers")
-                            }
+                            **http_debug
                         )
                 else:
                     access_request_data = create_request_response
 
                 access_request_id = access_request_data.get("id")
 
-                return build_success_response(
+                return build_success_dict(
                     data={
                         "access_request_details": {
                             "id": access_request_id,
@@ -1979,11 +2310,7 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
                             "valid_to": valid_to,
                             "context": context
                         },
-                        "http_debug": {
-                            "raw_request_body": result.get("raw_request_body"),
-                            "raw_response_body": result.get("raw_response_body"),
-                            "request_headers": result.get("request_headers")
-                        }
+                        **http_debug
                     },
                     endpoint=result["endpoint"],
                     message="Access request created successfully",
@@ -1993,21 +2320,17 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
             elif "errors" in data:
                 # Handle GraphQL errors
                 # Log the error details for debugging
-                logger.error(f"GraphQL mutation returned errors: {json.dumps(data['errors'], indent=2)}")
+                logger.error("GraphQL mutation returned errors: %s", dumps_json(data['errors']))
                 logger.error(f"Raw Request Body:\n{result.get('raw_request_body', 'N/A')}")
                 logger.error(f"Raw Response Body:\n{result.get('raw_response_body', 'N/A')}")
 
-                return build_error_response(
+                return build_error_dict(
                     error_type="GraphQLError",
                     message="GraphQL mutation failed",
                     impersonated_user=impersonate_user,
                     errors=data["errors"],
                     endpoint=result["endpoint"],
-                    http_debug={
-                        "raw_request_body": result.get("raw_request_body"),
-                        "raw_response_body": result.get("raw_response_body"),
-                        "request_headers": result.get("request_headers")
-                    }
+                    **http_debug
                 )
             else:
                 # Log the unexpected response for debugging
@@ -2015,16 +2338,12 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
                 logger.error(f"Raw Request Body:\n{result.get('raw_request_body', 'N/A')}")
                 logger.error(f"Raw Response Body:\n{result.get('raw_response_body', 'N/A')}")
 
-                return build_error_response(
+                return build_error_dict(
                     error_type="UnexpectedResponse",
                     message="Unexpected response format",
                     impersonated_user=impersonate_user,
                     raw_response=data,
-                    http_debug={
-                        "raw_request_body": result.get("raw_request_body"),
-                        "raw_response_body": result.get("raw_response_body"),
-                        "request_headers": result.get("request_headers")
-                    }
+                    **http_debug
                 )
         else:
             # Handle HTTP request failure using helper
@@ -2033,20 +2352,16 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
             logger.error(f"Raw Request Body:\n{result.get('raw_request_body', 'N/A')}")
             logger.error(f"Raw Response Body:\n{result.get('raw_response_body', 'N/A')}")
 
-            return build_error_response(
+            return build_error_dict(
                 error_type=result.get("error_type", "GraphQLError"),
                 result=result,
                 message=f"GraphQL request failed with status {result.get('status_code', 'unknown')}",
                 impersonated_user=impersonate_user,
-                http_debug={
-                    "raw_request_body": result.get("raw_request_body"),
-                    "raw_response_body": result.get("raw_response_body"),
-                    "request_headers": result.get("request_headers")
-                }
+                **http_debug
             )
 
     except Exception as e:
-        return build_error_response(
+        return build_error_dict(
             error_type=type(e).__name__,
             message=f"Error creating access request: {str(e)}",
             impersonated_user=impersonate_user
@@ -2054,6 +2369,109 @@ async def create_access_request(impersonate_user: str, bearer_token: str, reason
 
 @with_function_logging
 @mcp.tool()
+async def create_access_request(impersonate_user: str, bearer_token: str, reason: str, context: str,
+                              resources: str, valid_from: str = None, valid_to: str = None) -> str:
+    """Create an access request using GraphQL mutation.
+
+    IMPORTANT: This function requires 4 mandatory parameters. If any are missing,
+    you MUST prompt the user to provide them before calling this function.
+    The identity ID is automatically fetched using the impersonate_user email.
+
+    REQUIRED PARAMETERS (prompt user if missing):
+        impersonate_user: Email address of the user to impersonate (e.g., user@domain.com)
+                         PROMPT: "Please provide the email address to impersonate"
+                         NOTE: This email will be used to automatically lookup the identity ID
+
+        reason: Reason for the access request (cannot be empty)
+                PROMPT: "Please provide a reason for this access request"
+
+        context: Business context ID for the access request (cannot be empty)
+                IMPORTANT WORKFLOW: When the user needs to provide a context:
+                1. First, lookup the user's identity ID using their email with query_omada_identity
+                2. Then call get_identity_contexts(identity_id, impersonate_user, bearer_token)
+                   to retrieve available contexts for this user
+                3. Display the available contexts to the user with their displayName and type
+                   (e.g., "Personal", "Finance Department")
+                4. Ask the user to select a context from the displayed list
+                5. Use the corresponding context "id" (GUID) value as the context parameter
+
+                EXAMPLE:
+                "I found these contexts for you:
+                 1. Personal (PERSONAL)
+                 2. Finance Department (ORGANIZATIONAL)
+
+                 Which context would you like to use for this access request?"
+
+                NOTE: The context parameter expects the internal GUID id, not the displayName.
+                      You must call get_identity_contexts first to get valid context IDs.
+
+        resources: Resources to request access for (JSON object format, cannot be empty)
+                  WORKFLOW: When the user needs to provide resources:
+                  1. Call get_resources_for_beneficiary(identity_id, impersonate_user, bearer_token)
+                     to get available resources the user can request
+                  2. Display the resources with their names and systems
+                  3. Ask the user to select a resource
+                  4. Use the resource "id" (GUID) in JSON format: {"id": "resource-guid"}
+
+                  PROMPT: "Please provide the resource in JSON object format like: {\"id\": \"resource-id\"}"
+
+    Optional parameters:
+        valid_from: Optional valid from date/time (ISO format)
+        valid_to: Optional valid to date/time (ISO format)
+        bearer_token: Optional bearer token to use instead of acquiring a new one
+
+    Logging:
+        Log level controlled by LOG_LEVEL_create_access_request in .env file
+        Falls back to global LOG_LEVEL if not set
+
+    Returns:
+        JSON string containing the created access request ID or error information
+    """
+    return dumps_json(await create_access_request_dict(
+        impersonate_user, bearer_token, reason, context, resources, valid_from, valid_to
+    ))
+
+# MCP description for the get_requestable_resources alias. mcp.tool() returns the
+# function unchanged, so stacking two registrations exposes one coroutine under both names
+_REQUESTABLE_RESOURCES_DESCRIPTION = """Get resources that a user can request access to (alias for get_resources_for_beneficiary).
+
+EASY-TO-USE function for ACCESS REQUEST workflows - no need to spell "beneficiary"!
+
+USE THIS when user wants to:
+- List resources they can request
+- Find what resources are available for access request
+- See requestable resources for a user
+
+CRITICAL - Identity ID Field Name:
+    WRONG: Do NOT use the "Id" field (e.g., 1006715) - this is the integer database ID
+    CORRECT: Use the "UId" field (e.g., "2c68e1df-1335-4e8c-8ef9-eff1d2005629") - this is the 32-character UUID
+
+    When you query an Identity record, it returns BOTH fields:
+    - "Id": 1006715          <- WRONG - Do not use this!
+    - "UId": "2c68e1df-..."  <- CORRECT - Use this as identity_id!
+
+    YOU MUST extract the "UId" field (32-character UUID), NOT the "Id" field (integer).
+
+REQUIRED:
+    identity_id: The user's identity UId (32-character UUID from the "UId" field, NOT the "Id" field!)
+                CORRECT example: "2c68e1df-1335-4e8c-8ef9-eff1d2005629" (UId field)
+                WRONG example: 1006715 (Id field - this will fail!)
+    impersonate_user: Email address to impersonate (e.g., "ROBWOL@54MV4C.ONMICROSOFT.COM")
+
+OPTIONAL:
+    system_id: Filter by specific system
+    context_id: Filter by specific context
+    resource_name: Resource name to filter by (string, partial match supported)
+                  Example: "Sales" will match "Sales Team Access", "Sales Reports", etc.
+    bearer_token: Optional bearer token to use instead of acquiring a new one
+
+Returns:
+    JSON response with list of requestable resources
+"""
+
+@with_function_logging
+@mcp.tool(name="get_requestable_resources", description=_REQUESTABLE_RESOURCES_DESCRIPTION)
+@mcp.tool()
 async def get_resources_for_beneficiary(identity_id: str, impersonate_user: str, bearer_token: str,
                                        system_id: str = None, context_id: str = None,
                                        resource_name: str = None) -> str:
@@ -2127,20 +2545,21 @@ async def get_resources_for_beneficiary(identity_id: str, impersonate_user: str,
             )
 
         # Build the filters object dynamically based on provided parameters
-        filters = f'beneficiaryIds: "{identity_id}"'
+        filter_parts = [f'beneficiaryIds: {_gql_str(identity_id)}']
 
         if system_id and system_id.strip():
-            filters += f', systemId: "{system_id}"'
+            filter_parts.append(f'systemId: {_gql_str(system_id)}')
 
         if context_id and context_id.strip():
-            filters += f', contextId: "{context_id}"'
+            filter_parts.append(f'contextId: {_gql_str(context_id)}')
 
         # Add resource_name filter if provided (validates and adds to GraphQL filter)
         if resource_name and resource_name.strip():
-            # Escape any quotes in the resource name to prevent GraphQL injection
-            escaped_resource_name = resource_name.strip().replace('"', '\\"')
-            filters += f', name: "{escaped_resource_name}"'
-            logger.debug(f"Added resource_name filter: {escaped_resource_name}")
+            # Encode as a GraphQL string literal to prevent GraphQL injection
+            filter_parts.append(f'name: {_gql_str(resource_name.strip())}')
+            logger.debug(f"Added resource_name filter: {resource_name.strip()}")
+
+        filters = ", ".join(filter_parts)
 
         # Build GraphQL query with the filters
         query = f"""query GetResourcesForBeneficiary {{
@@ -2173,9 +2592,9 @@ async def get_resources_for_beneficiary(identity_id: str, impersonate_user: str,
         if result["success"]:
             data = result["data"]
             # Extract resources from the GraphQL response
-            if ('data' in data and 'accessRequestComponents' in data['data']):
-                access_request_components = data['data']['accessRequestComponents']
-                resources = access_request_components.get('resources', {}).get('data', [])
+            components = (data.get('data') or _EMPTY).get('accessRequestComponents')
+            if components is not None:
+                resources = (components.get('resources') or _EMPTY).get('data') or ()
 
                 return build_success_response(
                     data=resources,
@@ -2218,72 +2637,137 @@ async def get_resources_for_beneficiary(identity_id: str, impersonate_user: str,
         logger.info(f"TOOL END - get_resources_for_beneficiary | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
 
-@with_function_logging
-@mcp.tool()
-async def get_requestable_resources(identity_id: str, impersonate_user: str, bearer_token: str,
-                                   system_id: str = None, context_id: str = None,
-                                   resource_name: str = None) -> str:
-    """
-    Get resources that a user can request access to (alias for get_resources_for_beneficiary).
+# get_requestable_resources is a true alias: the same coroutine is registered under
+# both MCP tool names, so an alias call no longer pays for a second wrapper frame
+get_requestable_resources = get_resources_for_beneficiary
 
-    EASY-TO-USE function for ACCESS REQUEST workflows - no need to spell "beneficiary"!
 
-    USE THIS when user wants to:
-    - List resources they can request
-    - Find what resources are available for access request
-    - See requestable resources for a user
+# Identities-for-beneficiary query; $pagination is "" or a build_pagination_clause() fragment
+_QUERY_IDENTITIES_FOR_BENEFICIARY_TMPL = string.Template("""query GetIdentitiesForBeneficiary {
+  accessRequestComponents {
+    identities(
+      ${pagination}filters: {}
+    ) {
+      pages
+      total
+      data {
+        firstName
+        displayName
+        identityId
+        id
+        lastName
+        contexts {
+          id
+          displayName
+        }
+      }
+    }
+  }
+}""")
+_QUERY_IDENTITIES_FOR_BENEFICIARY = _QUERY_IDENTITIES_FOR_BENEFICIARY_TMPL.substitute(pagination="")
 
-    CRITICAL - Identity ID Field Name:
-        WRONG: Do NOT use the "Id" field (e.g., 1006715) - this is the integer database ID
-        CORRECT: Use the "UId" field (e.g., "2c68e1df-1335-4e8c-8ef9-eff1d2005629") - this is the 32-character UUID
+# Cursor (connection-style) variant: the server seeks from $after instead of scanning and
+# skipping page*rows rows. Not every Omada version exposes first/after/pageInfo here.
+_QUERY_IDENTITIES_FOR_BENEFICIARY_CURSOR = """query GetIdentitiesForBeneficiaryCursor($first: Int!, $after: String) {
+  accessRequestComponents {
+    identities(
+      first: $first, after: $after, filters: {}
+    ) {
+      total
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+      data {
+        firstName
+        displayName
+        identityId
+        id
+        lastName
+        contexts {
+          id
+          displayName
+        }
+      }
+    }
+  }
+}"""
 
-        When you query an Identity record, it returns BOTH fields:
-        - "Id": 1006715          <- WRONG - Do not use this!
-        - "UId": "2c68e1df-..."  <- CORRECT - Use this as identity_id!
+# Whether the connected Omada schema accepts the cursor query above, keyed by GraphQL version.
+# Probed on first cursor request and remembered for the life of the process.
+_CURSOR_PAGINATION_SUPPORTED: Dict[str, bool] = {}
 
-        YOU MUST extract the "UId" field (32-character UUID), NOT the "Id" field (integer).
 
-    REQUIRED:
-        identity_id: The user's identity UId (32-character UUID from the "UId" field, NOT the "Id" field!)
-                    CORRECT example: "2c68e1df-1335-4e8c-8ef9-eff1d2005629" (UId field)
-                    WRONG example: 1006715 (Id field - this will fail!)
-        impersonate_user: Email address to impersonate (e.g., "ROBWOL@54MV4C.ONMICROSOFT.COM")
+def _cursor_query_rejected(result: dict) -> bool:
+    """
+    Check whether a cursor query failed because the schema lacks the connection fields.
 
-    OPTIONAL:
-        system_id: Filter by specific system
-        context_id: Filter by specific context
-        resource_name: Resource name to filter by (string, partial match supported)
-                      Example: "Sales" will match "Sales Team Access", "Sales Reports", etc.
-        bearer_token: Optional bearer token to use instead of acquiring a new one
+    Args:
+        result: Result dict from _execute_graphql_request
 
     Returns:
-        JSON response with list of requestable resources
+        True if the server rejected the query document (400, or 200 with errors and no data)
     """
-    # PERFORMANCE TIMING: Record start time
-    start_time = datetime.now()
-    logger.info(f"TOOL START - get_requestable_resources called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
+    if not result.get("success"):
+        return result.get("status_code") == 400
+    data = result["data"] or {}
+    return bool(data.get("errors")) and not data.get("data")
 
-    try:
-        # This is just an alias that calls the main function
-        return await get_resources_for_beneficiary(
-            identity_id=identity_id,
-            impersonate_user=impersonate_user,
-            system_id=system_id,
-            context_id=context_id,
-            resource_name=resource_name,
-            bearer_token=bearer_token
+def _identities_cursor_response(result: dict, impersonate_user: str, first: int, after: str) -> str:
+    """
+    Build the get_identities_for_beneficiary response for a cursor-paginated query.
+
+    Args:
+        result: Result dict from _execute_graphql_request_cached
+        impersonate_user: Impersonated user email
+        first: Requested page size
+        after: Cursor the page was read from (None for the first page)
+
+    Returns:
+        JSON response string
+    """
+    if not result["success"]:
+        return build_error_response(
+            error_type=result.get("error_type", "GraphQLError"),
+            result=result,
+            impersonated_user=impersonate_user
         )
-    finally:
-        # PERFORMANCE TIMING: Calculate and log execution time
-        end_time = datetime.now()
-        elapsed_time = (end_time - start_time).total_seconds()
-        logger.info(f"TOOL END - get_requestable_resources | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
+    data = result["data"]
+    components = (data.get('data') or _EMPTY).get('accessRequestComponents')
+    if components is None:
+        return build_error_response(
+            error_type="NoIdentitiesFound",
+            message="No identities found in response",
+            impersonated_user=impersonate_user,
+            response=data
+        )
+
+    identities_obj = components.get('identities') or _EMPTY
+    identities = identities_obj.get('data') or ()
+    page_info = identities_obj.get('pageInfo') or _EMPTY
+
+    return build_success_response(
+        data=identities,
+        endpoint=result["endpoint"],
+        impersonated_user=impersonate_user,
+        pagination={
+            "mode": "cursor",
+            "first": first,
+            "after": after,
+            "end_cursor": page_info.get('endCursor'),
+            "has_next_page": page_info.get('hasNextPage', False),
+            "total_identities": identities_obj.get('total', len(identities))
+        },
+        identities_count=len(identities),
+        identities=identities
+    )
 
 @with_function_logging
 @mcp.tool()
 async def get_identities_for_beneficiary(impersonate_user: str, bearer_token: str,
-                                         page: int = None, rows: int = None) -> str:
+                                         page: int = None, rows: int = None,
+                                         first: int = None, after: str = None) -> str:
     """
     Get a list of identities available for access requests using Omada GraphQL API.
 
@@ -2307,6 +2791,13 @@ async def get_identities_for_beneficiary(impersonate_user: str, bearer_token: st
     Optional parameters:
         page: Page number for pagination (e.g., 1, 2, 3...)
         rows: Number of rows per page (e.g., 10, 20, 50...)
+        first: Cursor pagination - number of identities to return (preferred for large lists)
+        after: Cursor pagination - the "end_cursor" from the previous response (omit for the first page)
+
+    Cursor pagination is used when "first" is given and the Omada schema supports it; to get the
+    next page pass the returned pagination.end_cursor as "after" while pagination.has_next_page is true.
+    If the schema does not support cursors the call falls back to page/rows (page 1, rows=first)
+    and pagination.mode is "offset"; in that case a non-empty "after" returns a ValidationError.
 
     Returns:
         JSON response with identities data including pagination metadata or error message
@@ -2316,39 +2807,62 @@ async def get_identities_for_beneficiary(impersonate_user: str, bearer_token: st
     logger.info(f"TOOL START - get_identities_for_beneficiary called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
 
     # ENTRY LOGGING
-    logger.debug(f"DEBUG: ENTRY - get_identities_for_beneficiary(impersonate_user={impersonate_user}, page={page}, rows={rows})")
+    logger.debug("DEBUG: ENTRY - get_identities_for_beneficiary(impersonate_user=%s, page=%s, rows=%s, first=%s, after=%s)",
+                 impersonate_user, page, rows, first, after)
 
     try:
+        # Normalize once; the trimmed value is what gets validated and sent downstream
+        impersonate_user = (impersonate_user or "").strip()
+
         # Validate mandatory fields using helper
         error = validate_required_fields(impersonate_user=impersonate_user)
         if error:
             return error
 
-        # Build pagination clause using helper
-        pagination_clause = build_pagination_clause(page=page, rows=rows)
+        # Cursor pagination when requested and not already known to be unsupported
+        if first is not None:
+            version = os.getenv("GRAPHQL_ENDPOINT_VERSION", "3.0")
+            supported = _CURSOR_PAGINATION_SUPPORTED.get(version)
+            if supported is not False:
+                result = await _execute_graphql_request_cached(
+                    _QUERY_IDENTITIES_FOR_BENEFICIARY_CURSOR, impersonate_user,
+                    variables={"first": first, "after": after or None},
+                    bearer_token=bearer_token,
+                    # Don't cache the probe: a rejected query can come back as HTTP 200
+                    use_cache=supported is True
+                )
+                if supported is None:
+                    # Only a definitive outcome is remembered: a schema rejection, or a success with data.
+                    # Any other failure (auth, 5xx, timeout) is returned as-is and probed again next call.
+                    if _cursor_query_rejected(result):
+                        supported = False
+                    elif result["success"] and (result["data"] or _EMPTY).get("data"):
+                        supported = True
+                    else:
+                        return _identities_cursor_response(result, impersonate_user, first, after)
+                    _CURSOR_PAGINATION_SUPPORTED[version] = supported
+                    logger.info("Cursor pagination for identities %s on GraphQL %s",
+                                "supported" if supported else "not supported", version)
+                if supported:
+                    return _identities_cursor_response(result, impersonate_user, first, after)
+            # A cursor can't be mapped to an offset page; refuse rather than repeat page 1
+            if after:
+                return build_error_response(
+                    error_type="ValidationError",
+                    message="Cursor pagination is not supported by this Omada schema; "
+                            "'after' cannot be used. Use page/rows instead.",
+                    impersonated_user=impersonate_user
+                )
+            # Offset fallback: the first page of the same size
+            page, rows = 1, first
 
-        # Build GraphQL query with pagination
-        query = f"""query GetIdentitiesForBeneficiary {{
-  accessRequestComponents {{
-    identities(
-      {pagination_clause}filters: {{}}
-    ) {{
-      pages
-      total
-      data {{
-        firstName
-        displayName
-        identityId
-        id
-        lastName
-        contexts {{
-          id
-          displayName
-        }}
-      }}
-    }}
-  }}
-}}"""
+        # Use the prebuilt query unless pagination was requested
+        if page is not None and rows is not None:
+            query = _QUERY_IDENTITIES_FOR_BENEFICIARY_TMPL.substitute(
+                pagination=build_pagination_clause(page=page, rows=rows)
+            )
+        else:
+            query = _QUERY_IDENTITIES_FOR_BENEFICIARY
 
         # Execute GraphQL request with caching support
         result = await _execute_graphql_request_cached(
@@ -2358,10 +2872,10 @@ async def get_identities_for_beneficiary(impersonate_user: str, bearer_token: st
         if result["success"]:
             data = result["data"]
             # Extract identities from the GraphQL response
-            if ('data' in data and 'accessRequestComponents' in data['data']):
-                access_request_components = data['data']['accessRequestComponents']
-                identities_obj = access_request_components.get('identities', {})
-                identities = identities_obj.get('data', [])
+            components = (data.get('data') or _EMPTY).get('accessRequestComponents')
+            if components is not None:
+                identities_obj = components.get('identities') or _EMPTY
+                identities = identities_obj.get('data') or ()
                 total = identities_obj.get('total', len(identities))
                 pages = identities_obj.get('pages', 1)
 
@@ -2370,6 +2884,7 @@ async def get_identities_for_beneficiary(impersonate_user: str, bearer_token: st
                     endpoint=result["endpoint"],
                     impersonated_user=impersonate_user,
                     pagination={
+                        "mode": "offset",
                         "current_page": page,
                         "rows_per_page": rows,
                         "total_identities": total,
@@ -2548,9 +3063,17 @@ async def get_calculated_assignments_detailed(identity_ids: str, impersonate_use
 
     # ENTRY LOGGING
     logger.info(f"TOOL START - get_calculated_assignments_detailed called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
-    logger.debug(f"DEBUG: ENTRY - get_calculated_assignments_detailed(identity_ids={identity_ids}, impersonate_user={impersonate_user}, resource_type_name={resource_type_name}, compliance_status={compliance_status}, account_name={account_name}, system_name={system_name}, identity_name={identity_name}, page={page}, rows={rows})")
+    logger.debug(
+        "DEBUG: ENTRY - get_calculated_assignments_detailed(identity_ids=%s, impersonate_user=%s, resource_type_name=%s, "
+        "compliance_status=%s, account_name=%s, system_name=%s, identity_name=%s, page=%s, rows=%s)",
+        identity_ids, impersonate_user, resource_type_name, compliance_status, account_name, system_name, identity_name, page, rows
+    )
 
     try:
+        # Normalize once; the trimmed values are what get validated and sent downstream
+        identity_ids = (identity_ids or "").strip()
+        impersonate_user = (impersonate_user or "").strip()
+
         # Validate mandatory fields using helper
         error = validate_required_fields(identity_ids=identity_ids, impersonate_user=impersonate_user, bearer_token=bearer_token)
         if error:
@@ -2571,81 +3094,39 @@ async def get_calculated_assignments_detailed(identity_ids: str, impersonate_use
                 impersonated_user=impersonate_user
             )
 
-        # Build the filters object dynamically based on provided parameters
-        filters = []
-
-        # Add multipleIdentityIds filter (most efficient filter using GUID)
-        filters.append(f'multipleIdentityIds: "{identity_ids}"')
+        # Build the filters object dynamically based on provided parameters.
+        # Values are inlined as escaped literals (_gql_str): the schema's variable types for these
+        # filters are unconfirmed, and a mistyped variable would make Omada reject the whole query.
+        filters = [f'multipleIdentityIds: {_gql_str(identity_ids)}']  # most efficient filter using GUID
 
         # Add optional filters only if provided
-        if resource_type_name and resource_type_name.strip():
-            # Validate operator
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if resource_type_operator not in valid_operators:
-                return build_error_response(
-                    error_type="InvalidOperator",
-                    message=f"Invalid resource_type_operator: {resource_type_operator}. Valid values are: {', '.join(valid_operators)}",
-                    impersonated_user=impersonate_user
-                )
-            filters.append(f'resourceTypeName: {{filterValue: "{resource_type_name}", operator: {resource_type_operator}}}')
-
-        if compliance_status and compliance_status.strip():
-            # Validate operator
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if compliance_status_operator not in valid_operators:
-                return build_error_response(
-                    error_type="InvalidOperator",
-                    message=f"Invalid compliance_status_operator: {compliance_status_operator}. Valid values are: {', '.join(valid_operators)}",
-                    impersonated_user=impersonate_user
-                )
-            filters.append(f'complianceStatus: {{filterValue: "{compliance_status}", operator: {compliance_status_operator}}}')
-
-        if account_name and account_name.strip():
-            # Validate operator
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if account_name_operator not in valid_operators:
-                return build_error_response(
-                    error_type="InvalidOperator",
-                    message=f"Invalid account_name_operator: {account_name_operator}. Valid values are: {', '.join(valid_operators)}",
-                    impersonated_user=impersonate_user
-                )
-            filters.append(f'accountName: {{filterValue: "{account_name}", operator: {account_name_operator}}}')
-
-        if system_name and system_name.strip():
-            # Validate operator
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if system_name_operator not in valid_operators:
-                return build_error_response(
-                    error_type="InvalidOperator",
-                    message=f"Invalid system_name_operator: {system_name_operator}. Valid values are: {', '.join(valid_operators)}",
-                    impersonated_user=impersonate_user
-                )
-            filters.append(f'systemName: {{filterValue: "{system_name}", operator: {system_name_operator}}}')
-
-        if identity_name and identity_name.strip():
+        optional_filters = (
+            ("resourceTypeName", resource_type_name, "resource_type_operator", resource_type_operator),
+            ("complianceStatus", compliance_status, "compliance_status_operator", compliance_status_operator),
+            ("accountName", account_name, "account_name_operator", account_name_operator),
+            ("systemName", system_name, "system_name_operator", system_name_operator),
+            ("identityName", identity_name, "identity_name_operator", identity_name_operator),
+        )
+        for field, value, operator_param, operator in optional_filters:
+            if not (value and value.strip()):
+                continue
             # Validate operator
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if identity_name_operator not in valid_operators:
+            if operator not in _VALID_FILTER_OPERATORS:
                 return build_error_response(
                     error_type="InvalidOperator",
-                    message=f"Invalid identity_name_operator: {identity_name_operator}. Valid values are: {', '.join(valid_operators)}",
+                    message=f"Invalid {operator_param}: {operator}. Valid values are: {_VALID_FILTER_OPERATORS_STR}",
                     impersonated_user=impersonate_user
                 )
-            filters.append(f'identityName: {{filterValue: "{identity_name}", operator: {identity_name_operator}}}')
+            filters.append(f'{field}: {{filterValue: {_gql_str(value)}, operator: {operator}}}')
 
         # Join filters
         filters_string = ', '.join(filters)
 
         # Validate sort_by parameter
-        valid_sort_options = [
-            "RESOURCE_NAME", "IDENTITY_NAME", "ACCOUNT_NAME", "RESOURCE_TYPE",
-            "COMPLIANCE_STATUS", "SYSTEM_NAME", "VALID_FROM", "VALID_TO",
-            "DISABLED", "VIOLATION_STATUS"
-        ]
-        if sort_by not in valid_sort_options:
+        if sort_by not in _VALID_ASSIGNMENT_SORT_OPTIONS:
             return build_error_response(
                 error_type="InvalidSortOption",
-                message=f"Invalid sort_by: {sort_by}. Valid values are: {', '.join(valid_sort_options)}",
+                message=f"Invalid sort_by: {sort_by}. Valid values are: {_VALID_ASSIGNMENT_SORT_OPTIONS_STR}",
                 impersonated_user=impersonate_user
             )
 
@@ -2653,7 +3134,7 @@ async def get_calculated_assignments_detailed(identity_ids: str, impersonate_use
         query = f"""query GetCalculatedAssignmentsDetailed {{
   calculatedAssignments(
     sorting: {{sortOrder: ASCENDING, sortBy: {sort_by}}}
-    pagination: {{page: {page}, rows: {rows}}}
+    pagination: {{page: {int(page)}, rows: {int(rows)}}}
     filters: {{{filters_string}}}
   ) {{
     pages
@@ -2732,8 +3213,7 @@ async def get_calculated_assignments_detailed(identity_ids: str, impersonate_use
                     pages=pages,
                     current_page=page,
                     rows_per_page=rows,
-                    assignments_returned=len(assignments_data),
-                    assignments=assignments_data
+                    assignments_returned=len(assignments_data)
                 )
             else:
                 return build_error_response(
@@ -2904,40 +3384,33 @@ async def get_calculated_assignments_summary(identity_ids: str, impersonate_user
             )
 
         # Build filters
-        filters = [f'multipleIdentityIds: "{identity_ids}"']
+        filters = [f'multipleIdentityIds: {_gql_str(identity_ids)}']
 
         if system_name and system_name.strip():
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if system_name_operator not in valid_operators:
+            if system_name_operator not in _VALID_FILTER_OPERATORS:
                 return build_error_response(
                     error_type="InvalidOperator",
-                    message=f"Invalid system_name_operator: {system_name_operator}. Valid values are: {', '.join(valid_operators)}",
+                    message=f"Invalid system_name_operator: {system_name_operator}. Valid values are: {_VALID_FILTER_OPERATORS_STR}",
                     impersonated_user=impersonate_user
                 )
-            filters.append(f'systemName: {{filterValue: "{system_name}", operator: {system_name_operator}}}')
+            filters.append(f'systemName: {{filterValue: {_gql_str(system_name)}, operator: {system_name_operator}}}')
 
         if compliance_status and compliance_status.strip():
-            valid_operators = ["CONTAINS", "EQUAL", "IS_EMPTY", "IS_NOT_EMPTY"]
-            if compliance_status_operator not in valid_operators:
+            if compliance_status_operator not in _VALID_FILTER_OPERATORS:
                 return build_error_response(
                     error_type="InvalidOperator",
-                    message=f"Invalid compliance_status_operator: {compliance_status_operator}. Valid values are: {', '.join(valid_operators)}",
+                    message=f"Invalid compliance_status_operator: {compliance_status_operator}. Valid values are: {_VALID_FILTER_OPERATORS_STR}",
                     impersonated_user=impersonate_user
                 )
-            filters.append(f'complianceStatus: {{filterValue: "{compliance_status}", operator: {compliance_status_operator}}}')
+            filters.append(f'complianceStatus: {{filterValue: {_gql_str(compliance_status)}, operator: {compliance_status_operator}}}')
 
         filters_string = ', '.join(filters)
 
         # Validate sort_by
-        valid_sort_options = [
-            "RESOURCE_NAME", "IDENTITY_NAME", "ACCOUNT_NAME", "RESOURCE_TYPE",
-            "COMPLIANCE_STATUS", "SYSTEM_NAME", "VALID_FROM", "VALID_TO",
-            "DISABLED", "VIOLATION_STATUS"
-        ]
-        if sort_by not in valid_sort_options:
+        if sort_by not in _VALID_ASSIGNMENT_SORT_OPTIONS:
             return build_error_response(
                 error_type="InvalidSortOption",
-                message=f"Invalid sort_by: {sort_by}. Valid values are: {', '.join(valid_sort_options)}",
+                message=f"Invalid sort_by: {sort_by}. Valid values are: {_VALID_ASSIGNMENT_SORT_OPTIONS_STR}",
                 impersonated_user=impersonate_user
             )
 
@@ -2998,8 +3471,7 @@ async def get_calculated_assignments_summary(identity_ids: str, impersonate_user
                     rows_per_page=rows,
                     assignments_returned=len(assignments_data),
                     query_type="summary",
-                    note="This is a lightweight summary. Use get_calculated_assignments_detailed for full details.",
-                    assignments=assignments_data
+                    note="This is a lightweight summary. Use get_calculated_assignments_detailed for full details."
                 )
             else:
                 return build_error_response(
@@ -3036,6 +3508,18 @@ async def get_calculated_assignments_summary(identity_ids: str, impersonate_user
             handler.setLevel(level)
 
 
+# Contexts-for-identity query; $identity_id is the _gql_str-escaped literal. Not a GraphQL
+# variable: the schema type of identityIds is unconfirmed, and a mistyped variable is rejected.
+_QUERY_CONTEXTS_TMPL = string.Template("""query GetContextsForIdentity {
+  accessRequestComponents {
+    contexts(identityIds: $identity_id) {
+      id
+      displayName
+      type
+    }
+  }
+}""")
+
 @with_function_logging
 @mcp.tool()
 async def get_identity_contexts(identity_id: str, impersonate_user: str, bearer_token: str) -> str:
@@ -3083,38 +3567,32 @@ async def get_identity_contexts(identity_id: str, impersonate_user: str, bearer_
     logger.info(f"TOOL START - get_identity_contexts called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
 
     # ENTRY LOGGING
-    logger.debug(f"DEBUG: ENTRY - get_identity_contexts(identity_id={identity_id}, impersonate_user={impersonate_user})")
+    logger.debug("DEBUG: ENTRY - get_identity_contexts(identity_id=%s, impersonate_user=%s)", identity_id, impersonate_user)
 
     try:
+        # Normalize once; the trimmed values are what get validated and sent downstream
+        identity_id = (identity_id or "").strip()
+        impersonate_user = (impersonate_user or "").strip()
+
         # Validate mandatory fields
         error = validate_required_fields(identity_id=identity_id, impersonate_user=impersonate_user)
         if error:
             return error
-        logger.debug(f"get_identity_contexts called with identity_id={identity_id}, impersonate_user={impersonate_user}")
-        logger.debug(f"Validation passed, building GraphQL query for identity_id: {identity_id}")
+        logger.debug("get_identity_contexts called with identity_id=%s, impersonate_user=%s", identity_id, impersonate_user)
+        logger.debug("Validation passed, building GraphQL query for identity_id: %s", identity_id)
 
-        # Build GraphQL query with the provided identity_id
-        query = f"""query GetContextsForIdentity {{
-  accessRequestComponents {{
-    contexts(identityIds: "{identity_id}") {{
-      id
-      displayName
-      type
-    }}
-  }}
-}}"""
-
-        # Execute GraphQL request with caching support
+        # Execute GraphQL request with caching support (identity inlined as an escaped literal)
         result = await _execute_graphql_request_cached(
-            query, impersonate_user, bearer_token=bearer_token, use_cache=True
+            _QUERY_CONTEXTS_TMPL.substitute(identity_id=_gql_str(identity_id)), impersonate_user,
+            bearer_token=bearer_token, use_cache=True
         )
 
         if result["success"]:
             data = result["data"]
             # Extract contexts from the GraphQL response
-            if ('data' in data and 'accessRequestComponents' in data['data']):
-                access_request_components = data['data']['accessRequestComponents']
-                contexts = access_request_components.get('contexts', [])
+            components = (data.get('data') or _EMPTY).get('accessRequestComponents')
+            if components is not None:
+                contexts = components.get('contexts') or ()
 
                 return build_success_response(
                     data=contexts,
@@ -3155,98 +3633,227 @@ async def get_identity_contexts(identity_id: str, impersonate_user: str, bearer_
         logger.info(f"TOOL END - get_identity_contexts | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
 
+# First page of an identity's calculated assignments (summary fields) for get_identity_overview;
+# $identity_ids is the _gql_str-escaped literal (variable types for these filters are unconfirmed)
+_QUERY_ASSIGNMENTS_OVERVIEW_TMPL = string.Template("""query GetCalculatedAssignmentsOverview {
+  calculatedAssignments(
+    sorting: {sortOrder: ASCENDING, sortBy: RESOURCE_NAME}
+    pagination: {page: 1, rows: $rows}
+    filters: {multipleIdentityIds: $identity_ids}
+  ) {
+    pages
+    total
+    data {
+      complianceStatus
+      disabled
+      validFrom
+      validTo
+      resource {
+        name
+      }
+      account {
+        accountName
+        system {
+          name
+        }
+      }
+    }
+  }
+}""")
+
 @with_function_logging
 @mcp.tool()
-async def get_pending_approvals(impersonate_user: str, bearer_token: str,
-                                workflow_step: str = None,
-                                summary_mode: bool = True) -> str:
+async def get_identity_overview(identity_id: str, impersonate_user: str, bearer_token: str,
+                                rows: int = 20, use_cache: bool = True) -> str:
     """
-    Get pending approval survey questions from Omada GraphQL API.
+    Get an identity's contexts AND a summary of its calculated assignments in one call.
 
-    IMPORTANT: This function requires 2 mandatory parameters. If missing,
-    you MUST prompt the user to provide them before calling this function.
+    Both GraphQL queries are sent concurrently (asyncio.gather) over the shared HTTP client,
+    so this takes about one round-trip instead of the two needed when calling
+    get_identity_contexts and get_calculated_assignments_summary one after the other.
 
-    REQUIRED PARAMETERS (prompt user if missing):
+    IMPORTANT LLM INSTRUCTIONS:
+        USE THIS TOOL when the user wants a general picture of a person, e.g.:
+        - "Give me an overview of {person}"
+        - "What contexts and access does {person} have?"
+        For filtering, sorting or paging assignments use get_calculated_assignments_summary
+        or get_calculated_assignments_detailed instead.
+        Context "id" values follow the same rules as get_identity_contexts (remember, don't display).
+
+    REQUIRED PARAMETERS:
+        identity_id: The identity UId (e.g., "e3e869c4-369a-476e-a969-d57059d0b1e4")
         impersonate_user: Email address of the user to impersonate (e.g., "user@domain.com")
-                         PROMPT: "Please provide the email address to impersonate"
-        bearer_token: Bearer token for authentication (required for GraphQL API)
-                     PROMPT: "Please provide the bearer token"
+        bearer_token: Bearer token for authentication
 
     Optional parameters:
-        workflow_step: Filter by workflow step (one of: "ManagerApproval", "ResourceOwnerApproval", "SystemOwnerApproval")
-                      If not provided, returns all pending approvals
-        summary_mode: If True (default), returns only key fields (workflowStep, workflowStepTitle, reason)
-                     If False, returns all fields including surveyId and surveyObjectKey
-
-    ⚠️ IMPORTANT FOR CLAUDE - DISPLAY TO USER:
-    When presenting pending approvals to the user, you MUST ALWAYS include:
-    - Resource Name (resourceAssignment.resource.name)
-    - System Name (resourceAssignment.resource.system.name)
-    - Workflow Step (workflowStep)
-    - Reason/Justification (reason)
-
-    These fields provide essential context for the user to understand what access
-    is being requested and make informed approval decisions.
+        rows: Number of assignments to return (default: 20, max: 100)
+        use_cache: Enable caching (default: True)
 
     Returns:
-        JSON response with pending approval survey questions including resource and system details,
-        or error message if the request fails
+        JSON with "contexts" and "assignments" sections. If one query fails the other
+        section is still returned and the failure is reported under "errors".
     """
     # PERFORMANCE TIMING: Record start time
     start_time = datetime.now()
-    logger.info(f"TOOL START - get_pending_approvals called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
-
-    # ENTRY LOGGING
-    logger.debug(f"DEBUG: ENTRY - get_pending_approvals(impersonate_user={impersonate_user}, workflow_step={workflow_step}, summary_mode={summary_mode})")
+    logger.info(f"TOOL START - get_identity_overview called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
 
     try:
-        # Validate mandatory fields using helper
-        error = validate_required_fields(impersonate_user=impersonate_user)
+        # Normalize once; the trimmed values are what get validated and sent downstream
+        identity_id = (identity_id or "").strip()
+        impersonate_user = (impersonate_user or "").strip()
+
+        # Validate mandatory fields
+        error = validate_required_fields(identity_id=identity_id, impersonate_user=impersonate_user, bearer_token=bearer_token)
         if error:
             return error
 
-        # Validate workflow_step if provided
-        valid_workflow_steps = ["ManagerApproval", "ResourceOwnerApproval", "SystemOwnerApproval"]
-        if workflow_step and workflow_step not in valid_workflow_steps:
+        if rows < 1 or rows > 100:
             return build_error_response(
-                error_type="ValidationError",
-                message=f"Invalid workflow_step '{workflow_step}'. Must be one of: {', '.join(valid_workflow_steps)}",
+                error_type="InvalidPaginationParameter",
+                message=f"Invalid rows: {rows}. Rows must be between 1 and 100.",
+                impersonated_user=impersonate_user
+            )
+
+        # Fire both queries at once; they share the client's keep-alive connection
+        contexts_result, assignments_result = await asyncio.gather(
+            _execute_graphql_request_cached(
+                _QUERY_CONTEXTS_TMPL.substitute(identity_id=_gql_str(identity_id)), impersonate_user,
+                bearer_token=bearer_token, use_cache=use_cache
+            ),
+            _execute_graphql_request_cached(
+                _QUERY_ASSIGNMENTS_OVERVIEW_TMPL.substitute(identity_ids=_gql_str(identity_id), rows=int(rows)),
+                impersonate_user,
+                graphql_version="2.19", bearer_token=bearer_token, use_cache=use_cache
+            )
+        )
+
+        overview = {}
+        errors = {}
+
+        if contexts_result["success"]:
+            components = (contexts_result["data"].get("data") or _EMPTY).get("accessRequestComponents") or _EMPTY
+            overview["contexts"] = components.get("contexts") or ()
+        else:
+            errors["contexts"] = contexts_result.get("error", contexts_result.get("errors"))
+
+        if assignments_result["success"]:
+            calculated = (assignments_result["data"].get("data") or _EMPTY).get("calculatedAssignments") or _EMPTY
+            overview["assignments"] = {
+                "total": calculated.get("total", 0),
+                "pages": calculated.get("pages", 0),
+                "data": calculated.get("data") or ()
+            }
+        else:
+            errors["assignments"] = assignments_result.get("error", assignments_result.get("errors"))
+
+        if not overview:
+            return build_error_response(
+                error_type="GraphQLError",
+                message="Both overview queries failed",
+                identity_id=identity_id,
                 impersonated_user=impersonate_user,
-                workflow_step_filter=workflow_step
+                errors=errors
             )
 
-        # Build filter clause conditionally
-        filter_clause = f'(filters: {{workflowStep: {{filterValue: "{workflow_step}", operator: EQUALS}}}})' if workflow_step else ''
+        context = {"identity_id": identity_id, "impersonated_user": impersonate_user}
+        if errors:
+            context["errors"] = errors
+        return build_success_response(data=overview, **context)
 
-        # Build GraphQL query with conditional filter
-        query = f"""query myAccessRequestApprovalSurveyQuestions {{
-  accessRequestApprovalSurveyQuestions{filter_clause} {{
+    except Exception as e:
+        return build_error_response(
+            error_type=type(e).__name__,
+            message=str(e),
+            identity_id=identity_id,
+            impersonated_user=impersonate_user
+        )
+    finally:
+        # PERFORMANCE TIMING: Calculate and log execution time
+        end_time = datetime.now()
+        elapsed_time = (end_time - start_time).total_seconds()
+        logger.info(f"TOOL END - get_identity_overview | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
+
+
+# Pending approvals query; $filter_clause is "" or the workflowStep filter (value inlined as a
+# _gql_str-escaped literal - the schema type for a $workflowStep variable is unconfirmed)
+# and $technical_fields is only filled in for full (non-summary) requests
+_QUERY_PENDING_APPROVALS_TMPL = string.Template("""query myAccessRequestApprovalSurveyQuestions {
+  accessRequestApprovalSurveyQuestions${filter_clause} {
     pages
     total
-    data {{
-      reason
-      surveyId
-      surveyObjectKey
+    data {
+      reason${technical_fields}
       workflowStep
-      history
       workflowStepTitle
-      resourceAssignment {{
-        resource {{
+      resourceAssignment {
+        resource {
           id
           name
-          system {{
+          system {
             id
             name
-          }}
-          resourceType {{
+          }
+          resourceType {
             name
             id
-          }}
-        }}
-      }}
-    }}
-  }}
-}}"""
+          }
+        }
+      }
+    }
+  }
+}""")
+_PENDING_APPROVALS_TECHNICAL_FIELDS = """
+      surveyId
+      surveyObjectKey
+      history"""
+_PENDING_APPROVALS_STEP_FILTER = "(filters: {{workflowStep: {{filterValue: {value}, operator: EQUALS}}}})"
+# Keyed by summary_mode, with only $filter_clause left to fill in. Summary queries don't fetch
+# surveyId/surveyObjectKey/history at all, since the summary would discard them.
+_QUERY_PENDING_APPROVALS = {
+    summary: string.Template(_QUERY_PENDING_APPROVALS_TMPL.safe_substitute(
+        technical_fields="" if summary else _PENDING_APPROVALS_TECHNICAL_FIELDS
+    ))
+    for summary in (True, False)
+}
+
+async def _get_pending_approvals_impl(impersonate_user: str, bearer_token: str,
+                                      workflow_step: str = None, summary_mode: bool = True) -> str:
+    """
+    Implementation shared by get_pending_approvals and get_approval_details.
+
+    Tools call this directly rather than each other, so a get_approval_details call
+    doesn't pass through a second logging decorator and timing frame.
+
+    Args:
+        impersonate_user: Email address of the user to impersonate
+        bearer_token: Bearer token for authentication
+        workflow_step: Optional workflow step filter
+        summary_mode: If True, returns only key fields
+
+    Returns:
+        JSON response with pending approval survey questions or error message
+    """
+    try:
+        # Normalize once; the trimmed value is what gets validated and sent downstream
+        impersonate_user = (impersonate_user or "").strip()
+
+        # Validate mandatory fields using helper
+        error = validate_required_fields(impersonate_user=impersonate_user)
+        if error:
+            return error
+
+        # Validate workflow_step if provided
+        if workflow_step and workflow_step not in _VALID_WORKFLOW_STEPS:
+            return build_error_response(
+                error_type="ValidationError",
+                message=f"Invalid workflow_step '{workflow_step}'. Must be one of: {_VALID_WORKFLOW_STEPS_STR}",
+                impersonated_user=impersonate_user,
+                workflow_step_filter=workflow_step
+            )
+
+        # Unfiltered requests use the constant document; the workflow step is an escaped literal
+        filter_clause = _PENDING_APPROVALS_STEP_FILTER.format(value=_gql_str(workflow_step)) if workflow_step else ""
+        query = _QUERY_PENDING_APPROVALS[bool(summary_mode)].substitute(filter_clause=filter_clause)
 
         # Execute GraphQL request with version 3.0 and caching support
         result = await _execute_graphql_request_cached(
@@ -3266,13 +3873,17 @@ async def get_pending_approvals(impersonate_user: str, bearer_token: str,
                 total = approval_questions.get('total', 0)
                 pages = approval_questions.get('pages', 0)
 
-                # Apply summarization if requested
+                # Apply summarization if requested. The summary query already omits the
+                # technical fields; this pass only truncates long free text.
                 response_data = questions_data
                 if summary_mode:
-                    logger.debug(f"Applying summarization to {len(questions_data)} pending approvals")
-                    logger.debug(f"Original data fields: {list(questions_data[0].keys()) if questions_data else []}")
+                    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                    if debug_enabled:
+                        logger.debug(f"Applying summarization to {len(questions_data)} pending approvals")
+                        logger.debug(f"Original data fields: {list(questions_data[0].keys()) if questions_data else []}")
                     response_data = _summarize_graphql_data(questions_data, "PendingApproval")
-                    logger.debug(f"Summarized data fields: {list(response_data[0].keys()) if response_data else []}")
+                    if debug_enabled:
+                        logger.debug(f"Summarized data fields: {list(response_data[0].keys()) if response_data else []}")
 
                 return build_success_response(
                     data=response_data,
@@ -3309,6 +3920,53 @@ async def get_pending_approvals(impersonate_user: str, bearer_token: str,
             impersonated_user=impersonate_user,
             workflow_step_filter=workflow_step if workflow_step else "none"
         )
+
+@with_function_logging
+@mcp.tool()
+async def get_pending_approvals(impersonate_user: str, bearer_token: str,
+                                workflow_step: str = None,
+                                summary_mode: bool = True) -> str:
+    """
+    Get pending approval survey questions from Omada GraphQL API.
+
+    IMPORTANT: This function requires 2 mandatory parameters. If missing,
+    you MUST prompt the user to provide them before calling this function.
+
+    REQUIRED PARAMETERS (prompt user if missing):
+        impersonate_user: Email address of the user to impersonate (e.g., "user@domain.com")
+                         PROMPT: "Please provide the email address to impersonate"
+        bearer_token: Bearer token for authentication (required for GraphQL API)
+                     PROMPT: "Please provide the bearer token"
+
+    Optional parameters:
+        workflow_step: Filter by workflow step (one of: "ManagerApproval", "ResourceOwnerApproval", "SystemOwnerApproval")
+                      If not provided, returns all pending approvals
+        summary_mode: If True (default), returns only key fields (workflowStep, workflowStepTitle, reason)
+                     If False, returns all fields including surveyId and surveyObjectKey
+
+    ⚠️ IMPORTANT FOR CLAUDE - DISPLAY TO USER:
+    When presenting pending approvals to the user, you MUST ALWAYS include:
+    - Resource Name (resourceAssignment.resource.name)
+    - System Name (resourceAssignment.resource.system.name)
+    - Workflow Step (workflowStep)
+    - Reason/Justification (reason)
+
+    These fields provide essential context for the user to understand what access
+    is being requested and make informed approval decisions.
+
+    Returns:
+        JSON response with pending approval survey questions including resource and system details,
+        or error message if the request fails
+    """
+    # PERFORMANCE TIMING: Record start time
+    start_time = datetime.now()
+    logger.info(f"TOOL START - get_pending_approvals called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
+
+    # ENTRY LOGGING
+    logger.debug("DEBUG: ENTRY - get_pending_approvals(impersonate_user=%s, workflow_step=%s, summary_mode=%s)", impersonate_user, workflow_step, summary_mode)
+
+    try:
+        return await _get_pending_approvals_impl(impersonate_user, bearer_token, workflow_step, summary_mode)
     finally:
         # PERFORMANCE TIMING: Calculate and log execution time
         end_time = datetime.now()
@@ -3346,8 +4004,8 @@ async def get_approval_details(impersonate_user: str, bearer_token: str,
     logger.debug(f"DEBUG: ENTRY - get_approval_details(impersonate_user={impersonate_user}, workflow_step={workflow_step})")
 
     try:
-        # Call get_pending_approvals with summary_mode=False to get all fields
-        return await get_pending_approvals(
+        # Call the shared implementation with summary_mode=False to get all fields
+        return await _get_pending_approvals_impl(
             impersonate_user=impersonate_user,
             bearer_token=bearer_token,
             workflow_step=workflow_step,
@@ -3360,6 +4018,26 @@ async def get_approval_details(impersonate_user: str, bearer_token: str,
         logger.info(f"TOOL END - get_approval_details | START: {start_time.strftime('%H:%M:%S.%f')[:-3]} | END: {end_time.strftime('%H:%M:%S.%f')[:-3]} | DURATION: {elapsed_time:.3f} seconds")
 
 
+# Approval decision mutations, one per allowed decision. The decision is an enum literal
+# validated against a whitelist; the survey IDs are inlined as _gql_str-escaped literals.
+_MUTATION_APPROVAL_DECISION_TMPL = string.Template("""mutation makeApprovalDecision {
+  submitRequestQuestions(
+    submitRequestQuestionsInput: {
+      accessApprovals: {
+        questions: {
+          decision: ${decision},
+          surveyObjectKey: $survey_object_key},
+          surveyId: $survey_id}
+        }
+  ) {
+    questionsSuccessfullySubmitted
+  }
+}""")
+_MUTATION_APPROVAL_DECISION = {
+    decision: string.Template(_MUTATION_APPROVAL_DECISION_TMPL.safe_substitute(decision=decision))
+    for decision in _DECISIONS
+}
+
 @with_function_logging
 @mcp.tool()
 async def make_approval_decision(impersonate_user: str, survey_id: str,
@@ -3402,6 +4080,12 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
     logger.info(f"TOOL START - make_approval_decision called at {start_time.strftime('%H:%M:%S.%f')[:-3]}")
 
     try:
+        # Normalize once; the trimmed values are what get validated and sent downstream
+        impersonate_user = (impersonate_user or "").strip()
+        survey_id = (survey_id or "").strip()
+        survey_object_key = (survey_object_key or "").strip()
+        decision = (decision or "").strip()
+
         # Validate mandatory fields using helper
         error = validate_required_fields(
             impersonate_user=impersonate_user,
@@ -3413,30 +4097,28 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
             return error
 
         # Validate decision value
-        valid_decisions = ["APPROVE", "REJECT"]
-        decision_upper = decision.strip().upper()
-        if decision_upper not in valid_decisions:
+        decision_upper = decision.upper()
+        if decision_upper not in _VALID_DECISIONS:
             return build_error_response(
                 error_type="ValidationError",
-                message=f"Invalid decision '{decision}'. Must be one of: {', '.join(valid_decisions)}"
+                message=f"Invalid decision '{decision}'. Must be one of: {_VALID_DECISIONS_STR}"
             )
 
-        # Build GraphQL mutation
-        mutation = f"""mutation makeApprovalDecision {{
-  submitRequestQuestions(
-    submitRequestQuestionsInput: {{
-      accessApprovals: {{
-        questions: {{
-          decision: {decision_upper},
-          surveyObjectKey: "{survey_object_key}"}},
-          surveyId: "{survey_id}"}}
-        }}
-  ) {{
-    questionsSuccessfullySubmitted
-  }}
-}}"""
+        # Prebuilt mutation for the validated decision; survey IDs are passed as variables
+        mutation = _MUTATION_APPROVAL_DECISION[decision_upper].substitute(
+            survey_id=_gql_str(survey_id),
+            survey_object_key=_gql_str(survey_object_key)
+        )
+
+        # Context echoed in every response below
+        response_context = {
+            "impersonated_user": impersonate_user,
+            "survey_id": survey_id,
+            "survey_object_key": survey_object_key,
+            "decision": decision_upper
+        }
 
-        logger.debug(f"GraphQL mutation: {mutation}")
+        logger.debug("GraphQL mutation: %s", mutation)
 
         # Execute GraphQL request with version 3.0
         result = await _execute_graphql_request(
@@ -3456,20 +4138,14 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
                 return build_success_response(
                     data={"questions_successfully_submitted": questions_submitted},
                     endpoint=result["endpoint"],
-                    impersonated_user=impersonate_user,
-                    survey_id=survey_id,
-                    survey_object_key=survey_object_key,
-                    decision=decision_upper
+                    **response_context
                 )
             elif "errors" in data:
                 # Handle GraphQL errors
                 return build_error_response(
                     error_type="GraphQLError",
                     message="GraphQL mutation failed",
-                    impersonated_user=impersonate_user,
-                    survey_id=survey_id,
-                    survey_object_key=survey_object_key,
-                    decision=decision_upper,
+                    **response_context,
                     errors=data["errors"],
                     endpoint=result["endpoint"]
                 )
@@ -3477,10 +4153,7 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
                 return build_error_response(
                     error_type="UnexpectedResponse",
                     message="Unexpected response format from submitRequestQuestions",
-                    impersonated_user=impersonate_user,
-                    survey_id=survey_id,
-                    survey_object_key=survey_object_key,
-                    decision=decision_upper,
+                    **response_context,
                     response=data
                 )
         else:
@@ -3488,10 +4161,7 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
             return build_error_response(
                 error_type=result.get("error_type", "GraphQLError"),
                 result=result,
-                impersonated_user=impersonate_user,
-                survey_id=survey_id,
-                survey_object_key=survey_object_key,
-                decision=decision_upper
+                **response_context
             )
 
     except Exception as e:
@@ -3499,9 +4169,9 @@ async def make_approval_decision(impersonate_user: str, survey_id: str,
             error_type=type(e).__name__,
             message=str(e),
             impersonated_user=impersonate_user,
-            survey_id=survey_id if 'survey_id' in locals() else "N/A",
-            survey_object_key=survey_object_key if 'survey_object_key' in locals() else "N/A",
-            decision=decision if 'decision' in locals() else "N/A"
+            survey_id=survey_id or "N/A",
+            survey_object_key=survey_object_key or "N/A",
+            decision=decision or "N/A"
         )
     finally:
         # PERFORMANCE TIMING: Calculate and log execution time
@@ -3885,14 +4555,14 @@ async def check_access_request_policy(identity_id: str, resource_ids: str, imper
             )
 
         # Build the resources array for GraphQL query
-        resources_array = ', '.join([f'{{id: "{rid}"}}' for rid in resource_id_list])
+        resources_array = ', '.join([f'{{id: {_gql_str(rid)}}}' for rid in resource_id_list])
 
         # Build GraphQL query based on graphql_requestpolicycheck.txt
         graphql_query = f"""
         query CheckAccessRequestPolicy {{
           accessRequestPolicyChecks(
             accessRequests: {{identityResources: {{
-              identity: {{id: "{identity_id}"}},
+              identity: {{id: {_gql_str(identity_id)}}},
               resources: [{resources_array}]
             }}}}
           ) {{
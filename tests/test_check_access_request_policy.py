@@ -4,6 +4,7 @@ Test script for check_access_request_policy function (SoD Policy Check)
 import asyncio
 import sys
 import os
+import traceback
 from dotenv import load_dotenv
 
 # Add the current directory to the path to import server module
@@ -14,6 +15,9 @@ from server import check_access_request_policy
 # Load environment variables
 load_dotenv()
 
+# Read once after load_dotenv; shared by every test
+BEARER_TOKEN = os.getenv("BEARER_TOKEN", "")
+
 async def test_check_access_request_policy_single_resource():
     """Test the check_access_request_policy function with a single resource"""
 
@@ -21,7 +25,7 @@ async def test_check_access_request_policy_single_resource():
     identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
     resource_ids = "95d4f3dd-a2c1-4838-8830-f39a56e2f1e7"  # Single resource ID
     impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-    bearer_token = os.getenv("BEARER_TOKEN", "")  # Get from environment
+    bearer_token = BEARER_TOKEN
 
     print("="*80)
     print("Test 1: Single Resource SoD Policy Check")
@@ -48,8 +52,7 @@ async def test_check_access_request_policy_single_resource():
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        sys.stderr.write(traceback.format_exc())
 
 async def test_check_access_request_policy_multiple_resources():
     """Test the check_access_request_policy function with multiple resources"""
@@ -58,7 +61,7 @@ async def test_check_access_request_policy_multiple_resources():
     identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
     resource_ids = "95d4f3dd-a2c1-4838-8830-f39a56e2f1e7,29fb5413-d26b-4e7b-94ea-250b046432e8"  # Multiple resource IDs
     impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-    bearer_token = os.getenv("BEARER_TOKEN", "")  # Get from environment
+    bearer_token = BEARER_TOKEN
 
     print("="*80)
     print("Test 2: Multiple Resources SoD Policy Check")
@@ -85,8 +88,7 @@ async def test_check_access_request_policy_multiple_resources():
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        sys.stderr.write(traceback.format_exc())
 
 async def test_check_access_request_policy_validation():
     """Test validation - missing identity_id"""
@@ -94,7 +96,7 @@ async def test_check_access_request_policy_validation():
     identity_id = ""  # Empty identity_id
     resource_ids = "95d4f3dd-a2c1-4838-8830-f39a56e2f1e7"
     impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"
-    bearer_token = os.getenv("BEARER_TOKEN", "")
+    bearer_token = BEARER_TOKEN
 
     print("="*80)
     print("Test 3: Validation - Empty Identity ID")
@@ -125,7 +127,7 @@ async def test_check_access_request_policy_no_resources():
     identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"
     resource_ids = ""  # Empty resource_ids
     impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"
-    bearer_token = os.getenv("BEARER_TOKEN", "")
+    bearer_token = BEARER_TOKEN
 
     print("="*80)
     print("Test 4: Validation - No Resource IDs")
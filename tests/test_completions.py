@@ -0,0 +1,67 @@
+"""
+Test MCP completions through the request handler the server registers.
+
+Sends real CompleteRequests to FastMCP's low-level completion handler, so the
+response goes through the same CompleteResult validation an MCP client sees.
+"""
+import asyncio
+import os
+import sys
+
+import pytest
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+
+# Import completions.py from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completions import MAX_COMPLETION_RESULTS, _COMPLETIONS, register_completions
+
+_server = FastMCP("CompletionsTest")
+register_completions(_server)
+_handler = _server._mcp_server.request_handlers[types.CompleteRequest]
+
+_REF = types.PromptReference(type="ref/prompt", name="any")
+
+
+async def complete(argument_name: str, argument_value: str = "") -> types.Completion:
+    """Send a CompleteRequest for argument_name and return the Completion from the result"""
+    result = await _handler(types.CompleteRequest(
+        method="completion/complete",
+        params=types.CompleteRequestParams(
+            ref=_REF,
+            argument=types.CompletionArgument(name=argument_name, value=argument_value)
+        )
+    ))
+    return result.root.completion
+
+
+@pytest.mark.parametrize("argument_name", sorted(_COMPLETIONS))
+async def test_known_argument(argument_name):
+    """Known arguments return their values, capped, with total/hasMore for the full list"""
+    completion = await complete(argument_name)
+    expected = _COMPLETIONS[argument_name]
+    assert completion.values == list(expected[:MAX_COMPLETION_RESULTS])
+    assert completion.total == len(expected)
+    assert completion.hasMore == (len(expected) > MAX_COMPLETION_RESULTS)
+
+
+async def test_unknown_argument():
+    """Arguments without suggestions get an empty completion, not an error"""
+    completion = await complete("not_a_completed_argument")
+    assert completion.values == []
+
+
+async def main():
+    """Print the completions returned for every known argument"""
+    names = sorted(_COMPLETIONS)
+    completions = await asyncio.gather(*(complete(name) for name in names))
+    lines = []
+    for name, completion in zip(names, completions):
+        lines.append(f"\n{name} ({completion.total} values):")
+        lines.extend(f"  - {value}" for value in completion.values)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,10 @@
 import asyncio
 import json
-from server import create_access_request
+import os
+import sys
+
+import server
+from server import create_access_request_dict
 
 async def test_create_access_request():
     """Test harness for the create_access_request function"""
@@ -23,104 +27,103 @@ async def test_create_access_request():
 
     # Run each test case
     for i, test_case in enumerate(test_cases, 1):
-        print(f"--- Test {i}: {test_case['name']} ---")
+        # Collect this case's output and write it once at the end
+        out = [f"--- Test {i}: {test_case['name']} ---"]
 
         try:
-            # Call the function with test parameters
-            result = await create_access_request(**test_case['params'])
-
-            # Parse and display the result
-            parsed_result = json.loads(result)
+            # Call the function with test parameters (dict variant - no JSON round-trip)
+            parsed_result = await create_access_request_dict(**test_case['params'])
             status = parsed_result.get('status', 'unknown')
 
-            print(f"Status: {status}")
+            out.append(f"Status: {status}")
 
             # Show full HTTP body and GraphQL details
-            print("\n📋 FULL HTTP REQUEST/RESPONSE DETAILS:")
-            print("=" * 50)
+            out.append("\n📋 FULL HTTP REQUEST/RESPONSE DETAILS:")
+            out.append("=" * 50)
             if 'endpoint' in parsed_result:
-                print(f"GraphQL Endpoint: {parsed_result['endpoint']}")
+                out.append(f"GraphQL Endpoint: {parsed_result['endpoint']}")
 
             # Show HTTP debug information if available
             if 'http_debug' in parsed_result:
                 http_debug = parsed_result['http_debug']
 
-                print("\n🔍 RAW HTTP REQUEST BODY:")
+                out.append("\n🔍 RAW HTTP REQUEST BODY:")
                 if http_debug.get('raw_request_body'):
-                    print(http_debug['raw_request_body'])
+                    out.append(http_debug['raw_request_body'])
                 else:
-                    print("Not available")
+                    out.append("Not available")
 
-                print("\n🔍 RAW HTTP RESPONSE BODY:")
+                out.append("\n🔍 RAW HTTP RESPONSE BODY:")
                 if http_debug.get('raw_response_body'):
-                    print(http_debug['raw_response_body'])
+                    out.append(http_debug['raw_response_body'])
                 else:
-                    print("Not available")
+                    out.append("Not available")
 
-                print("\n🔍 REQUEST HEADERS:")
+                out.append("\n🔍 REQUEST HEADERS:")
                 if http_debug.get('request_headers'):
                     for key, value in http_debug['request_headers'].items():
-                        print(f"  {key}: {value}")
+                        out.append(f"  {key}: {value}")
                 else:
-                    print("Not available")
+                    out.append("Not available")
 
             # Show GraphQL errors if present
             if 'errors' in parsed_result:
-                print("\n❌ GraphQL Errors:")
-                print(json.dumps(parsed_result['errors'], indent=2))
+                out.append("\n❌ GraphQL Errors:")
+                out.append(json.dumps(parsed_result['errors'], indent=2))
 
             # Show the complete parsed result for debugging
-            print("\n📄 Complete Parsed Response:")
-            print(json.dumps(parsed_result, indent=2))
-            print("=" * 50)
+            out.append("\n📄 Complete Parsed Response:")
+            out.append(json.dumps(parsed_result, indent=2))
+            out.append("=" * 50)
 
             if status == 'success':
-                print(f"✅ SUCCESS")
-                print(f"   Access Request ID: {parsed_result.get('access_request_id', 'N/A')}")
-                print(f"   Message: {parsed_result.get('message', 'N/A')}")
-                print(f"   Impersonated User: {parsed_result.get('impersonated_user', 'N/A')}")
+                out.append(f"✅ SUCCESS")
+                out.append(f"   Access Request ID: {parsed_result.get('access_request_id', 'N/A')}")
+                out.append(f"   Message: {parsed_result.get('message', 'N/A')}")
+                out.append(f"   Impersonated User: {parsed_result.get('impersonated_user', 'N/A')}")
 
                 request_details = parsed_result.get('request_details', {})
                 if request_details:
-                    print(f"   Request Details:")
-                    print(f"     Reason: {request_details.get('reason', 'N/A')}")
-                    print(f"     Identity ID: {request_details.get('identity_id', 'N/A')}")
-                    print(f"     Resources: {request_details.get('resources', 'N/A')}")
+                    out.append(f"   Request Details:")
+                    out.append(f"     Reason: {request_details.get('reason', 'N/A')}")
+                    out.append(f"     Identity ID: {request_details.get('identity_id', 'N/A')}")
+                    out.append(f"     Resources: {request_details.get('resources', 'N/A')}")
                     if request_details.get('valid_from'):
-                        print(f"     Valid From: {request_details.get('valid_from')}")
+                        out.append(f"     Valid From: {request_details.get('valid_from')}")
                     if request_details.get('valid_to'):
-                        print(f"     Valid To: {request_details.get('valid_to')}")
+                        out.append(f"     Valid To: {request_details.get('valid_to')}")
                     if request_details.get('context'):
-                        print(f"     Context: {request_details.get('context')}")
+                        out.append(f"     Context: {request_details.get('context')}")
 
             elif status == 'error':
                 error_type = parsed_result.get('error_type', 'Unknown')
                 message = parsed_result.get('message', 'No message provided')
 
                 if error_type == 'ValidationError':
-                    print(f"❌ VALIDATION ERROR (Expected)")
+                    out.append(f"❌ VALIDATION ERROR (Expected)")
                 else:
-                    print(f"❌ ERROR")
+                    out.append(f"❌ ERROR")
 
-                print(f"   Error Type: {error_type}")
-                print(f"   Message: {message}")
+                out.append(f"   Error Type: {error_type}")
+                out.append(f"   Message: {message}")
 
                 # Show additional error details if available
                 if 'errors' in parsed_result:
-                    print(f"   GraphQL Errors: {parsed_result['errors']}")
+                    out.append(f"   GraphQL Errors: {parsed_result['errors']}")
                 if 'response_body' in parsed_result:
-                    print(f"   Response Body: {parsed_result['response_body']}")
+                    out.append(f"   Response Body: {parsed_result['response_body']}")
                 if 'endpoint' in parsed_result:
-                    print(f"   Endpoint: {parsed_result['endpoint']}")
+                    out.append(f"   Endpoint: {parsed_result['endpoint']}")
             else:
-                print(f"⚠️ UNEXPECTED STATUS: {status}")
-                print(f"   Full Response: {json.dumps(parsed_result, indent=2)}")
+                out.append(f"⚠️ UNEXPECTED STATUS: {status}")
+                out.append(f"   Full Response: {json.dumps(parsed_result, indent=2)}")
 
         except Exception as e:
-            print(f"💥 TEST EXECUTION FAILED: {str(e)}")
-            print(f"   Error Type: {type(e).__name__}")
+            out.append(f"💥 TEST EXECUTION FAILED: {str(e)}")
+            out.append(f"   Error Type: {type(e).__name__}")
 
-        print()
+        out.append("")
+        sys.stdout.write("\n".join(out) + "\n")
 
 async def interactive_test():
     """Interactive test function where you can input your own parameters"""
@@ -143,7 +146,7 @@ async def interactive_test():
     print("\n--- Executing Request ---")
 
     try:
-        result = await create_access_request(
+        parsed_result = await create_access_request_dict(
             impersonate_user=impersonate_user,
             reason=reason,
             context=context,
@@ -153,7 +156,6 @@ async def interactive_test():
         )
 
         print("Result:")
-        parsed_result = json.loads(result)
 
         # Show full HTTP body and GraphQL details
         print("\n📋 FULL HTTP REQUEST/RESPONSE DETAILS:")
@@ -198,6 +200,11 @@ async def interactive_test():
         print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
+    # This harness prints the raw HTTP details, so capture them unless OMADA_DEBUG_HTTP says otherwise.
+    # Set here rather than at import so collecting this file under pytest doesn't affect other tests;
+    # server reads DEBUG_HTTP on each request.
+    server.DEBUG_HTTP = os.getenv("OMADA_DEBUG_HTTP", "1") == "1"
+
     print("Choose test mode:")
     print("1. Run automated test cases")
     print("2. Interactive test")
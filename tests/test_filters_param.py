@@ -1,12 +1,29 @@
 import asyncio
 import json
-from server import get_cached_token
+import orjson
 import httpx
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Token saved by the user (same file the bearer token tests read)
+_BEARER_FILE = Path(__file__).parent / 'bearer.txt'
+
+def get_bearer_token():
+    """Return the bearer token from BEARER_TOKEN or tests/bearer.txt (the server no longer acquires tokens)"""
+    token = os.getenv("BEARER_TOKEN", "").strip()
+    if not token and _BEARER_FILE.exists():
+        token = _BEARER_FILE.read_text().strip()
+    if not token:
+        raise RuntimeError("No bearer token: set BEARER_TOKEN or save the token to tests/bearer.txt")
+    # Strip "Bearer " prefix if present
+    return token.replace("Bearer ", "").replace("bearer ", "").strip()
+
+# Read once at import; checked inside the test so a missing value doesn't break pytest collection
+OMADA_BASE_URL = os.getenv("OMADA_BASE_URL")
+
 async def test_filters_parameter():
     """Test the 'filters' parameter that was suggested by the GraphQL error"""
     
@@ -79,72 +96,85 @@ async def test_filters_parameter():
         }
     ]
     
-    for test_case in test_cases:
-        await test_single_filter(test_case["name"], test_case["query"])
+    if not OMADA_BASE_URL:
+        raise RuntimeError("OMADA_BASE_URL not found in environment variables")
+    # Endpoint is fixed for the run
+    graphql_url = f"{OMADA_BASE_URL}/api/Domain/2.6"
+
+    # Read the bearer token once and build the shared headers for all cases
+    base_headers = {
+        "Authorization": f"Bearer {get_bearer_token()}",
+        "Content-Type": "application/json",
+        "impersonate_user": "robwol@54mv4c.onmicrosoft.com"
+    }
+
+    # One client for all cases so the connection (and TLS session) is reused.
+    # The cases are independent, so run them concurrently and print reports in case order.
+    # HTTP/2 lets the concurrent probes share one multiplexed connection (needs httpx[http2])
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=20),
+        timeout=30.0
+    ) as client:
+        reports = await asyncio.gather(*(
+            test_single_filter(client, graphql_url, base_headers, test_case["name"], test_case["query"])
+            for test_case in test_cases
+        ))
+
+    for report in reports:
+        print("\n".join(report["lines"]))
+
+async def test_single_filter(client, url, headers, name, graphql_query):
+    """Test a single GraphQL filter against url using the shared client and headers (read-only, shared by all cases).
 
-async def test_single_filter(name, graphql_query, impersonate_user="robwol@54mv4c.onmicrosoft.com"):
-    """Test a single GraphQL filter"""
-    print(f"\n--- {name} ---")
-    print(f"Query:\n{graphql_query['query']}")
-    print("-" * 40)
+    Returns a report dict ({"name", "lines"}) instead of printing, so concurrent
+    cases don't interleave their output.
+    """
+    lines = [f"\n--- {name} ---", f"Query:\n{graphql_query['query']}", "-" * 40]
     
     try:
-        # Get OAuth access token
-        token_info = await get_cached_token()
-        token = token_info.get('access_token')
+        # Make the GraphQL request (body encoded once with orjson; Content-Type is set above)
+        body = orjson.dumps(graphql_query)
+        response = await client.post(
+            url,
+            content=body,
+            headers=headers
+        )
         
-        # Prepare headers
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "impersonate_user": impersonate_user
-        }
-        
-        # Get Omada base URL
-        omada_base_url = os.getenv("OMADA_BASE_URL")
-        graphql_url = f"{omada_base_url}/api/Domain/2.6"
-        
-        # Make the GraphQL request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                graphql_url,
-                json=graphql_query,
-                headers=headers,
-                timeout=30.0
-            )
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
             
-            if response.status_code == 200:
-                result = response.json()
+            if 'data' in result and 'accessRequests' in result['data']:
+                access_requests_obj = result['data']['accessRequests']
+                total = access_requests_obj.get('total', 0)
+                access_requests = access_requests_obj.get('data', [])
                 
-                if 'data' in result and 'accessRequests' in result['data']:
-                    access_requests_obj = result['data']['accessRequests']
-                    total = access_requests_obj.get('total', 0)
-                    access_requests = access_requests_obj.get('data', [])
-                    
-                    print(f"[SUCCESS] Found {total} total requests, {len(access_requests)} returned")
-                    
-                    # Show results
-                    for i, req in enumerate(access_requests[:3], 1):
-                        beneficiary = req.get('beneficiary', {})
-                        print(f"  {i}. Beneficiary: {beneficiary.get('displayName', 'N/A')} (ID: {beneficiary.get('identityId', 'N/A')})")
-                        print(f"     Resource: {req.get('resource', {}).get('name', 'N/A')}")
-                        
-                else:
-                    print("[ERROR] No accessRequests data found")
+                lines.append(f"[SUCCESS] Found {total} total requests, {len(access_requests)} returned")
+                
+                # Show results
+                for i, req in enumerate(access_requests[:3], 1):
+                    beneficiary = req.get('beneficiary', {})
+                    lines.append(f"  {i}. Beneficiary: {beneficiary.get('displayName', 'N/A')} (ID: {beneficiary.get('identityId', 'N/A')})")
+                    lines.append(f"     Resource: {req.get('resource', {}).get('name', 'N/A')}")
                     
             else:
-                print(f"[FAILED] Status {response.status_code}")
-                try:
-                    error_data = response.json()
-                    if 'errors' in error_data:
-                        for error in error_data['errors']:
-                            print(f"   Error: {error.get('message', 'Unknown error')}")
-                except:
-                    pass
-                print(f"   Response: {response.text[:200]}...")
+                lines.append("[ERROR] No accessRequests data found")
                 
+        else:
+            lines.append(f"[FAILED] Status {response.status_code}")
+            try:
+                error_data = orjson.loads(response.content)
+                if 'errors' in error_data:
+                    for error in error_data['errors']:
+                        lines.append(f"   Error: {error.get('message', 'Unknown error')}")
+            except:
+                pass
+            lines.append(f"   Response: {response.text[:200]}...")
+            
     except Exception as e:
-        print(f"[EXCEPTION] {str(e)}")
+        lines.append(f"[EXCEPTION] {str(e)}")
+
+    return {"name": name, "lines": lines}
 
 if __name__ == "__main__":
     asyncio.run(test_filters_parameter())
\ No newline at end of file
@@ -2,8 +2,13 @@
 Test script for get_calculated_assignments_detailed function
 """
 import asyncio
+import io
+import json
 import sys
 import os
+import traceback
+
+import pytest
 from dotenv import load_dotenv
 
 # Add the current directory to the path to import server module
@@ -14,138 +19,94 @@ from server import get_calculated_assignments_detailed
 # Load environment variables
 load_dotenv()
 
-async def test_basic():
-    """Test with mandatory parameters only"""
-
-    identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
-    impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-
-    print("="*80)
-    print("TEST 1: Basic test - mandatory parameters only")
-    print("="*80)
-    print(f"Identity ID: {identity_id}")
-    print(f"Impersonate User: {impersonate_user}")
-    print(f"Omada Base URL: {os.getenv('OMADA_BASE_URL')}")
-    print("="*80)
-    print()
-
-    try:
-        result = await get_calculated_assignments_detailed(
-            identity_id=identity_id,
-            impersonate_user=impersonate_user
-        )
-
-        print("✅ Result:")
-        print(result)
-
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
-
-async def test_with_filters():
-    """Test with optional filter parameters"""
-
-    identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
-    impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-
-    print("\n" + "="*80)
-    print("TEST 2: With all filters")
-    print("="*80)
-    print(f"Identity ID: {identity_id}")
-    print(f"Impersonate User: {impersonate_user}")
-    print(f"Resource Type: Active Directory - Security Group")
-    print(f"Compliance Status: NOT APPROVED")
-    print("="*80)
-    print()
-
-    try:
-        result = await get_calculated_assignments_detailed(
-            identity_id=identity_id,
-            impersonate_user=impersonate_user,
-            resource_type_name="Active Directory - Security Group",
-            compliance_status="NOT APPROVED"
-        )
-
-        print("✅ Result:")
-        print(result)
-
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
-
-async def test_compliance_filter_only():
-    """Test with compliance status filter only"""
-
-    identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
-    impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-
-    print("\n" + "="*80)
-    print("TEST 3: Compliance status filter only")
-    print("="*80)
-    print(f"Identity ID: {identity_id}")
-    print(f"Impersonate User: {impersonate_user}")
-    print(f"Compliance Status: NOT APPROVED")
-    print("="*80)
-    print()
-
-    try:
-        result = await get_calculated_assignments_detailed(
-            identity_id=identity_id,
-            impersonate_user=impersonate_user,
-            compliance_status="NOT APPROVED"
-        )
-
-        print("✅ Result:")
-        print(result)
-
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
-
-async def test_resource_type_filter_only():
-    """Test with resource type filter only"""
-
-    identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
-    impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
-
-    print("\n" + "="*80)
-    print("TEST 4: Resource type filter only")
-    print("="*80)
-    print(f"Identity ID: {identity_id}")
-    print(f"Impersonate User: {impersonate_user}")
-    print(f"Resource Type: Active Directory")
-    print("="*80)
-    print()
-
-    try:
-        result = await get_calculated_assignments_detailed(
-            identity_id=identity_id,
-            impersonate_user=impersonate_user,
-            resource_type_name="Active Directory"
-        )
-
-        print("✅ Result:")
-        print(result)
-
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+# Read once after load_dotenv
+OMADA_BASE_URL = os.getenv("OMADA_BASE_URL")
+BEARER_TOKEN = os.getenv("BEARER_TOKEN", "").strip()
+
+# Test fixtures shared by all tests
+IDENTITY_ID = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
+IMPERSONATE_USER = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
+
+# Test cases: title and the optional filter arguments passed on top of the fixtures above
+_CASES = [
+    ("Basic test - mandatory parameters only", {}),
+    ("With all filters", {
+        "resource_type_name": "Active Directory - Security Group",
+        "compliance_status": "NOT APPROVED"
+    }),
+    ("Compliance status filter only", {"compliance_status": "NOT APPROVED"}),
+    ("Resource type filter only", {"resource_type_name": "Active Directory"}),
+]
+
+# Banner label for each filter argument
+_FILTER_LABELS = {
+    "resource_type_name": "Resource Type",
+    "compliance_status": "Compliance Status",
+}
+
+async def run_case(number, title, filters, out=None):
+    """Run one get_calculated_assignments_detailed case, print its banner and result to out,
+    and return the parsed response (errors propagate to the caller)"""
+
+    print(("\n" if number > 1 else "") + "="*80, file=out)
+    print(f"TEST {number}: {title}", file=out)
+    print("="*80, file=out)
+    print(f"Identity ID: {IDENTITY_ID}", file=out)
+    print(f"Impersonate User: {IMPERSONATE_USER}", file=out)
+    if not filters:
+        print(f"Omada Base URL: {OMADA_BASE_URL}", file=out)
+    for name, value in filters.items():
+        print(f"{_FILTER_LABELS[name]}: {value}", file=out)
+    print("="*80, file=out)
+    print(file=out)
+
+    result = await get_calculated_assignments_detailed(
+        identity_ids=IDENTITY_ID,
+        impersonate_user=IMPERSONATE_USER,
+        bearer_token=BEARER_TOKEN,
+        **filters
+    )
+
+    print("✅ Result:", file=out)
+    print(result, file=out)
+    return json.loads(result)
+
+@pytest.mark.parametrize(
+    "number,title,filters",
+    [(number, title, filters) for number, (title, filters) in enumerate(_CASES, 1)],
+    ids=["basic", "all-filters", "compliance-only", "resource-type-only"]
+)
+async def test_calculated_assignments_detailed(number, title, filters):
+    """Test get_calculated_assignments_detailed with each case's filters"""
+    if not BEARER_TOKEN:
+        pytest.skip("BEARER_TOKEN not set")
+    parsed = await run_case(number, title, filters)
+    assert parsed.get("status") == "success", parsed
+
+async def main():
+    """Run all cases concurrently, then print each case's output in order"""
+    # Each case writes to its own buffer so concurrent output doesn't interleave
+    buffers = [io.StringIO() for _ in _CASES]
+    results = await asyncio.gather(
+        *(run_case(number, title, filters, out=buf)
+          for number, ((title, filters), buf) in enumerate(zip(_CASES, buffers), 1)),
+        return_exceptions=True
+    )
+
+    for buf, result in zip(buffers, results):
+        print(buf.getvalue(), end="")
+        if isinstance(result, Exception):
+            print(f"❌ Error: {str(result)}")
+            print(f"Error type: {type(result).__name__}")
+            print("".join(traceback.format_exception(type(result), result, result.__traceback__)), end="")
 
 if __name__ == "__main__":
+    if not BEARER_TOKEN:
+        raise SystemExit("BEARER_TOKEN required")
+
     print("\n🚀 Starting get_calculated_assignments_detailed tests\n")
 
-    # Run all tests
-    asyncio.run(test_basic())
-    asyncio.run(test_with_filters())
-    asyncio.run(test_compliance_filter_only())
-    asyncio.run(test_resource_type_filter_only())
+    # Run all tests (one event loop, requests overlap)
+    asyncio.run(main())
 
     print("\n✅ All tests completed!")
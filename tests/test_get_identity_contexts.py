@@ -4,6 +4,7 @@ Test script for get_identity_contexts function
 import asyncio
 import sys
 import os
+import traceback
 from dotenv import load_dotenv
 
 # Add the current directory to the path to import server module
@@ -14,19 +15,36 @@ from server import get_identity_contexts
 # Load environment variables
 load_dotenv()
 
+# Read once after load_dotenv
+OMADA_BASE_URL = os.getenv("OMADA_BASE_URL")
+
+def get_bearer_token():
+    """Read the bearer token from BEARER_TOKEN, prompting only when run interactively"""
+    token = os.getenv("BEARER_TOKEN", "").strip()
+    if not token and sys.stdin.isatty():
+        token = input("Enter bearer token: ").strip()
+    if not token:
+        raise SystemExit("BEARER_TOKEN required")
+    return token
+
 async def test_get_identity_contexts():
-    """Test the get_identity_contexts function"""
+    """Test the get_identity_contexts function
+
+    The bearer token comes from the BEARER_TOKEN environment variable (or .env),
+    so the test runs unattended; it only prompts when stdin is a terminal.
+    """
 
     # Test parameters - modify these as needed
     identity_id = "5da7f8fc-0119-46b0-a6b4-06e5c78edf68"  # Replace with actual identity ID
     impersonate_user = "berbla@54MV4C.ONMICROSOFT.COM"  # Replace with actual email
+    bearer_token = get_bearer_token()
 
     print("="*80)
     print("Testing get_identity_contexts function")
     print("="*80)
     print(f"Identity ID: {identity_id}")
     print(f"Impersonate User: {impersonate_user}")
-    print(f"Omada Base URL: {os.getenv('OMADA_BASE_URL')}")
+    print(f"Omada Base URL: {OMADA_BASE_URL}")
     print("="*80)
     print()
 
@@ -34,7 +52,8 @@ async def test_get_identity_contexts():
         # Call the function
         result = await get_identity_contexts(
             identity_id=identity_id,
-            impersonate_user=impersonate_user
+            impersonate_user=impersonate_user,
+            bearer_token=bearer_token
         )
 
         print("✅ Result:")
@@ -43,8 +62,7 @@ async def test_get_identity_contexts():
     except Exception as e:
         print(f"❌ Error: {str(e)}")
         print(f"Error type: {type(e).__name__}")
-        import traceback
-        traceback.print_exc()
+        sys.stderr.write(traceback.format_exc())
 
 if __name__ == "__main__":
     print("\n🚀 Starting get_identity_contexts tests\n")
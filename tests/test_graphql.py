@@ -1,30 +1,99 @@
 import asyncio
+import hashlib
 import json
 import httpx
-from server import get_cached_token
+import orjson
 from dotenv import load_dotenv
 import os
+import sys
+from functools import lru_cache
+from pathlib import Path
 
 # Load environment variables
 load_dotenv()
 
-async def test_graphql_access_requests():
-    """Test GraphQL access requests endpoint with OAuth token and impersonate-user header"""
-    print("=== TESTING GRAPHQL ACCESS REQUESTS ENDPOINT ===")
-    
-    try:
-        # Get OAuth access token
-        print("Getting OAuth access token...")
-        token_info = await get_cached_token()
-        token = token_info.get('access_token')
-        if not token:
-            raise Exception("Failed to obtain access token")
-        print("[SUCCESS] Successfully obtained access token")
-        
-        # First try to discover the schema structure for accessRequests
-        introspection_query = {
-            "query": """query IntrospectionQuery {
-  __schema {
+# One pooled HTTP/2 client per run, shared by every request (server tools already share server.http_client)
+_client = None
+
+async def get_client():
+    """Return the shared AsyncClient, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=30.0
+        )
+    return _client
+
+# Automatic persisted queries (APQ): send only the query's SHA-256 hash, and the full
+# text only when the server hasn't seen it yet. Opt-in with --apq: nothing shows Omada
+# supports APQ, and without it every run would pay a failed hash-only request first.
+# None = unknown, False = server doesn't support it.
+_apq_supported = None
+
+@lru_cache(maxsize=None)
+def _encode_query_bodies(query):
+    """Return the pre-encoded (plain, hash-only, full APQ) request bodies for a query, built once per query"""
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": hashlib.sha256(query.encode()).hexdigest()}}
+    return (orjson.dumps({"query": query}),
+            orjson.dumps({"extensions": extensions}),
+            orjson.dumps({"query": query, "extensions": extensions}))
+
+async def post_graphql(client, url, query, headers, use_apq=False):
+    """POST a GraphQL query; with use_apq, try the persisted-query hash before the full document
+
+    headers must include Content-Type: application/json (bodies are sent pre-encoded).
+    Returns the httpx.Response of whichever request answered the query.
+    """
+    global _apq_supported
+    plain_body, hash_body, full_body = _encode_query_bodies(query)
+
+    if not use_apq:
+        return await client.post(url, content=plain_body, headers=headers)
+
+    if _apq_supported is not False:
+        response = await client.post(url, content=hash_body, headers=headers)
+        try:
+            result = response.json()
+        except ValueError:
+            result = {}
+        if response.status_code == 200 and result.get('data') is not None:
+            _apq_supported = True
+            return response
+
+        # PersistedQueryNotFound just means "send the text once"; any other error means no APQ support
+        messages = " ".join(str(error.get('message', '')) for error in result.get('errors', []))
+        if "PersistedQueryNotFound" not in messages:
+            _apq_supported = False
+
+    # Full document (with the hash, so an APQ-capable server registers it for next time)
+    return await client.post(url, content=full_body, headers=headers)
+
+# Token saved by the user (same file the bearer token tests read)
+_BEARER_FILE = Path(__file__).parent / 'bearer.txt'
+
+def get_access_token():
+    """Return the bearer token from BEARER_TOKEN or tests/bearer.txt (the server no longer acquires tokens)"""
+    token = os.getenv("BEARER_TOKEN", "").strip()
+    if not token and _BEARER_FILE.exists():
+        token = _BEARER_FILE.read_text().strip()
+    if not token:
+        raise Exception("No bearer token: set BEARER_TOKEN or save the token to tests/bearer.txt")
+    # Strip "Bearer " prefix if present
+    return token.replace("Bearer ", "").replace("bearer ", "").strip()
+
+# Schema discovery for accessRequests. Only sent with --refresh-schema, which saves the result
+# to .schema_cache.json; normal runs skip introspection and report the cached query fields instead.
+_SCHEMA_CACHE_FILE = Path(__file__).parent / '.schema_cache.json'
+
+def load_cached_schema():
+    """Return the __schema saved by the last --refresh-schema run, or None if there isn't one"""
+    if not _SCHEMA_CACHE_FILE.exists():
+        return None
+    return orjson.loads(_SCHEMA_CACHE_FILE.read_bytes())
+
+_SCHEMA_SELECTION = """  __schema {
     queryType {
       fields {
         name
@@ -41,13 +110,10 @@ async def test_graphql_access_requests():
       }
     }
   }
-}"""
-        }
-        
-        # Try 'data' field for the items within PaginationListAccessRequest  
-        graphql_query = {
-            "query": """query MyQuery {
-  accessRequests {
+"""
+
+# Try 'data' field for the items within PaginationListAccessRequest
+_ACCESS_REQUESTS_SELECTION = """  accessRequests {
     total
     data {
       id
@@ -59,8 +125,30 @@ async def test_graphql_access_requests():
       }
     }
   }
-}"""
-        }
+"""
+
+# Full query documents, keyed by include_schema. One document: the schema selection rides
+# along in the same request when asked for, instead of costing a second round-trip
+_QUERY_DOCUMENTS = {
+    False: f"query MyQuery {{\n{_ACCESS_REQUESTS_SELECTION}}}",
+    True: f"query MyQuery {{\n{_SCHEMA_SELECTION}{_ACCESS_REQUESTS_SELECTION}}}",
+}
+
+async def test_graphql_access_requests(include_schema=False, use_apq=False):
+    """Test GraphQL access requests endpoint with OAuth token and impersonate-user header
+
+    With include_schema=True the __schema introspection is merged into the same query
+    document, so schema and data come back in one HTTP call, and the schema is saved
+    to .schema_cache.json. use_apq sends the query as an automatic persisted query (--apq).
+    """
+    # Collect the report and write it once at the end (one stdout write instead of a print per line)
+    lines = ["=== TESTING GRAPHQL ACCESS REQUESTS ENDPOINT ==="]
+    
+    try:
+        # Get the bearer token
+        lines.append("Reading bearer token...")
+        token = get_access_token()
+        lines.append("[SUCCESS] Bearer token loaded")
         
         # Prepare headers
         headers = {
@@ -77,76 +165,93 @@ async def test_graphql_access_requests():
         # GraphQL endpoint format: api/Domain/{{ApiVersion}} where ApiVersion is 2.6
         graphql_url = f"{omada_base_url}/api/Domain/2.6"
         
-        print(f"Making GraphQL request to: {graphql_url}")
-        print(f"Impersonating user: pawa@omada.net")
+        lines.append(f"Making GraphQL request to: {graphql_url}")
+        lines.append(f"Impersonating user: pawa@omada.net")
         
         # Make the GraphQL request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                graphql_url,
-                json=graphql_query,
-                headers=headers,
-                timeout=30.0
-            )
-            
-            print(f"Response status: {response.status_code}")
-            print(f"Response headers: {dict(response.headers)}")
+        client = await get_client()
+        response = await post_graphql(client, graphql_url, _QUERY_DOCUMENTS[include_schema], headers, use_apq)
+        
+        lines.append(f"Response status: {response.status_code}")
+        lines.append(f"Response headers: {dict(response.headers)}")
+        
+        if response.status_code == 200:
+            # Check if response is JSON
+            content_type = response.headers.get('content-type', '').lower()
+            if 'application/json' in content_type:
+                result = response.json()
+                lines.append("[SUCCESS] GraphQL request successful!")
+                lines.append("\n=== RESPONSE DATA ===")
+                lines.append(json.dumps(result, indent=2))
+            else:
+                lines.append(f"[INFO] Received non-JSON response (content-type: {content_type})")
+                lines.append("Response body (first 500 chars):")
+                lines.append(response.text[:500])
+                lines.append("...")
+                return
             
-            if response.status_code == 200:
-                # Check if response is JSON
-                content_type = response.headers.get('content-type', '').lower()
-                if 'application/json' in content_type:
-                    result = response.json()
-                    print("[SUCCESS] GraphQL request successful!")
-                    print("\n=== RESPONSE DATA ===")
-                    print(json.dumps(result, indent=2))
+            # Schema came back in the same response when requested; otherwise use the last saved one
+            schema = (result.get('data') or {}).get('__schema')
+            if schema:
+                query_fields = schema.get('queryType', {}).get('fields', [])
+                _SCHEMA_CACHE_FILE.write_bytes(orjson.dumps(schema))
+                lines.append(f"\n=== SCHEMA: {len(query_fields)} QUERY FIELDS (saved to {_SCHEMA_CACHE_FILE.name}) ===")
+            else:
+                schema = load_cached_schema()
+                if schema:
+                    query_fields = schema.get('queryType', {}).get('fields', [])
+                    lines.append(f"\n=== SCHEMA: {len(query_fields)} QUERY FIELDS (cached in {_SCHEMA_CACHE_FILE.name}) ===")
+                    lines.append(", ".join(field.get('name', '?') for field in query_fields))
                 else:
-                    print(f"[INFO] Received non-JSON response (content-type: {content_type})")
-                    print("Response body (first 500 chars):")
-                    print(response.text[:500])
-                    print("...")
-                    return
+                    lines.append("\n(No cached schema - run with --refresh-schema to fetch and save it)")
+            
+            # Parse and display access requests
+            if 'data' in result and 'accessRequests' in result['data']:
+                access_requests_obj = result['data']['accessRequests']
+                total = access_requests_obj.get('total', 0)
+                access_requests = access_requests_obj.get('data', [])
+                
+                lines.append(f"\n=== FOUND {total} ACCESS REQUESTS ({len(access_requests)} returned) ===")
                 
-                # Parse and display access requests
-                if 'data' in result and 'accessRequests' in result['data']:
-                    access_requests_obj = result['data']['accessRequests']
-                    total = access_requests_obj.get('total', 0)
-                    access_requests = access_requests_obj.get('data', [])
+                for i, request in enumerate(access_requests, 1):
+                    request_id = request.get('id', 'N/A')
+                    beneficiary = request.get('beneficiary', {})
                     
-                    print(f"\n=== FOUND {total} ACCESS REQUESTS ({len(access_requests)} returned) ===")
+                    first_name = beneficiary.get('firstName', 'N/A')
+                    last_name = beneficiary.get('lastName', 'N/A')
+                    identity_id = beneficiary.get('identityId', 'N/A')
+                    beneficiary_id = beneficiary.get('id', 'N/A')
                     
-                    for i, request in enumerate(access_requests, 1):
-                        request_id = request.get('id', 'N/A')
-                        beneficiary = request.get('beneficiary', {})
-                        
-                        first_name = beneficiary.get('firstName', 'N/A')
-                        last_name = beneficiary.get('lastName', 'N/A')
-                        identity_id = beneficiary.get('identityId', 'N/A')
-                        beneficiary_id = beneficiary.get('id', 'N/A')
-                        
-                        print(f"{i}. Request ID: {request_id}")
-                        print(f"   Beneficiary: {first_name} {last_name}")
-                        print(f"   Identity ID: {identity_id}")
-                        print(f"   Beneficiary ID: {beneficiary_id}")
-                        print()
-                        
-                    if total == 0:
-                        print("No access requests found for the impersonated user.")
-                        
-                else:
-                    print("No access requests found in response")
+                    lines.append(f"{i}. Request ID: {request_id}")
+                    lines.append(f"   Beneficiary: {first_name} {last_name}")
+                    lines.append(f"   Identity ID: {identity_id}")
+                    lines.append(f"   Beneficiary ID: {beneficiary_id}")
+                    lines.append("")
+                    
+                if total == 0:
+                    lines.append("No access requests found for the impersonated user.")
                     
             else:
-                print(f"[FAILED] GraphQL request failed with status {response.status_code}")
-                print(f"Response body: {response.text}")
+                lines.append("No access requests found in response")
                 
+        else:
+            lines.append(f"[FAILED] GraphQL request failed with status {response.status_code}")
+            lines.append(f"Response body: {response.text}")
+            
     except Exception as e:
-        print(f"[ERROR] Error during GraphQL test: {str(e)}")
-        print(f"Error type: {type(e).__name__}")
+        lines.append(f"[ERROR] Error during GraphQL test: {str(e)}")
+        lines.append(f"Error type: {type(e).__name__}")
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 async def main():
     """Run the GraphQL test"""
-    await test_graphql_access_requests()
+    try:
+        await test_graphql_access_requests(include_schema="--refresh-schema" in sys.argv,
+                                           use_apq="--apq" in sys.argv)
+    finally:
+        if _client is not None:
+            await _client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -7,7 +7,8 @@ Comprehensive tests for various operators and field combinations.
 import asyncio
 import sys
 import os
-import json
+
+import orjson
 
 # Add the current directory to Python path so we can import from server.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,56 +16,181 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from server import query_omada_identity
 
 
+# Only strip non-ASCII characters from unparseable results when the console can't print them
+_STDOUT_ASCII = (sys.stdout.encoding or "").lower().replace("-", "") not in ("utf8", "utf16")
+
+# Row prefix for each displayable field, e.g. "1. ID: ..., FirstName: ..."
+_FIELD_LABELS = {
+    'Id': " ID: ",
+    'FIRSTNAME': ", FirstName: ",
+    'LASTNAME': ", LastName: ",
+    'DISPLAYNAME': ", DisplayName: ",
+}
+
+
 def display_filtered_result(result_json, test_name, show_fields=None):
     """Extract and display specific fields from the JSON result"""
     if show_fields is None:
         show_fields = ['Id', 'DISPLAYNAME']
         
+    # Collect the whole block and write it once (one stdout write instead of a print per line)
+    lines = [f"\n{test_name}", "=" * 60]
     try:
-        # Parse the JSON string
-        data = json.loads(result_json)
+        # Parse the JSON string (orjson takes str or bytes directly)
+        data = orjson.loads(result_json)
         
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print(f"Status: {data.get('status', 'N/A')}")
-        print(f"Entity Type: {data.get('entity_type', 'N/A')}")
-        print(f"Entities Returned: {data.get('entities_returned', 'N/A')}")
-        print(f"Filter: {data.get('filter', 'N/A')}")
+        lines.append(f"Status: {data.get('status', 'N/A')}")
+        lines.append(f"Entity Type: {data.get('entity_type', 'N/A')}")
+        lines.append(f"Entities Returned: {data.get('entities_returned', 'N/A')}")
+        lines.append(f"Filter: {data.get('filter', 'N/A')}")
         
         # Extract specified fields from data.value array
-        if 'data' in data and 'value' in data['data']:
-            print("\nIdentities:")
-            print("-" * 40)
-            for i, item in enumerate(data['data']['value'], 1):
-                result_line = f"{i}."
-                for field in show_fields:
-                    value = item.get(field, 'N/A')
-                    if field == 'Id':
-                        result_line += f" ID: {value}"
-                    elif field == 'FIRSTNAME':
-                        result_line += f", FirstName: {value}"
-                    elif field == 'LASTNAME':
-                        result_line += f", LastName: {value}"
-                    elif field == 'DISPLAYNAME':
-                        result_line += f", DisplayName: {value}"
-                print(result_line)
+        identities = (data.get('data') or {}).get('value')
+        if identities is not None:
+            # Build the row template once; fields without a label are not displayed
+            fields = [field for field in show_fields if field in _FIELD_LABELS]
+            line_format = "{}." + "".join(_FIELD_LABELS[field] + "{}" for field in fields)
+            lines.append("\nIdentities:")
+            lines.append("-" * 40)
+            for i, item in enumerate(identities, 1):
+                lines.append(line_format.format(i, *[item.get(field, 'N/A') for field in fields]))
         else:
-            print("\nNo identity data found")
+            lines.append("\nNo identity data found")
             
-    except json.JSONDecodeError:
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print("Error parsing JSON result:")
-        # Handle Unicode encoding issues by removing non-ASCII characters
+    except orjson.JSONDecodeError:
+        lines.append("Error parsing JSON result:")
+        # Handle Unicode encoding issues by removing non-ASCII characters (non-UTF consoles only)
         try:
-            clean_result = result_json.encode('ascii', 'ignore').decode('ascii')
-            print(clean_result[:200] + "..." if len(clean_result) > 200 else clean_result)
+            clean_result = result_json.encode('ascii', 'ignore').decode('ascii') if _STDOUT_ASCII else result_json
+            lines.append(clean_result[:200] + "..." if len(clean_result) > 200 else clean_result)
         except:
-            print("Unable to display error response due to encoding issues")
+            lines.append("Unable to display error response due to encoding issues")
     except Exception as e:
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print(f"Error processing result: {repr(e)}")
+        lines.append(f"Error processing result: {repr(e)}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+# Search cases: title, filters, extra query_omada_identity kwargs, fields to display.
+# Numbered 1-8 (basic) and 9-14 (operators) in the interactive menu.
+_BASIC_EXAMPLES = [
+    {
+        "title": "Basic Example 1: Exact firstname and lastname match",
+        "filters": [
+            {"field": "FIRSTNAME", "value": "John", "operator": "eq"},
+            {"field": "LASTNAME", "value": "Doe", "operator": "eq"}
+        ],
+        "kwargs": {},
+        "fields": ['Id', 'FIRSTNAME', 'LASTNAME'],
+    },
+    {
+        "title": "Basic Example 2: Partial matches (startswith + contains)",
+        "filters": [
+            {"field": "FIRSTNAME", "value": "John", "operator": "startswith"},
+            {"field": "LASTNAME", "value": "Smith", "operator": "contains"}
+        ],
+        "kwargs": {},
+        "fields": ['Id', 'FIRSTNAME', 'LASTNAME'],
+    },
+    {
+        "title": "Basic Example 3: Search by firstname only",
+        "filters": [{"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}],
+        "kwargs": {"top": 3, "select_fields": "Id,FIRSTNAME"},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+    {
+        "title": "Basic Example 4: Count-only search (firstname starts with 'A')",
+        "filters": [{"field": "FIRSTNAME", "value": "A", "operator": "startswith"}],
+        "kwargs": {"count_only": True},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+    {
+        "title": "Basic Example 5: Search by exact email address",
+        "filters": [{"field": "EMAIL", "value": "berbla@54MV4C.ONMICROSOFT.COM", "operator": "eq"}],
+        "kwargs": {"select_fields": "Id,EMAIL,DISPLAYNAME,FIRSTNAME,LASTNAME"},
+        "fields": ['Id', 'EMAIL', 'DISPLAYNAME'],
+    },
+    {
+        "title": "Basic Example 6: Search by email domain",
+        "filters": [{"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"}],
+        "kwargs": {"top": 5, "select_fields": "Id,EMAIL,DISPLAYNAME"},
+        "fields": ['Id', 'EMAIL', 'DISPLAYNAME'],
+    },
+    {
+        "title": "Basic Example 7: Search by email contains pattern",
+        "filters": [{"field": "EMAIL", "value": "robwol", "operator": "contains"}],
+        "kwargs": {"top": 3, "select_fields": "Id,EMAIL,DISPLAYNAME"},
+        "fields": ['Id', 'EMAIL', 'DISPLAYNAME'],
+    },
+    {
+        "title": "Basic Example 8: Combined email domain and firstname search",
+        "filters": [
+            {"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"},
+            {"field": "FIRSTNAME", "value": "Rob", "operator": "startswith"}
+        ],
+        "kwargs": {"top": 3, "select_fields": "Id,EMAIL,FIRSTNAME,LASTNAME,DISPLAYNAME"},
+        "fields": ['Id', 'EMAIL', 'FIRSTNAME', 'DISPLAYNAME'],
+    },
+]
+
+_OPERATOR_TESTS = [
+    {
+        "title": "Operator Test 1: Firstname NOT EQUALS 'Emma'",
+        "filters": [{"field": "FIRSTNAME", "value": "Emma", "operator": "ne"}],
+        "kwargs": {"top": 5, "select_fields": "Id,FIRSTNAME"},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+    {
+        "title": "Operator Test 2: Combined (firstname ne 'Emma' AND lastname startswith 'T')",
+        "filters": [
+            {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"},
+            {"field": "LASTNAME", "value": "T", "operator": "startswith"}
+        ],
+        "kwargs": {"top": 3, "select_fields": "Id,FIRSTNAME,LASTNAME"},
+        "fields": ['Id', 'FIRSTNAME', 'LASTNAME'],
+    },
+    {
+        "title": "Operator Test 3: Contains operator (firstname contains 'mm')",
+        "filters": [{"field": "FIRSTNAME", "value": "mm", "operator": "contains"}],
+        "kwargs": {"top": 3, "select_fields": "Id,FIRSTNAME"},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+    {
+        "title": "Operator Test 4: Startswith operator (lastname startswith 'Tay')",
+        "filters": [{"field": "LASTNAME", "value": "Tay", "operator": "startswith"}],
+        "kwargs": {"top": 3, "select_fields": "Id,LASTNAME"},
+        "fields": ['Id', 'LASTNAME'],
+    },
+    {
+        # Like operator may have syntax issues in OData
+        "title": "Operator Test 5: Like operator (firstname like 'Em%') - May not be supported",
+        "filters": [{"field": "FIRSTNAME", "value": "Em%", "operator": "like"}],
+        "kwargs": {"top": 3, "select_fields": "Id,FIRSTNAME"},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+    {
+        "title": "Operator Test 6: Equals operator (firstname eq 'Emma') - Reference working test",
+        "filters": [{"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}],
+        "kwargs": {"top": 3, "select_fields": "Id,FIRSTNAME"},
+        "fields": ['Id', 'FIRSTNAME'],
+    },
+]
+
+# Max searches in flight at once, to stay clear of Omada rate limits
+_MAX_CONCURRENT_SEARCHES = 4
+
+
+async def run_searches(cases):
+    """Run search cases concurrently (bounded), then display the results in case order."""
+    sem = asyncio.Semaphore(_MAX_CONCURRENT_SEARCHES)
+
+    async def run_one(case):
+        async with sem:
+            return await query_omada_identity(case["filters"], **case["kwargs"])
+
+    results = await asyncio.gather(*(run_one(case) for case in cases))
+    for result, case in zip(results, cases):
+        display_filtered_result(result, case["title"], case["fields"])
 
 
 async def test_basic_examples():
@@ -73,56 +199,7 @@ async def test_basic_examples():
     print("🔍 BASIC IDENTITY SEARCH EXAMPLES")
     print("=" * 60)
     
-    # Example 1: Search for exact matches
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "John", "operator": "eq"},
-        {"field": "LASTNAME", "value": "Doe", "operator": "eq"}
-    ])
-    display_filtered_result(result, "Basic Example 1: Exact firstname and lastname match", ['Id', 'FIRSTNAME', 'LASTNAME'])
-    
-    # Example 2: Search with partial matches
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "John", "operator": "startswith"},
-        {"field": "LASTNAME", "value": "Smith", "operator": "contains"}
-    ])
-    display_filtered_result(result, "Basic Example 2: Partial matches (startswith + contains)", ['Id', 'FIRSTNAME', 'LASTNAME'])
-    
-    # Example 3: Search with just firstname
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Basic Example 3: Search by firstname only", ['Id', 'FIRSTNAME'])
-    
-    # Example 4: Count-only search
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "A", "operator": "startswith"}
-    ], count_only=True)
-    display_filtered_result(result, "Basic Example 4: Count-only search (firstname starts with 'A')", ['Id', 'FIRSTNAME'])
-
-    # Example 5: Search by exact email address
-    result = await query_omada_identity([
-        {"field": "EMAIL", "value": "berbla@54MV4C.ONMICROSOFT.COM", "operator": "eq"}
-    ], select_fields="Id,EMAIL,DISPLAYNAME,FIRSTNAME,LASTNAME")
-    display_filtered_result(result, "Basic Example 5: Search by exact email address", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    # Example 6: Search by email domain
-    result = await query_omada_identity([
-        {"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"}
-    ], top=5, select_fields="Id,EMAIL,DISPLAYNAME")
-    display_filtered_result(result, "Basic Example 6: Search by email domain", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    # Example 7: Search by email contains pattern
-    result = await query_omada_identity([
-        {"field": "EMAIL", "value": "robwol", "operator": "contains"}
-    ], top=3, select_fields="Id,EMAIL,DISPLAYNAME")
-    display_filtered_result(result, "Basic Example 7: Search by email contains pattern", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    # Example 8: Combined email and name search
-    result = await query_omada_identity([
-        {"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"},
-        {"field": "FIRSTNAME", "value": "Rob", "operator": "startswith"}
-    ], top=3, select_fields="Id,EMAIL,FIRSTNAME,LASTNAME,DISPLAYNAME")
-    display_filtered_result(result, "Basic Example 8: Combined email domain and firstname search", ['Id', 'EMAIL', 'FIRSTNAME', 'DISPLAYNAME'])
+    await run_searches(_BASIC_EXAMPLES)
 
 
 async def test_operator_variations():
@@ -131,136 +208,19 @@ async def test_operator_variations():
     print("\n🧪 OPERATOR VARIATION TESTS (from test_operators.py)")
     print("=" * 60)
     
-    # Test 1: NOT EQUALS operator
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"}
-    ], top=5, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Operator Test 1: Firstname NOT EQUALS 'Emma'", ['Id', 'FIRSTNAME'])
-    
-    # Test 2: Combined operators - firstname ne and lastname startswith
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"},
-        {"field": "LASTNAME", "value": "T", "operator": "startswith"}
-    ], top=3, select_fields="Id,FIRSTNAME,LASTNAME")
-    display_filtered_result(result, "Operator Test 2: Combined (firstname ne 'Emma' AND lastname startswith 'T')", ['Id', 'FIRSTNAME', 'LASTNAME'])
-
-    # Test 3: Contains operator
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "mm", "operator": "contains"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Operator Test 3: Contains operator (firstname contains 'mm')", ['Id', 'FIRSTNAME'])
-    
-    # Test 4: Startswith operator
-    result = await query_omada_identity([
-        {"field": "LASTNAME", "value": "Tay", "operator": "startswith"}
-    ], top=3, select_fields="Id,LASTNAME")
-    display_filtered_result(result, "Operator Test 4: Startswith operator (lastname startswith 'Tay')", ['Id', 'LASTNAME'])
-    
-    # Test 5: Like operator (may have syntax issues in OData)
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Em%", "operator": "like"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Operator Test 5: Like operator (firstname like 'Em%') - May not be supported", ['Id', 'FIRSTNAME'])
-    
-    # Test 6: Reference equals test
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Operator Test 6: Equals operator (firstname eq 'Emma') - Reference working test", ['Id', 'FIRSTNAME'])
+    await run_searches(_OPERATOR_TESTS)
 
 
 async def run_individual_basic_test(test_number):
     """Run a specific basic test example by number."""
-    if test_number == 1:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "John", "operator": "eq"},
-            {"field": "LASTNAME", "value": "Doe", "operator": "eq"}
-        ])
-        display_filtered_result(result, "Basic Example 1: Exact firstname and lastname match", ['Id', 'FIRSTNAME', 'LASTNAME'])
-
-    elif test_number == 2:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "John", "operator": "startswith"},
-            {"field": "LASTNAME", "value": "Smith", "operator": "contains"}
-        ])
-        display_filtered_result(result, "Basic Example 2: Partial matches (startswith + contains)", ['Id', 'FIRSTNAME', 'LASTNAME'])
-
-    elif test_number == 3:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}
-        ], top=3, select_fields="Id,FIRSTNAME")
-        display_filtered_result(result, "Basic Example 3: Search by firstname only", ['Id', 'FIRSTNAME'])
-
-    elif test_number == 4:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "A", "operator": "startswith"}
-        ], count_only=True)
-        display_filtered_result(result, "Basic Example 4: Count-only search (firstname starts with 'A')", ['Id', 'FIRSTNAME'])
-
-    elif test_number == 5:
-        result = await query_omada_identity([
-            {"field": "EMAIL", "value": "berbla@54MV4C.ONMICROSOFT.COM", "operator": "eq"}
-        ], select_fields="Id,EMAIL,DISPLAYNAME,FIRSTNAME,LASTNAME")
-        display_filtered_result(result, "Basic Example 5: Search by exact email address", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    elif test_number == 6:
-        result = await query_omada_identity([
-            {"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"}
-        ], top=5, select_fields="Id,EMAIL,DISPLAYNAME")
-        display_filtered_result(result, "Basic Example 6: Search by email domain", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    elif test_number == 7:
-        result = await query_omada_identity([
-            {"field": "EMAIL", "value": "robwol", "operator": "contains"}
-        ], top=3, select_fields="Id,EMAIL,DISPLAYNAME")
-        display_filtered_result(result, "Basic Example 7: Search by email contains pattern", ['Id', 'EMAIL', 'DISPLAYNAME'])
-
-    elif test_number == 8:
-        result = await query_omada_identity([
-            {"field": "EMAIL", "value": "@54MV4C.ONMICROSOFT.COM", "operator": "endswith"},
-            {"field": "FIRSTNAME", "value": "Rob", "operator": "startswith"}
-        ], top=3, select_fields="Id,EMAIL,FIRSTNAME,LASTNAME,DISPLAYNAME")
-        display_filtered_result(result, "Basic Example 8: Combined email domain and firstname search", ['Id', 'EMAIL', 'FIRSTNAME', 'DISPLAYNAME'])
+    if 1 <= test_number <= len(_BASIC_EXAMPLES):
+        await run_searches([_BASIC_EXAMPLES[test_number - 1]])
 
 
 async def run_individual_operator_test(test_number):
     """Run a specific operator test by number."""
-    if test_number == 9:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"}
-        ], top=5, select_fields="Id,FIRSTNAME")
-        display_filtered_result(result, "Operator Test 1: Firstname NOT EQUALS 'Emma'", ['Id', 'FIRSTNAME'])
-
-    elif test_number == 10:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"},
-            {"field": "LASTNAME", "value": "T", "operator": "startswith"}
-        ], top=3, select_fields="Id,FIRSTNAME,LASTNAME")
-        display_filtered_result(result, "Operator Test 2: Combined (firstname ne 'Emma' AND lastname startswith 'T')", ['Id', 'FIRSTNAME', 'LASTNAME'])
-
-    elif test_number == 11:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "mm", "operator": "contains"}
-        ], top=3, select_fields="Id,FIRSTNAME")
-        display_filtered_result(result, "Operator Test 3: Contains operator (firstname contains 'mm')", ['Id', 'FIRSTNAME'])
-
-    elif test_number == 12:
-        result = await query_omada_identity([
-            {"field": "LASTNAME", "value": "Tay", "operator": "startswith"}
-        ], top=3, select_fields="Id,LASTNAME")
-        display_filtered_result(result, "Operator Test 4: Startswith operator (lastname startswith 'Tay')", ['Id', 'LASTNAME'])
-
-    elif test_number == 13:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "Em%", "operator": "like"}
-        ], top=3, select_fields="Id,FIRSTNAME")
-        display_filtered_result(result, "Operator Test 5: Like operator (firstname like 'Em%') - May not be supported", ['Id', 'FIRSTNAME'])
-
-    elif test_number == 14:
-        result = await query_omada_identity([
-            {"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}
-        ], top=3, select_fields="Id,FIRSTNAME")
-        display_filtered_result(result, "Operator Test 6: Equals operator (firstname eq 'Emma') - Reference working test", ['Id', 'FIRSTNAME'])
+    if 9 <= test_number <= 8 + len(_OPERATOR_TESTS):
+        await run_searches([_OPERATOR_TESTS[test_number - 9]])
 
 
 def display_test_menu():
@@ -1,5 +1,7 @@
 import asyncio
-import json
+import sys
+
+import orjson
 
 async def test_mcp_access_requests():
     """Test the MCP server's get_access_requests tool"""
@@ -15,33 +17,46 @@ async def test_mcp_access_requests():
         "admin@example.com"  # This should fail as it's likely not a valid user
     ]
     
-    for email in test_emails:
-        print(f"\n--- Testing with: {email} ---")
+    # Fetch all users concurrently (bounded), then print the results in list order
+    sem = asyncio.Semaphore(10)
+
+    async def _one(email):
+        async with sem:
+            return await get_access_requests(email)
+
+    results = await asyncio.gather(*(_one(email) for email in test_emails), return_exceptions=True)
+
+    for email, result in zip(test_emails, results):
+        # One stdout write per user instead of a print per line
+        lines = [f"\n--- Testing with: {email} ---"]
         try:
-            result = await get_access_requests(email)
-            # Parse the JSON result to display nicely
-            parsed = json.loads(result)
+            if isinstance(result, Exception):
+                raise result
+            # Parse the JSON result to display nicely (orjson takes str or bytes directly)
+            parsed = orjson.loads(result)
             
             status = parsed.get('status', 'unknown')
             total = parsed.get('total_requests', 0)
             
-            print(f"Status: {status}")
-            print(f"Total Requests: {total}")
+            lines.append(f"Status: {status}")
+            lines.append(f"Total Requests: {total}")
             
             if status == 'success' and total > 0:
-                print("Access Requests:")
+                lines.append("Access Requests:")
                 for i, request in enumerate(parsed['data']['access_requests'], 1):
                     beneficiary = request.get('beneficiary', {})
-                    print(f"  {i}. ID: {request.get('id', 'N/A')}")
-                    print(f"     Beneficiary: {beneficiary.get('firstName', '')} {beneficiary.get('lastName', '')}")
-                    print(f"     Identity ID: {beneficiary.get('identityId', 'N/A')}")
+                    lines.append(f"  {i}. ID: {request.get('id', 'N/A')}")
+                    lines.append(f"     Beneficiary: {beneficiary.get('firstName', '')} {beneficiary.get('lastName', '')}")
+                    lines.append(f"     Identity ID: {beneficiary.get('identityId', 'N/A')}")
             elif status == 'success':
-                print("No access requests found for this user.")
+                lines.append("No access requests found for this user.")
             else:
-                print(f"Error: {parsed.get('message', 'Unknown error')}")
+                lines.append(f"Error: {parsed.get('message', 'Unknown error')}")
                 
         except Exception as e:
-            print(f"Test failed: {str(e)}")
+            lines.append(f"Test failed: {str(e)}")
+
+        sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
     asyncio.run(test_mcp_access_requests())
\ No newline at end of file
@@ -1,47 +1,134 @@
 import asyncio
+import contextvars
+import importlib
+import importlib.util
+import io
 import os
+import re
 import sys
 import argparse
-import json
+from itertools import islice
+
+import orjson
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
+OMADA_BASE_URL = os.getenv("OMADA_BASE_URL")
 
 # Import after loading env vars
-from server import query_omada_identity, query_omada_resources, _cached_token
+from server import query_omada_identity, query_omada_resources
 
-# Import test functions from other test files
-try:
-    from test_operators import test_firstname_not_equals, test_other_operators
-except ImportError:
-    test_firstname_not_equals = test_other_operators = None
-    
-try:
-    from test_resourceassignments import (test_resourceassignments_count, test_resourceassignments_sample, 
-                                        test_resourceassignments_by_identity, test_resourceassignments_by_resource)
-except ImportError:
-    test_resourceassignments_count = test_resourceassignments_sample = None
-    test_resourceassignments_by_identity = test_resourceassignments_by_resource = None
-    
-try:
-    from test_system import test_system_count, test_system_sample, test_system_by_name
-except ImportError:
-    test_system_count = test_system_sample = test_system_by_name = None
-    
-try:
-    from test_calculated_assignments import main as test_calculated_assignments_main
-except ImportError:
-    test_calculated_assignments_main = None
-    
-try:
-    from test_errors import main as test_errors_main
-except ImportError:
-    test_errors_main = None
+# Optional suites from other test files: module -> {name bound here: attribute in that module}.
+# Names stay None when the module is absent, so the run_* helpers can report it.
+_OPTIONAL_SUITES = {
+    "test_operators": {
+        "test_firstname_not_equals": "test_firstname_not_equals",
+        "test_other_operators": "test_other_operators",
+    },
+    "test_resourceassignments": {
+        "test_resourceassignments_count": "test_resourceassignments_count",
+        "test_resourceassignments_sample": "test_resourceassignments_sample",
+        "test_resourceassignments_by_identity": "test_resourceassignments_by_identity",
+        "test_resourceassignments_by_resource": "test_resourceassignments_by_resource",
+    },
+    "test_system": {
+        "test_system_count": "test_system_count",
+        "test_system_sample": "test_system_sample",
+        "test_system_by_name": "test_system_by_name",
+    },
+    "test_calculated_assignments": {"test_calculated_assignments_main": "main"},
+    "test_errors": {"test_errors_main": "main"},
+}
+
+# Defaults for every name above, rebound by _import_optional_suites when the module is present
+test_firstname_not_equals = test_other_operators = None
+test_resourceassignments_count = test_resourceassignments_sample = None
+test_resourceassignments_by_identity = test_resourceassignments_by_resource = None
+test_system_count = test_system_sample = test_system_by_name = None
+test_calculated_assignments_main = None
+test_errors_main = None
+
+def _import_optional_suites():
+    """Bind the optional suite functions; find_spec skips absent modules without raising ImportError"""
+    for module_name, names in _OPTIONAL_SUITES.items():
+        module = None
+        if importlib.util.find_spec(module_name) is not None:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                pass  # present but missing one of its own dependencies
+        for name, attr in names.items():
+            globals()[name] = getattr(module, attr, None)
+
+_import_optional_suites()
 
 # Global variable to control output
 show_output = True
 
+# Maximum number of core tests / suites in flight at once (--jobs)
+jobs = 8
+
+# Concurrent suites print through the imported test modules, so stdout is routed per task:
+# while run_buffered is active, each task's writes go to its own buffer (see _TaskRoutedStdout)
+_task_output = contextvars.ContextVar("_task_output", default=None)
+
+class _TaskRoutedStdout:
+    """sys.stdout stand-in that writes to the current task's buffer, or the real stream outside one"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        return (_task_output.get() or self._stream).write(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+async def _buffered(coro):
+    """Await coro with its output captured; returns (output, result or exception)"""
+    buf = io.StringIO()
+    _task_output.set(buf)  # gather runs coro in its own task, so this only affects that task
+    try:
+        result = await coro
+    except Exception as e:
+        result = e
+    return buf.getvalue(), result
+
+async def run_buffered(*coros):
+    """Run coroutines concurrently, print their output in argument order, return their results"""
+    real_stdout = sys.stdout
+    if not isinstance(real_stdout, _TaskRoutedStdout):
+        sys.stdout = _TaskRoutedStdout(real_stdout)
+    try:
+        outcomes = await asyncio.gather(*(_buffered(coro) for coro in coros))
+    finally:
+        sys.stdout = real_stdout
+
+    for output, _ in outcomes:
+        sys.stdout.write(output)
+    return [result for _, result in outcomes]
+
+def bounded(*coros):
+    """Wrap coros so at most `jobs` of them run at once when gathered.
+
+    Used only at the top level (core tests, suites): a suite that gathers its own tests
+    must not wait on a slot held by itself.
+    """
+    semaphore = asyncio.Semaphore(max(jobs, 1))
+
+    async def guarded(coro):
+        async with semaphore:
+            return await coro
+
+    return [guarded(coro) for coro in coros]
+
+def raise_first_error(results):
+    """Re-raise the first exception returned by run_buffered, if any"""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
 def show_usage():
     """Display usage information and key features."""
     print("""
@@ -92,110 +179,134 @@ Usage examples:
 - python test_omada.py --showOutput                 # runs all tests with full JSON output
 - python test_omada.py --testsuite core --showOutput    # runs core tests with full JSON output
 - python test_omada.py --testsuite operators --showOutput  # runs operator tests with full output
+- python test_omada.py --jobs 2                     # at most 2 core tests / suites at once (default: 8)
 - python test_omada.py usage                        # shows this usage information
 
 The script gracefully handles missing test files and will skip test suites 
 that aren't available, showing appropriate messages.
 """)
 
+def _parse_result(result):
+    """Return a tool result as a dict: parsed once from a JSON str/bytes, or passed through if already a dict.
+
+    Returns None for other types (printers treat those as a plain success).
+    """
+    if isinstance(result, dict):
+        return result
+    if isinstance(result, (str, bytes)):
+        return orjson.loads(result)
+    return None
+
+# Row prefix for each displayable identity field, e.g. "1. ID: ..., FirstName: ..."
+_FIELD_LABELS = {
+    'Id': " ID: ",
+    'FIRSTNAME': ", FirstName: ",
+    'LASTNAME': ", LastName: ",
+    'DISPLAYNAME': ", DisplayName: ",
+}
+
+# Markers of a failed result in non-JSON output, matched in one scan
+_FAIL_RE = re.compile(r"Error|\[FAILED\]")
+
+def _looks_failed(result) -> bool:
+    """Fallback check for results that aren't JSON: does the text report an error?"""
+    return _FAIL_RE.search(result if isinstance(result, str) else str(result)) is not None
+
 def print_result(test_name: str, result: str):
     """Print test result based on showOutput setting."""
     if show_output:
         print(f"{test_name} Result:", result)
-    else:
-        try:
-            # Parse the result to check if it's successful
-            if isinstance(result, str):
-                parsed = json.loads(result)
-                if parsed.get("status") == "success":
-                    print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
-                else:
-                    print(f"{test_name}: [FAILED] Failed")
-            else:
-                print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
-        except (json.JSONDecodeError, AttributeError):
-            # If we can't parse JSON, assume success if no error in result
-            if "Error" not in str(result) and "[FAILED]" not in str(result):
+        return
+
+    try:
+        # Parse the result to check if it's successful
+        parsed = _parse_result(result)
+        if parsed is not None:
+            if parsed.get("status") == "success":
                 print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
             else:
                 print(f"{test_name}: [FAILED] Failed")
+        else:
+            print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
+    except (orjson.JSONDecodeError, AttributeError):
+        # If we can't parse JSON, assume success if no error in result
+        if not _looks_failed(result):
+            print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
+        else:
+            print(f"{test_name}: [FAILED] Failed")
+
+def _write_lines(lines):
+    """Write a result block with one write call (print would issue one per line)"""
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def print_count_result(test_name: str, result: str, object_type: str):
     """Print count result with object count and type information."""
+    verbose = show_output  # read the global once for both branches
     try:
-        if isinstance(result, str):
-            parsed = json.loads(result)
+        parsed = _parse_result(result)
+        if parsed is not None:
             if parsed.get("status") == "success":
                 count = parsed.get("count", 0)
-                print(f"{test_name}: [SUCCESS] Success - Found {count} {object_type} objects")
-                if show_output:
-                    print(f"{test_name} Full Result:", result)
+                lines = [f"{test_name}: [SUCCESS] Success - Found {count} {object_type} objects"]
+                if verbose:
+                    lines.append(f"{test_name} Full Result: {result}")
             else:
-                print(f"{test_name}: [FAILED] Failed")
-                if show_output:
-                    print(f"{test_name} Error Result:", result)
+                lines = [f"{test_name}: [FAILED] Failed"]
+                if verbose:
+                    lines.append(f"{test_name} Error Result: {result}")
         else:
-            print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
-    except (json.JSONDecodeError, AttributeError):
+            lines = [f"{test_name}: [SUCCESS] Success (HTTP 200)"]
+    except (orjson.JSONDecodeError, AttributeError):
         # If we can't parse JSON, assume success if no error in result
-        if "Error" not in str(result) and "[FAILED]" not in str(result):
-            print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
+        if not _looks_failed(result):
+            lines = [f"{test_name}: [SUCCESS] Success (HTTP 200)"]
         else:
-            print(f"{test_name}: [FAILED] Failed")
+            lines = [f"{test_name}: [FAILED] Failed"]
+    _write_lines(lines)
 
 def print_identity_result(test_name: str, result: str, show_fields=None):
     """Print identity result showing specified fields."""
-    if show_fields is None:
-        show_fields = ['Id', 'FIRSTNAME', 'LASTNAME']
-        
     if show_output:
         print(f"{test_name} Result:", result)
-    else:
-        try:
-            if isinstance(result, str):
-                parsed = json.loads(result)
-                if parsed.get("status") == "success":
-                    print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
-                    
-                    # Show identity details if available
-                    if 'data' in parsed and 'value' in parsed['data'] and parsed['data']['value']:
-                        print(f"  Found {len(parsed['data']['value'])} identities:")
-                        for i, item in enumerate(parsed['data']['value'][:3], 1):  # Show first 3
-                            result_line = f"    {i}."
-                            for field in show_fields:
-                                value = item.get(field, 'N/A')
-                                if field == 'Id':
-                                    result_line += f" ID: {value}"
-                                elif field == 'FIRSTNAME':
-                                    result_line += f", FirstName: {value}"
-                                elif field == 'LASTNAME':
-                                    result_line += f", LastName: {value}"
-                                elif field == 'DISPLAYNAME':
-                                    result_line += f", DisplayName: {value}"
-                            print(result_line)
-                        if len(parsed['data']['value']) > 3:
-                            print(f"    ... and {len(parsed['data']['value']) - 3} more")
-                else:
-                    print(f"{test_name}: [FAILED] Failed")
-            else:
-                print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
-        except (json.JSONDecodeError, AttributeError):
-            if "Error" not in str(result) and "[FAILED]" not in str(result):
-                print(f"{test_name}: [SUCCESS] Success (HTTP 200)")
+        return
+
+    if show_fields is None:
+        show_fields = ['Id', 'FIRSTNAME', 'LASTNAME']
+
+    try:
+        parsed = _parse_result(result)
+        if parsed is not None:
+            if parsed.get("status") == "success":
+                lines = [f"{test_name}: [SUCCESS] Success (HTTP 200)"]
+                
+                # Show identity details if available
+                values = (parsed.get('data') or {}).get('value')
+                if values:
+                    total = len(values)
+                    lines.append(f"  Found {total} identities:")
+                    for i, item in enumerate(islice(values, 3), 1):  # Show first 3
+                        lines.append(f"    {i}." + "".join(_FIELD_LABELS[field] + str(item.get(field, 'N/A'))
+                                                      for field in show_fields if field in _FIELD_LABELS))
+                    if total > 3:
+                        lines.append(f"    ... and {total - 3} more")
             else:
-                print(f"{test_name}: [FAILED] Failed")
+                lines = [f"{test_name}: [FAILED] Failed"]
+        else:
+            lines = [f"{test_name}: [SUCCESS] Success (HTTP 200)"]
+    except (orjson.JSONDecodeError, AttributeError):
+        if not _looks_failed(result):
+            lines = [f"{test_name}: [SUCCESS] Success (HTTP 200)"]
+        else:
+            lines = [f"{test_name}: [FAILED] Failed"]
+    _write_lines(lines)
 
 async def test_identity_query():
     print("=== TESTING IDENTITY QUERIES ===""")
-    global _cached_token
-    # Clear cached token to ensure fresh request
-    _cached_token = None
-    
     try:
         result = await query_omada_identity(
             firstname="Emma", 
             lastname="Taylor", 
-            omada_base_url=os.getenv("OMADA_BASE_URL"),
+            omada_base_url=OMADA_BASE_URL,
             select_fields="Id,FIRSTNAME,LASTNAME"
         )
         print_identity_result("Identity Query", result, ['Id', 'FIRSTNAME', 'LASTNAME'])
@@ -261,8 +372,7 @@ async def test_count_all_identities():
     print("\n=== TESTING COUNT ALL IDENTITIES ===")
     try:
         result = await query_omada_identity(
-            count_only=True,
-            include_count=True
+            count_only=True
         )
         print_count_result("Count All Identities", result, "Identity")
     except Exception as e:
@@ -291,13 +401,9 @@ async def run_resourceassignments_tests():
         print("RUNNING RESOURCE ASSIGNMENT TESTS")
         print("=" * 60)
         try:
-            await test_resourceassignments_count()
-            if test_resourceassignments_sample:
-                await test_resourceassignments_sample()
-            if test_resourceassignments_by_identity:
-                await test_resourceassignments_by_identity()
-            if test_resourceassignments_by_resource:
-                await test_resourceassignments_by_resource()
+            tests = (test_resourceassignments_count, test_resourceassignments_sample,
+                     test_resourceassignments_by_identity, test_resourceassignments_by_resource)
+            raise_first_error(await run_buffered(*(test() for test in tests if test)))
         except Exception as e:
             print(f"Resource Assignment Tests Error: {str(e)}")
             print("Resource Assignment Tests: [FAILED] Failed")
@@ -311,11 +417,8 @@ async def run_system_tests():
         print("RUNNING SYSTEM TESTS")
         print("=" * 60)
         try:
-            await test_system_count()
-            if test_system_sample:
-                await test_system_sample()
-            if test_system_by_name:
-                await test_system_by_name()
+            tests = (test_system_count, test_system_sample, test_system_by_name)
+            raise_first_error(await run_buffered(*(test() for test in tests if test)))
         except Exception as e:
             print(f"System Tests Error: {str(e)}")
             print("System Tests: [FAILED] Failed")
@@ -340,7 +443,7 @@ async def test_identity_calculated_assignments(identity_id: int):
             print(f"Calculated Assignments Result:", result)
         else:
             try:
-                parsed = json.loads(result)
+                parsed = orjson.loads(result)
                 if parsed.get("status") == "success":
                     count = parsed.get("entities_returned", 0)
                     print(f"Calculated Assignments: [SUCCESS] Success - Found {count} assignments")
@@ -378,7 +481,7 @@ async def test_identity_calculated_assignments(identity_id: int):
                             print()
                 else:
                     print(f"Calculated Assignments: [FAILED] Failed")
-            except (json.JSONDecodeError, AttributeError) as e:
+            except (orjson.JSONDecodeError, AttributeError) as e:
                 print(f"Calculated Assignments: [FAILED] Failed - Parse error: {str(e)}")
                 
     except Exception as e:
@@ -415,23 +518,26 @@ async def run_errors_tests():
     else:
         print("\nError handling tests not available (test_errors.py not found)")
 
+async def run_core_tests():
+    """Run the independent core queries concurrently; run_buffered prints each test's output in order"""
+    tests = (test_identity_query, test_count_all_identities, test_count_application_roles,
+             test_get_all_application_roles, test_get_application_roles_by_name, test_application_roles_with_id)
+    raise_first_error(await run_buffered(*bounded(*(test() for test in tests))))
+
 async def main():
     print("=" * 60)
     print("RUNNING CORE OMADA TESTS")
     print("=" * 60)
-    await test_identity_query()
-    await test_count_all_identities()
-    await test_count_application_roles()
-    await test_get_all_application_roles()
-    await test_get_application_roles_by_name()
-    await test_application_roles_with_id()
+    await run_core_tests()
     
-    # Run additional test suites
-    await run_operators_tests()
-    await run_resourceassignments_tests()
-    await run_system_tests()
-    await run_calculated_assignments_tests()
-    await run_errors_tests()
+    # Run additional test suites concurrently (each suite's output is printed as one block, in order)
+    await run_buffered(*bounded(
+        run_operators_tests(),
+        run_resourceassignments_tests(),
+        run_system_tests(),
+        run_calculated_assignments_tests(),
+        run_errors_tests()
+    ))
     
     print("\n" + "=" * 60)
     print("ALL TESTS COMPLETED")
@@ -449,9 +555,12 @@ if __name__ == "__main__":
     parser.add_argument('--testsuite', choices=['all', 'core', 'operators', 'resourceassignments', 'system', 'calculated', 'errors'],
                        default='all', help='Select which test suite to run (default: all)')
     parser.add_argument('--identity-id', type=int, help='Identity ID for calculated assignments (required for --testsuite calculated)')
+    parser.add_argument('--jobs', type=int, default=8,
+                       help='Maximum core tests / test suites run concurrently (default: 8)')
     
     args = parser.parse_args()
     show_output = args.showOutput
+    jobs = args.jobs
     
     # Run specific test suite based on argument
     if args.testsuite == 'core':
@@ -459,12 +568,7 @@ if __name__ == "__main__":
             print("=" * 60)
             print("RUNNING CORE OMADA TESTS ONLY")
             print("=" * 60)
-            await test_identity_query()
-            await test_count_all_identities()
-            await test_count_application_roles()
-            await test_get_all_application_roles()
-            await test_get_application_roles_by_name()
-            await test_application_roles_with_id()
+            await run_core_tests()
         asyncio.run(run_core_only())
     elif args.testsuite == 'operators':
         asyncio.run(run_operators_tests())
@@ -4,59 +4,72 @@
 
 import asyncio
 import json
+import sys
 from server import query_omada_identity, query_omada_entity
 
+# Only strip non-ASCII characters from unparseable results when the console can't print them
+_STDOUT_ASCII = (sys.stdout.encoding or "").lower().replace("-", "") not in ("utf8", "utf16")
+
+# Row prefix for each displayable field, e.g. "1. ID: ..., FirstName: ..."
+_FIELD_LABELS = {
+    'Id': " ID: ",
+    'FIRSTNAME': ", FirstName: ",
+    'LASTNAME': ", LastName: ",
+    'DISPLAYNAME': ", DisplayName: ",
+}
+
+# Filters shared by the operator tests, built once at import. query_omada_entity only
+# iterates field_filters, so the tuples are passed as-is.
+_F_FIRSTNAME_NE_EMMA = ({"field": "FIRSTNAME", "value": "Emma", "operator": "ne"},)
+_F_FIRSTNAME_NE_EMMA_LASTNAME_T = _F_FIRSTNAME_NE_EMMA + (
+    {"field": "LASTNAME", "value": "T", "operator": "startswith"},
+)
+_F_FIRSTNAME_CONTAINS_MM = ({"field": "FIRSTNAME", "value": "mm", "operator": "contains"},)
+_F_LASTNAME_STARTSWITH_TAY = ({"field": "LASTNAME", "value": "Tay", "operator": "startswith"},)
+_F_FIRSTNAME_LIKE_EM = ({"field": "FIRSTNAME", "value": "Em%", "operator": "like"},)
+_F_FIRSTNAME_EQ_EMMA = ({"field": "FIRSTNAME", "value": "Emma", "operator": "eq"},)
+
 def display_filtered_result(result_json, test_name, show_fields=None):
     """Extract and display specific fields from the JSON result"""
     if show_fields is None:
         show_fields = ['Id', 'DISPLAYNAME']
         
+    # Collect the whole block and write it once (one stdout write instead of a print per line)
+    lines = [f"\n{test_name}", "=" * 50]
     try:
         # Parse the JSON string
         data = json.loads(result_json)
         
-        print(f"\n{test_name}")
-        print("=" * 50)
-        print(f"Status: {data.get('status', 'N/A')}")
-        print(f"Entity Type: {data.get('entity_type', 'N/A')}")
-        print(f"Entities Returned: {data.get('entities_returned', 'N/A')}")
-        print(f"Filter: {data.get('filter', 'N/A')}")
-        print(f"Endpoint: {data.get('endpoint', 'N/A')}")
+        lines.append(f"Status: {data.get('status', 'N/A')}")
+        lines.append(f"Entity Type: {data.get('entity_type', 'N/A')}")
+        lines.append(f"Entities Returned: {data.get('entities_returned', 'N/A')}")
+        lines.append(f"Filter: {data.get('filter', 'N/A')}")
+        lines.append(f"Endpoint: {data.get('endpoint', 'N/A')}")
         
         # Extract specified fields from data.value array
         if 'data' in data and 'value' in data['data']:
-            print("\nIdentities:")
-            print("-" * 30)
-            for i, item in enumerate(data['data']['value'], 1):
-                result_line = f"{i}."
-                for field in show_fields:
-                    value = item.get(field, 'N/A')
-                    if field == 'Id':
-                        result_line += f" ID: {value}"
-                    elif field == 'FIRSTNAME':
-                        result_line += f", FirstName: {value}"
-                    elif field == 'LASTNAME':
-                        result_line += f", LastName: {value}"
-                    elif field == 'DISPLAYNAME':
-                        result_line += f", DisplayName: {value}"
-                print(result_line)
+            # Build the row template once; fields without a label are not displayed
+            fields = [field for field in show_fields if field in _FIELD_LABELS]
+            line_format = "{}." + "".join(_FIELD_LABELS[field] + "{}" for field in fields)
+            lines.append("\nIdentities:")
+            lines.append("-" * 30)
+            lines.extend(line_format.format(i, *[item.get(field, 'N/A') for field in fields])
+                         for i, item in enumerate(data['data']['value'], 1))
         else:
-            print("\nNo identity data found")
+            lines.append("\nNo identity data found")
             
     except json.JSONDecodeError:
-        print(f"\n{test_name}")
-        print("=" * 50)
-        print("Error parsing JSON result:")
-        # Handle Unicode encoding issues by removing non-ASCII characters
+        lines.append("Error parsing JSON result:")
+        # Handle Unicode encoding issues by removing non-ASCII characters (non-UTF consoles only)
         try:
-            clean_result = result_json.encode('ascii', 'ignore').decode('ascii')
-            print(clean_result[:200] + "..." if len(clean_result) > 200 else clean_result)
+            clean_result = result_json.encode('ascii', 'ignore').decode('ascii') if _STDOUT_ASCII else result_json
+            lines.append(clean_result[:200] + "..." if len(clean_result) > 200 else clean_result)
         except:
-            print("Unable to display error response due to encoding issues")
+            lines.append("Unable to display error response due to encoding issues")
     except Exception as e:
-        print(f"\n{test_name}")
-        print("=" * 50)
-        print(f"Error processing result: {repr(e)}")
+        lines.append(f"Error processing result: {repr(e)}")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 # DEPRECATED: These tests have been migrated to test_identity_search.py with field_filters format
 # 
@@ -81,54 +94,52 @@ def display_filtered_result(result_json, test_name, show_fields=None):
 #     )
 #     display_filtered_result(result, "Test 2: Combined Operators (firstname ne 'Emma' AND lastname startswith 'T')", ['Id', 'FIRSTNAME', 'LASTNAME'])
 
-async def test_firstname_not_equals():
-    """Updated test using new field_filters format"""
+# Operator cases: (field_filters, query kwargs, title, fields to display)
+_FIRSTNAME_NOT_EQUALS_CASES = (
     # Test 1: Using wrapper function
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"}
-    ], top=5, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Test 1: Firstname NOT EQUALS 'Emma'", ['Id', 'FIRSTNAME'])
-    
+    (_F_FIRSTNAME_NE_EMMA, {"top": 5, "select_fields": "Id,FIRSTNAME"},
+     "Test 1: Firstname NOT EQUALS 'Emma'", ['Id', 'FIRSTNAME']),
     # Test 2: Combined operators - firstname ne and lastname startswith
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "ne"},
-        {"field": "LASTNAME", "value": "T", "operator": "startswith"}
-    ], top=3, select_fields="Id,FIRSTNAME,LASTNAME")
-    display_filtered_result(result, "Test 2: Combined Operators (firstname ne 'Emma' AND lastname startswith 'T')", ['Id', 'FIRSTNAME', 'LASTNAME'])
+    (_F_FIRSTNAME_NE_EMMA_LASTNAME_T, {"top": 3, "select_fields": "Id,FIRSTNAME,LASTNAME"},
+     "Test 2: Combined Operators (firstname ne 'Emma' AND lastname startswith 'T')", ['Id', 'FIRSTNAME', 'LASTNAME']),
+)
 
-async def test_other_operators():
-    """Updated test using new field_filters format"""
+_OTHER_OPERATOR_CASES = (
     # Test contains (may not be supported by Omada)
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "mm", "operator": "contains"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Test 3: Contains Operator (firstname contains 'mm')", ['Id', 'FIRSTNAME'])
-    
+    (_F_FIRSTNAME_CONTAINS_MM, {"top": 3, "select_fields": "Id,FIRSTNAME"},
+     "Test 3: Contains Operator (firstname contains 'mm')", ['Id', 'FIRSTNAME']),
     # Test startswith
-    result = await query_omada_identity([
-        {"field": "LASTNAME", "value": "Tay", "operator": "startswith"}
-    ], top=3, select_fields="Id,LASTNAME")
-    display_filtered_result(result, "Test 4: Starts With Operator (lastname startswith 'Tay')", ['Id', 'LASTNAME'])
-    
+    (_F_LASTNAME_STARTSWITH_TAY, {"top": 3, "select_fields": "Id,LASTNAME"},
+     "Test 4: Starts With Operator (lastname startswith 'Tay')", ['Id', 'LASTNAME']),
     # Test Like operator - appears to have syntax issues in OData
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Em%", "operator": "like"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Test 5: Like Operator (firstname like 'Em%') - May not be supported", ['Id', 'FIRSTNAME'])
-    
+    (_F_FIRSTNAME_LIKE_EM, {"top": 3, "select_fields": "Id,FIRSTNAME"},
+     "Test 5: Like Operator (firstname like 'Em%') - May not be supported", ['Id', 'FIRSTNAME']),
     # Test working equals operator for comparison
-    result = await query_omada_identity([
-        {"field": "FIRSTNAME", "value": "Emma", "operator": "eq"}
-    ], top=3, select_fields="Id,FIRSTNAME")
-    display_filtered_result(result, "Test 6: Equals Operator (firstname eq 'Emma') - Reference working test", ['Id', 'FIRSTNAME'])
+    (_F_FIRSTNAME_EQ_EMMA, {"top": 3, "select_fields": "Id,FIRSTNAME"},
+     "Test 6: Equals Operator (firstname eq 'Emma') - Reference working test", ['Id', 'FIRSTNAME']),
+)
+
+async def run_operator_cases(cases):
+    """Run the cases' queries concurrently (they are independent), then display them in case order"""
+    results = await asyncio.gather(*(query_omada_identity(filters, **kwargs) for filters, kwargs, _, _ in cases))
+    for result, (_, _, title, fields) in zip(results, cases):
+        display_filtered_result(result, title, fields)
+
+async def test_firstname_not_equals():
+    """Updated test using new field_filters format"""
+    await run_operator_cases(_FIRSTNAME_NOT_EQUALS_CASES)
+
+async def test_other_operators():
+    """Updated test using new field_filters format"""
+    await run_operator_cases(_OTHER_OPERATOR_CASES)
 
 async def main():
     print("⚠️  DEPRECATION WARNING:")
     print("This file contains updated tests but test_identity_search.py is now the recommended test file.")
     print("The tests below use the new field_filters format for compatibility.\n")
     
-    await test_firstname_not_equals()
-    await test_other_operators()
+    # Both tests' queries in one concurrent batch; results still display as Test 1-6
+    await run_operator_cases(_FIRSTNAME_NOT_EQUALS_CASES + _OTHER_OPERATOR_CASES)
     
     print("\n💡 TIP: For the most comprehensive identity search tests, run:")
     print("python test_identity_search.py")
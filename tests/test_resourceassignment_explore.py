@@ -1,67 +1,71 @@
 import asyncio
+import io
 import json
 from server import query_omada_entity
 
-def display_exploration_result(result_json, test_name):
+# Field-discovery probes in flight at once, so the exploration doesn't flood Omada
+_MAX_CONCURRENT_PROBES = 4
+
+def display_exploration_result(result_json, test_name, out=None):
     """Display results from RESOURCEASSIGNMENT endpoint exploration"""
     try:
         data = json.loads(result_json)
         
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print(f"Status: {data.get('status', 'N/A')}")
-        print(f"Entity Type: {data.get('entity_type', 'N/A')}")
-        print(f"Entities Returned: {data.get('entities_returned', 'N/A')}")
-        print(f"Total Count: {data.get('total_count', 'N/A')}")
-        print(f"Endpoint: {data.get('endpoint', 'N/A')}")
+        print(f"\n{test_name}", file=out)
+        print("=" * 60, file=out)
+        print(f"Status: {data.get('status', 'N/A')}", file=out)
+        print(f"Entity Type: {data.get('entity_type', 'N/A')}", file=out)
+        print(f"Entities Returned: {data.get('entities_returned', 'N/A')}", file=out)
+        print(f"Total Count: {data.get('total_count', 'N/A')}", file=out)
+        print(f"Endpoint: {data.get('endpoint', 'N/A')}", file=out)
         
         if 'data' in data:
             context = data['data'].get('@odata.context', 'N/A')
-            print(f"OData Context: {context}")
+            print(f"OData Context: {context}", file=out)
             
             if 'value' in data['data'] and len(data['data']['value']) > 0:
-                print(f"\nFound {len(data['data']['value'])} resource assignments")
+                print(f"\nFound {len(data['data']['value'])} resource assignments", file=out)
                 # Display first assignment structure
                 assignment = data['data']['value'][0]
-                print("\nSample Resource Assignment Structure:")
-                print("-" * 40)
+                print("\nSample Resource Assignment Structure:", file=out)
+                print("-" * 40, file=out)
                 for key, value in assignment.items():
-                    print(f"{key}: {type(value).__name__}")
+                    print(f"{key}: {type(value).__name__}", file=out)
             else:
-                print("\nNo resource assignments found in the system")
+                print("\nNo resource assignments found in the system", file=out)
         
     except json.JSONDecodeError:
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print("Error parsing JSON result:")
+        print(f"\n{test_name}", file=out)
+        print("=" * 60, file=out)
+        print("Error parsing JSON result:", file=out)
         try:
             clean_result = result_json.encode('ascii', 'ignore').decode('ascii')
-            print(clean_result[:400] + "..." if len(clean_result) > 400 else clean_result)
+            print(clean_result[:400] + "..." if len(clean_result) > 400 else clean_result, file=out)
         except:
-            print("Unable to display error response")
+            print("Unable to display error response", file=out)
     except Exception as e:
-        print(f"\n{test_name}")
-        print("=" * 60)
-        print(f"Error: {repr(e)}")
+        print(f"\n{test_name}", file=out)
+        print("=" * 60, file=out)
+        print(f"Error: {repr(e)}", file=out)
 
-async def test_resourceassignment_basic_access():
+async def test_resourceassignment_basic_access(out=None):
     """Test basic access to RESOURCEASSIGNMENT endpoint"""
     result = await query_omada_entity(
         entity_type="RESOURCEASSIGNMENT",
         top=10,
         include_count=True
     )
-    display_exploration_result(result, "Test 1: Basic RESOURCEASSIGNMENT Access")
+    display_exploration_result(result, "Test 1: Basic RESOURCEASSIGNMENT Access", out=out)
 
-async def test_resourceassignment_count():
+async def test_resourceassignment_count(out=None):
     """Test getting total count of resource assignments"""
     result = await query_omada_entity(
         entity_type="RESOURCEASSIGNMENT",
         count_only=True
     )
-    display_exploration_result(result, "Test 2: Total RESOURCEASSIGNMENT Count")
+    display_exploration_result(result, "Test 2: Total RESOURCEASSIGNMENT Count", out=out)
 
-async def test_resourceassignment_field_exploration():
+async def test_resourceassignment_field_exploration(out=None):
     """Test different field names to discover the schema"""
     test_fields = [
         "IDENTITYREF",
@@ -73,28 +77,39 @@ async def test_resourceassignment_field_exploration():
         "DISPLAYNAME"
     ]
     
-    print("\n\nTest 3: Field Discovery Tests")
-    print("=" * 60)
+    print("\n\nTest 3: Field Discovery Tests", file=out)
+    print("=" * 60, file=out)
     
-    for field in test_fields:
-        try:
-            result = await query_omada_entity(
+    # The probes are independent: run them concurrently, at most _MAX_CONCURRENT_PROBES at a time
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_PROBES)
+
+    async def probe(field):
+        async with semaphore:
+            return await query_omada_entity(
                 entity_type="RESOURCEASSIGNMENT",
                 filter_condition=f"{field} ne null",
                 top=1
             )
+
+    results = await asyncio.gather(*(probe(field) for field in test_fields), return_exceptions=True)
+
+    # Classify in field order once all probes are back
+    for field, result in zip(test_fields, results):
+        try:
+            if isinstance(result, Exception):
+                raise result
             
             data = json.loads(result)
             if data.get('status') == 'success':
-                print(f"[OK] {field}: EXISTS")
+                print(f"[OK] {field}: EXISTS", file=out)
             else:
-                print(f"[ERR] {field}: ERROR - {data.get('status', 'unknown')}")
+                print(f"[ERR] {field}: ERROR - {data.get('status', 'unknown')}", file=out)
                 
         except Exception as e:
             if "Could not find a property named" in str(e):
-                print(f"[NO] {field}: NOT FOUND")
+                print(f"[NO] {field}: NOT FOUND", file=out)
             else:
-                print(f"[ERR] {field}: ERROR - {str(e)[:50]}")
+                print(f"[ERR] {field}: ERROR - {str(e)[:50]}", file=out)
 
 async def test_resourceassignment_metadata_info():
     """Display information about the RESOURCEASSIGNMENT endpoint"""
@@ -112,9 +127,13 @@ async def test_resourceassignment_metadata_info():
 
 async def main():
     print("=== RESOURCEASSIGNMENT ENDPOINT EXPLORATION ===")
-    await test_resourceassignment_basic_access()
-    await test_resourceassignment_count()
-    await test_resourceassignment_field_exploration()
+    # The three queries are independent: run them concurrently, then print each test's output in order
+    tests = (test_resourceassignment_basic_access, test_resourceassignment_count,
+             test_resourceassignment_field_exploration)
+    buffers = [io.StringIO() for _ in tests]
+    await asyncio.gather(*(test(out=buf) for test, buf in zip(tests, buffers)))
+    for buf in buffers:
+        print(buf.getvalue(), end="")
     await test_resourceassignment_metadata_info()
 
 if __name__ == "__main__":